@@ -103,11 +103,10 @@ class CombatMode:
         Returns:
             None
         """
-        dialog_location = ImageUtils.find_button("dialog_lyria", tries = 2, suppress_error = True, bypass_general_adjustment = True)
-        if dialog_location is None:
-            dialog_location = ImageUtils.find_button("dialog_vyrn", tries = 2, suppress_error = True, bypass_general_adjustment = True)
+        dialog = ImageUtils.find_any(["dialog_lyria", "dialog_vyrn"], tries = 2, suppress_error = True, bypass_general_adjustment = True)
 
-        if dialog_location is not None:
+        if dialog is not None:
+            dialog_location = dialog[1]
             if Settings.use_first_notch is False:
                 MouseUtils.move_and_click_point(dialog_location[0] + 180, dialog_location[1] - 50, "template_dialog")
             else:
@@ -124,46 +123,57 @@ class CombatMode:
         """
         from bot.game import Game
 
-        # Check if the Battle has ended.
-        if Settings.farming_mode == "Raid" and Settings.enable_auto_exit_raid and time.time() - CombatMode._start_time >= Settings.time_allowed_until_auto_exit_raid:
-            MessageLog.print_message("\n######################################################################")
-            MessageLog.print_message("######################################################################")
-            MessageLog.print_message("[COMBAT] Combat Mode ended due to exceeding time allowed.")
-            MessageLog.print_message("######################################################################")
-            MessageLog.print_message("######################################################################")
-            raise CombatModeException("Time Exceeded")
-        elif CombatMode._retreat_check or ImageUtils.confirm_location("no_loot", tries = 1, suppress_error = True, bypass_general_adjustment = True):
-            MessageLog.print_message("\n######################################################################")
-            MessageLog.print_message("######################################################################")
-            MessageLog.print_message("[COMBAT] Combat Mode has ended with no loot.")
-            MessageLog.print_message("######################################################################")
-            MessageLog.print_message("######################################################################")
-            raise CombatModeException("No Loot")
-        elif ImageUtils.confirm_location("battle_concluded", tries = 1, suppress_error = True, bypass_general_adjustment = True):
-            MessageLog.print_message("\n[COMBAT] Battle concluded suddenly.")
-            MessageLog.print_message("\n######################################################################")
-            MessageLog.print_message("######################################################################")
-            MessageLog.print_message("[COMBAT] Ending Combat Mode.")
-            MessageLog.print_message("######################################################################")
-            MessageLog.print_message("######################################################################")
-            Game.find_and_click_button("reload")
-            raise CombatModeException("Battle Concluded")
-        elif ImageUtils.confirm_location("exp_gained", tries = 1, suppress_error = True, bypass_general_adjustment = True):
-            MessageLog.print_message("\n######################################################################")
-            MessageLog.print_message("######################################################################")
-            MessageLog.print_message("[COMBAT] Ending Combat Mode.")
-            MessageLog.print_message("######################################################################")
-            MessageLog.print_message("######################################################################")
-            raise CombatModeException("Exp Gained")
-        elif ImageUtils.confirm_location("loot_collected", tries = 1, suppress_error = True, bypass_general_adjustment = True):
-            MessageLog.print_message("\n######################################################################")
-            MessageLog.print_message("######################################################################")
-            MessageLog.print_message("[COMBAT] Ending Combat Mode.")
-            MessageLog.print_message("######################################################################")
-            MessageLog.print_message("######################################################################")
-            raise CombatModeException("Loot Collected")
-        else:
-            return "Nothing"
+        # Check if the Battle has ended. All the checks share one captured frame.
+        with ImageUtils.shared_frame():
+            if Settings.farming_mode == "Raid" and Settings.enable_auto_exit_raid and time.time() - CombatMode._start_time >= Settings.time_allowed_until_auto_exit_raid:
+                MessageLog.print_message("\n######################################################################")
+                MessageLog.print_message("######################################################################")
+                MessageLog.print_message("[COMBAT] Combat Mode ended due to exceeding time allowed.")
+                MessageLog.print_message("######################################################################")
+                MessageLog.print_message("######################################################################")
+                raise CombatModeException("Time Exceeded")
+            elif CombatMode._retreat_check or ImageUtils.confirm_location("no_loot", tries = 1, suppress_error = True, bypass_general_adjustment = True):
+                MessageLog.print_message("\n######################################################################")
+                MessageLog.print_message("######################################################################")
+                MessageLog.print_message("[COMBAT] Combat Mode has ended with no loot.")
+                MessageLog.print_message("######################################################################")
+                MessageLog.print_message("######################################################################")
+                raise CombatModeException("No Loot")
+            elif ImageUtils.confirm_location("battle_concluded", tries = 1, suppress_error = True, bypass_general_adjustment = True):
+                MessageLog.print_message("\n[COMBAT] Battle concluded suddenly.")
+                MessageLog.print_message("\n######################################################################")
+                MessageLog.print_message("######################################################################")
+                MessageLog.print_message("[COMBAT] Ending Combat Mode.")
+                MessageLog.print_message("######################################################################")
+                MessageLog.print_message("######################################################################")
+                Game.find_and_click_button("reload")
+                raise CombatModeException("Battle Concluded")
+            elif ImageUtils.confirm_location("exp_gained", tries = 1, suppress_error = True, bypass_general_adjustment = True):
+                MessageLog.print_message("\n######################################################################")
+                MessageLog.print_message("######################################################################")
+                MessageLog.print_message("[COMBAT] Ending Combat Mode.")
+                MessageLog.print_message("######################################################################")
+                MessageLog.print_message("######################################################################")
+                raise CombatModeException("Exp Gained")
+            elif ImageUtils.confirm_location("loot_collected", tries = 1, suppress_error = True, bypass_general_adjustment = True):
+                MessageLog.print_message("\n######################################################################")
+                MessageLog.print_message("######################################################################")
+                MessageLog.print_message("[COMBAT] Ending Combat Mode.")
+                MessageLog.print_message("######################################################################")
+                MessageLog.print_message("######################################################################")
+                raise CombatModeException("Loot Collected")
+            else:
+                return "Nothing"
+
+    @staticmethod
+    def _check_for_attack_or_next() -> bool:
+        """Check if either the Attack or the Next button is visible, using one captured frame for both checks.
+
+        Returns:
+            (bool): True if either the Attack or the Next button is visible.
+        """
+        with ImageUtils.shared_frame():
+            return ImageUtils.find_button("attack", tries = 1, suppress_error = True) is not None or ImageUtils.find_button("next", tries = 1, suppress_error = True) is not None
 
     @staticmethod
     def _check_raid() -> bool:
@@ -315,7 +325,8 @@ class CombatMode:
         MessageLog.print_message(f"[COMBAT] Turn {CombatMode._turn_number} has ended.")
 
         if Game.find_and_click_button("next", tries = 3, suppress_error = True):
-            Game.wait(3)
+            # Move on as soon as the next Turn is ready instead of always waiting out the loading.
+            ImageUtils.wait_for_button("attack", timeout = 3.0, suppress_error = True)
 
         CombatMode._turn_number += 1
 
@@ -336,8 +347,7 @@ class CombatMode:
         else:
             tries = 100
 
-        while tries > 0 and not CombatMode._retreat_check and ImageUtils.find_button("attack", tries = 1, suppress_error = True) is None and \
-                ImageUtils.find_button("next", tries = 1, suppress_error = True) is None:
+        while tries > 0 and not CombatMode._retreat_check and not CombatMode._check_for_attack_or_next():
             CombatMode._check_for_dialog()
 
             # Check if the Party wiped after attacking.
@@ -447,7 +457,8 @@ class CombatMode:
         CombatMode._check_for_battle_end()
 
         if Game.find_and_click_button("next", tries = 3, suppress_error = True):
-            Game.wait(3)
+            # Move on as soon as the next Turn is ready instead of always waiting out the loading.
+            ImageUtils.wait_for_button("attack", timeout = 3.0, suppress_error = True)
 
         return None
 
@@ -882,7 +893,7 @@ class CombatMode:
 
         MessageLog.print_message("[COMBAT] Quick Summoning now...")
         if ImageUtils.find_button("quick_summon_not_ready", bypass_general_adjustment = True) is None and \
-                (Game.find_and_click_button("quick_summon1", bypass_general_adjustment = True) or Game.find_and_click_button("quick_summon2", bypass_general_adjustment = True)):
+                Game.find_and_click_button("quick_summon", bypass_general_adjustment = True):
             MessageLog.print_message("[COMBAT] Successfully quick summoned!")
 
             if "wait" in command:
@@ -1078,20 +1089,19 @@ class CombatMode:
             CombatMode._check_for_battle_end()
 
             if Game.find_and_click_button("next", tries = 1, suppress_error = True):
-                Game.wait(3)
+                Game.wait_for_ui("combat:next", 3.0)
 
             CombatMode._check_for_wipe()
 
             if CombatMode._check_raid():
                 # Click Next if it is available and enable automation again if combat continues.
                 if Game.find_and_click_button("next", tries = 1, suppress_error = True):
-                    Game.wait(3.0)
+                    Game.wait_for_ui("combat:next", 3.0)
 
                     # Check for exit conditions and restart auto.
                     if CombatMode._check_for_battle_end() == "Nothing":
                         CombatMode._enable_auto()
-                elif ImageUtils.find_button("attack", tries = 1, suppress_error = True) is None and ImageUtils.find_button("next", tries = 1, suppress_error = True) is None and \
-                        CombatMode._check_for_battle_end() == "Nothing":
+                elif not CombatMode._check_for_attack_or_next() and CombatMode._check_for_battle_end() == "Nothing":
                     Game.wait(1.0)
 
                     CombatMode._reload_for_attack(override = True)
@@ -1103,7 +1113,7 @@ class CombatMode:
                             MessageLog.print_message("[DEBUG] Clicked the Next button to move to the next wave. Attempting to restart Full/Semi Auto...")
 
                         CombatMode._enable_auto()
-            elif ImageUtils.find_button("attack", tries = 1, suppress_error = True) is None and ImageUtils.find_button("next", tries = 1, suppress_error = True) is None:
+            elif not CombatMode._check_for_attack_or_next():
                 if Settings.debug_mode:
                     MessageLog.print_message("[DEBUG] Attack and Next buttons have vanished. Determining if bot should reload...")
 
@@ -1130,7 +1140,7 @@ class CombatMode:
             CombatMode._check_for_battle_end()
 
             if Game.find_and_click_button("next", tries = 1, suppress_error = True):
-                Game.wait(3)
+                Game.wait_for_ui("combat:next", 3.0)
 
                 # Check for exit conditions.
                 CombatMode._check_for_battle_end()
@@ -1172,6 +1182,7 @@ class CombatMode:
         CombatMode._attack_button_location = None
         CombatMode._command_turn_number = 1
         CombatMode._turn_number = 1  # Current turn for the script execution.
+        ImageUtils.reset_change_detector_statistics()
 
         MessageLog.print_message("\n######################################################################")
         MessageLog.print_message("######################################################################")
@@ -1199,7 +1210,7 @@ class CombatMode:
             Game.find_and_click_button("arcarum_stage_effect_active", tries = 10, bypass_general_adjustment = True)
 
         # Save the position of the Attack button.
-        CombatMode._attack_button_location = ImageUtils.find_button("attack", tries = 50, bypass_general_adjustment = True)
+        CombatMode._attack_button_location = ImageUtils.wait_for_button("attack", timeout = 15.0)
 
         if CombatMode._attack_button_location is None:
             MessageLog.print_message(f"\n[ERROR] Cannot find Attack button. Raid must have just ended.")
@@ -1330,7 +1341,7 @@ class CombatMode:
 
                 # Counteract slower instances when the battle finished right when the bot finished executing the script.
                 if Game.find_and_click_button("next", tries = 1, suppress_error = True):
-                    Game.wait(3)
+                    Game.wait_for_ui("combat:next", 3.0)
                     CombatMode._check_for_battle_end()
 
                 # Main workflow loop for both Semi Auto and Full Auto. The bot will progress the Quest/Raid until it ends or the Party wipes.
@@ -1347,6 +1358,9 @@ class CombatMode:
                     Settings.combat_elapsed_time = time.time() - CombatMode._start_time
 
                 return True
+        finally:
+            if Settings.debug_mode:
+                ImageUtils.print_change_detector_statistics()
 
         ######################################################################
         ######################################################################
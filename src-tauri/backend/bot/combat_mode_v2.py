@@ -56,7 +56,7 @@ class CombatModeV2:
     def _select_char(idx: int):
         """Click on the character on combact screen. Idx start at 0
         """
-        x,y = ImageUtils.find_button("attack", tries = 50, bypass_general_adjustment = True)
+        x,y = ImageUtils.wait_for_button("attack", timeout = 15.0)
 
         if Settings.use_first_notch is False:
             x_offset = 280
@@ -123,17 +123,12 @@ class CombatModeV2:
         Returns:
             (bool): if success
         """
+        from bot.game import Game
         Log.print_message("[COMBAT] Quick Summoning now...")
-        pt = ImageUtils.find_button("quick_summon2")
-        if pt is not None:
-            x,y=pt
-            MouseUtils.move_and_click_point(x,y, "quick_summon1", custom_wait=random.uniform(0.03, 0.1))
-            return True
-        
-        pt = ImageUtils.find_button("quick_summon1")
-        if pt is not None:
-            x,y=pt
-            MouseUtils.move_and_click_point(x,y, "quick_summon2", custom_wait=random.uniform(0.03, 0.1))
+        result = ImageUtils.find_any(Game._button_alternatives["quick_summon"])
+        if result is not None:
+            image_name, (x, y) = result
+            MouseUtils.move_and_click_point(x,y, image_name, custom_wait=random.uniform(0.03, 0.1))
             return True
 
         Log.print_message("[COMBAT] Was not able to quick summon this Turn.")
@@ -299,31 +294,32 @@ class CombatModeV2:
         """
         from bot.game import Game
 
-        # Check if the Battle has ended.
-        if ImageUtils.confirm_location("battle_concluded", tries = 1, suppress_error = True, bypass_general_adjustment = True):
-            Log.print_message("\n[COMBAT] Battle concluded suddenly.")
-            Log.print_message("\n######################################################################")
-            Log.print_message("######################################################################")
-            Log.print_message("[COMBAT] Ending Combat Mode.")
-            Log.print_message("######################################################################")
-            Log.print_message("######################################################################")
-            return True
-
-        if ImageUtils.confirm_location("exp_gained", tries = 1, suppress_error = True, bypass_general_adjustment = True):
-            Log.print_message("\n######################################################################")
-            Log.print_message("######################################################################")
-            Log.print_message("[COMBAT] Ending Combat Mode.")
-            Log.print_message("######################################################################")
-            Log.print_message("######################################################################")
-            return True
-
-        if ImageUtils.confirm_location("loot_collected", tries = 1, suppress_error = True, bypass_general_adjustment = True):
-            Log.print_message("\n######################################################################")
-            Log.print_message("######################################################################")
-            Log.print_message("[COMBAT] Ending Combat Mode.")
-            Log.print_message("######################################################################")
-            Log.print_message("######################################################################")
-            return True
+        # Check if the Battle has ended. All the checks share one captured frame.
+        with ImageUtils.shared_frame():
+            if ImageUtils.confirm_location("battle_concluded", tries = 1, suppress_error = True, bypass_general_adjustment = True):
+                Log.print_message("\n[COMBAT] Battle concluded suddenly.")
+                Log.print_message("\n######################################################################")
+                Log.print_message("######################################################################")
+                Log.print_message("[COMBAT] Ending Combat Mode.")
+                Log.print_message("######################################################################")
+                Log.print_message("######################################################################")
+                return True
+
+            if ImageUtils.confirm_location("exp_gained", tries = 1, suppress_error = True, bypass_general_adjustment = True):
+                Log.print_message("\n######################################################################")
+                Log.print_message("######################################################################")
+                Log.print_message("[COMBAT] Ending Combat Mode.")
+                Log.print_message("######################################################################")
+                Log.print_message("######################################################################")
+                return True
+
+            if ImageUtils.confirm_location("loot_collected", tries = 1, suppress_error = True, bypass_general_adjustment = True):
+                Log.print_message("\n######################################################################")
+                Log.print_message("######################################################################")
+                Log.print_message("[COMBAT] Ending Combat Mode.")
+                Log.print_message("######################################################################")
+                Log.print_message("######################################################################")
+                return True
 
         return False
         
@@ -331,8 +327,8 @@ class CombatModeV2:
     def _wait_for_end():
         from bot.game import Game
         Game._move_mouse_security_check()
-        while not CombatModeV2._is_battle_end():
-            sleep(5)
+        # Only check for the end of the battle again once the screen has changed, backing off to every 5 seconds while it stays the same.
+        ImageUtils.wait_until(CombatModeV2._is_battle_end, timeout = None, poll_interval = 1.0, max_poll_interval = 5.0)
         
     @staticmethod
     def start_combat_mode() -> bool:
@@ -347,6 +343,8 @@ class CombatModeV2:
         Log.print_message("######################################################################")
         Log.print_message("######################################################################\n")
 
+        ImageUtils.reset_change_detector_statistics()
+
         first_action = CombatModeV2.actions[0]
        
         if first_action[0] == CombatModeV2._enable_semi_auto:
@@ -363,6 +361,7 @@ class CombatModeV2:
                 pya.mouseDown()
                 sleep(random.uniform(0.02, 0.12))
                 pya.mouseUp()
+                ImageUtils.invalidate_frame()
 
                 if ImageUtils.confirm_location("auto_enabled", tries=5):
                     Log.print_message(f"[Combat] Auto enabled")
@@ -370,22 +369,22 @@ class CombatModeV2:
         else:
             auto_status = 0
         
-        if ImageUtils.find_button("heal", tries=50):
+        if ImageUtils.wait_for_button("heal", timeout = 15.0):
             Log.print_message(f"[Combat] Entering combact page")
         else:
             return False
         
         if auto_status != 1 and auto_status != 3:
             # check for attack button if doesn't try to enable semi auto
-            if ImageUtils.find_button("attack", tries=50):
+            if ImageUtils.wait_for_button("attack", timeout = 15.0):
                 Log.print_message(f"[Combat] Enemy Animation finish")
             else:
                 return False
         else:
             # this can be improve by checking togther with attack button
-            if ImageUtils.find_button("semi_auto_enabled", tries=50):
+            if ImageUtils.wait_for_button("semi_auto_enabled", timeout = 15.0):
                 Log.print_message(f"[Combat] Semi Auto successfully start")
-                ImageUtils.find_button("heal_disabled", tries=100)
+                ImageUtils.wait_for_button("heal_disabled", timeout = 30.0)
                 Log.print_message(f"[Combat] attacked in Semi Auto ")
                 sleep(random.uniform(0.1,1))
             else:
@@ -403,6 +402,9 @@ class CombatModeV2:
         for action in CombatModeV2.actions[action_start_idx:]:
             action[0](**action[1])
 
+        if Settings.debug_mode:
+            ImageUtils.print_change_detector_statistics()
+
         Log.print_message("\n######################################################################")
         Log.print_message("######################################################################")
         Log.print_message("[COMBAT] Ending Combat Mode.")
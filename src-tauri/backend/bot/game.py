@@ -2,16 +2,23 @@ import multiprocessing
 import random
 import time
 import traceback
-from typing import List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
+import numpy
 import pyautogui
 
 # The order of the following imports matter to avoid circular import error.
 from utils.settings import Settings
 from utils.message_log import MessageLog
-from utils import discord_utils
 from utils.image_utils import ImageUtils
 from utils.mouse_utils import MouseUtils
+from utils.template_cache import TemplateCache
+from utils.capture import CaptureDaemon
+from utils.startup_profiler import StartupProfiler
+from utils.latency_model import LatencyModel
+from utils.calibration_cache import CalibrationCache
+from utils.item_catalog import ItemCatalog
 # Imports for all the supported game modes.
 from bot.game_modes.arcarum import Arcarum
 from bot.game_modes.arcarum_sandbox import ArcarumSandbox
@@ -37,6 +44,26 @@ class Game:
     _discord_process = None
     _discord_queue = multiprocessing.Queue()
 
+    # Single worker that detects the items in captured Loot Collected screens in the order they were captured while the bot moves on to the next run. Each pending
+    # entry keeps the capture and the arguments for Game._report_loot() so that the counts are only updated and reported on the main thread.
+    _loot_executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers = 1, thread_name_prefix = "LootWorker")
+    _pending_loot: List[Tuple[Future, numpy.ndarray, Tuple]] = []
+
+    # Location of the back button on the bottom bar that the static window was calibrated from, used to tell if the window was moved since.
+    _home_back_location: Tuple[int, int] = None
+
+    # Largest amount of items that a single run has dropped so far, used to tell if the runs still being processed by the loot worker could finish farming.
+    _max_amount_per_run: int = 0
+
+    # Buttons that have several alternative images. The first image is used for the dimensions of the click.
+    _button_alternatives = {
+        "quest": ["quest_blue", "quest_red"],
+        "raid": ["raid_flat", "raid_bouncing"],
+        "coop_start": ["coop_start_flat", "coop_start_faded"],
+        "event_special_quest": ["event_special_quest", "event_special_quest_flat", "event_special_quest_bouncing"],
+        "quick_summon": ["quick_summon1", "quick_summon2"]
+    }
+
     def __init__(self):
         super().__init__()
 
@@ -50,25 +77,68 @@ class Game:
         Returns:
             None
         """
-        # Save the location of the "Home" button at the bottom of the bot window.
-        Settings.home_button_location = ImageUtils.find_button("home", bypass_general_adjustment = True, tries = 1)
+        # Look for the buttons only where they were found the last time on this display layout before scanning the whole screen for them.
+        layout = CalibrationCache.get_layout_key("v1")
+        cached_locations = CalibrationCache.get(layout) if Settings.enable_calibration_cache else None
+        home_back_button = None
+        if cached_locations is not None:
+            Settings.home_button_location = ImageUtils.find_button_near("home", tuple(cached_locations["home"]))
+            if Settings.home_button_location is not None:
+                home_back_button = ImageUtils.find_button_near("home_back", tuple(cached_locations["home_back"]))
 
-        MessageLog.print_message("\n[INFO] Recalibrating the dimensions of the window...")
+        if home_back_button is None:
+            # Save the location of the "Home" button at the bottom of the bot window.
+            Settings.home_button_location = ImageUtils.find_button("home", bypass_general_adjustment = True, tries = 1)
 
-        if Settings.home_button_location is None:
-            raise RuntimeError("Calibration of window dimensions failed. Is the Home button on the bottom bar visible?")
+            MessageLog.print_message("\n[INFO] Recalibrating the dimensions of the window...")
 
-        # Set the dimensions of the bot window and save it in ImageUtils so that future operations do not go out of bounds.
-        home_back_button = ImageUtils.find_button("home_back")
+            if Settings.home_button_location is None:
+                raise RuntimeError("Calibration of window dimensions failed. Is the Home button on the bottom bar visible?")
 
-        if home_back_button is None:
-            raise RuntimeError("Calibration of window dimensions failed. Is the back button visible on the screen?")
+            # Set the dimensions of the bot window and save it in ImageUtils so that future operations do not go out of bounds.
+            home_back_button = ImageUtils.find_button("home_back")
 
+            if home_back_button is None:
+                raise RuntimeError("Calibration of window dimensions failed. Is the back button visible on the screen?")
+
+            CalibrationCache.put(layout, {"home": [int(value) for value in Settings.home_button_location], "home_back": [int(value) for value in home_back_button]})
+        else:
+            MessageLog.print_message("\n[INFO] The Home and back buttons are where they were last calibrated. Using the cached dimensions...")
+
+        if Settings.static_window:
+            MessageLog.print_message("[INFO] Using static window configuration...")
+        else:
+            MessageLog.print_message("[INFO] Using dynamic window configuration...")
+
+        Game._update_window_dimensions(home_back_button)
+
+        MessageLog.print_message("[SUCCESS] Dimensions of the window has been successfully recalibrated.")
+
+        if display_info_check:
+            window_dimensions = ImageUtils.get_window_dimensions()
+            MessageLog.print_message("\n**********************************************************************")
+            MessageLog.print_message("**********************************************************************")
+            MessageLog.print_message(f"[INFO] Screen Size: {pyautogui.size()}")
+            MessageLog.print_message(f"[INFO] Game Window Dimensions: Region({window_dimensions[0]}, {window_dimensions[1]}, {window_dimensions[2]}, {window_dimensions[3]})")
+            MessageLog.print_message("**********************************************************************")
+            MessageLog.print_message("**********************************************************************")
+
+        return None
+
+    @staticmethod
+    def _update_window_dimensions(home_back_button: Tuple[int, int]):
+        """Update the region of the bot window from the location of the back button on the bottom bar.
+
+        Args:
+            home_back_button (Tuple[int, int]): The location of the back button on the screen.
+
+        Returns:
+            None
+        """
         width, height = pyautogui.size()
         additional_calibration_required = Settings.static_window
 
         if Settings.static_window:
-            MessageLog.print_message("[INFO] Using static window configuration...")
             if Settings.use_first_notch:
                 window_left = home_back_button[0] - 30  # The x-coordinate of the left edge.
             else:
@@ -78,28 +148,49 @@ class Game:
                 window_width = window_left + 390  # The width of the region.
             else:
                 window_width = window_left + 500
-            window_height = pyautogui.size()[1]  # The height of the region.
+            window_height = height  # The height of the region.
         else:
-            MessageLog.print_message("[INFO] Using dynamic window configuration...")
             window_left: int = 0
             window_top: int = 0
             window_width: int = width
             window_height: int = height
 
+        Game._home_back_location = (int(home_back_button[0]), int(home_back_button[1]))
         ImageUtils.update_window_dimensions(window_left, window_top, window_width, window_height, additional_calibration_required)
 
-        MessageLog.print_message("[SUCCESS] Dimensions of the window has been successfully recalibrated.")
+        return None
 
-        if display_info_check:
-            window_dimensions = ImageUtils.get_window_dimensions()
-            MessageLog.print_message("\n**********************************************************************")
-            MessageLog.print_message("**********************************************************************")
-            MessageLog.print_message(f"[INFO] Screen Size: {pyautogui.size()}")
-            MessageLog.print_message(f"[INFO] Game Window Dimensions: Region({window_dimensions[0]}, {window_dimensions[1]}, {window_dimensions[2]}, {window_dimensions[3]})")
-            MessageLog.print_message("**********************************************************************")
-            MessageLog.print_message("**********************************************************************")
+    @staticmethod
+    def _check_static_window_drift() -> bool:
+        """Cheaply check that the back button is still where the static window was calibrated from and re-anchor the window if it was moved.
 
-        return None
+        Returns:
+            (bool): True if the window was moved and the dimensions were re-anchored.
+        """
+        # The dynamic window configuration always searches the whole screen so there is nothing that can drift.
+        if not Settings.static_window or Game._home_back_location is None:
+            return False
+
+        if ImageUtils.find_button_near("home_back", Game._home_back_location) is not None:
+            return False
+
+        # Look for the back button across the whole screen as the region of the static window may not cover where the window was moved to.
+        width, height = pyautogui.size()
+        home_back_button = ImageUtils.find_button_near("home_back", (width // 2, height // 2), radius = max(width, height))
+        if home_back_button is None:
+            # Something like a popup may be covering the bottom bar, so keep using the calibrated dimensions rather than failing in the middle of farming.
+            MessageLog.print_message("[WARNING] Could not find the back button around where it was calibrated. Keeping the calibrated dimensions...")
+            return False
+
+        # Moving a window keeps its layout, so the Home button moves along with the back button.
+        offset_x, offset_y = home_back_button[0] - Game._home_back_location[0], home_back_button[1] - Game._home_back_location[1]
+        Settings.home_button_location = (Settings.home_button_location[0] + offset_x, Settings.home_button_location[1] + offset_y)
+        Game._update_window_dimensions(home_back_button)
+        CalibrationCache.put(CalibrationCache.get_layout_key("v1"), {"home": [int(value) for value in Settings.home_button_location],
+                                                                     "home_back": [int(value) for value in home_back_button]})
+
+        MessageLog.print_message(f"[INFO] The window has moved since it was calibrated. Re-anchored to Region{ImageUtils.get_window_dimensions()}.")
+        return True
 
     @staticmethod
     def go_back_home(confirm_location_check: bool = False, display_info_check: bool = False, test_mode: bool = False):
@@ -146,6 +237,41 @@ class Game:
 
         return None
 
+    @staticmethod
+    def _start_capture_daemon():
+        """Start capturing the calibrated window and the second window if there is one in the background, or switch the background capture over to them if it is
+        already running.
+
+        Returns:
+            None
+        """
+        if ImageUtils.get_dual_capture_region() is not None:
+            regions = [ImageUtils.get_dual_capture_region()]
+        elif Window.sub_start is not None:
+            regions = [ImageUtils.get_capture_region(), ImageUtils.get_capture_region(is_sub = True)]
+        else:
+            regions = [ImageUtils.get_capture_region()]
+        CaptureDaemon.start(regions, fps = Settings.capture_daemon_fps)
+
+        return None
+
+    @staticmethod
+    def check_window_drift():
+        """Check if the windows were moved since they were calibrated and re-anchor them and the background capture if they were.
+
+        Returns:
+            None
+        """
+        if Settings.farming_mode.endswith("V2"):
+            moved = Window.check_drift()
+        else:
+            moved = Game._check_static_window_drift()
+
+        if moved and CaptureDaemon.is_running():
+            Game._start_capture_daemon()
+
+        return None
+
     @staticmethod
     def wait(seconds: float = 3.0):
         """Wait the specified seconds to account for ping or loading.
@@ -156,13 +282,53 @@ class Game:
         Returns:
             None
         """
-        if Settings.reduce_delay_seconds > 0.0:
-            if seconds - Settings.reduce_delay_seconds < 0.0:
-                time.sleep(seconds)
+        # Throttle the background capture while sleeping as nothing is looking at the screen.
+        with CaptureDaemon.idle():
+            if Settings.reduce_delay_seconds > 0.0:
+                if seconds - Settings.reduce_delay_seconds < 0.0:
+                    time.sleep(seconds)
+                else:
+                    time.sleep(seconds - Settings.reduce_delay_seconds)
             else:
-                time.sleep(seconds - Settings.reduce_delay_seconds)
-        else:
-            time.sleep(seconds)
+                time.sleep(seconds)
+        return None
+
+    @staticmethod
+    def wait_for_ui(action: str, seconds: float = 3.0):
+        """Wait for the game to respond to the action for as long as it usually takes on this host, learned from previous waits for the same action.
+
+        Until enough waits have been recorded, this still waits the whole fixed delay and only measures how long the game took. When adaptive delays are disabled,
+        this is the same as Game.wait().
+
+        Args:
+            action (str): Name of the action to learn the latency of, like "combat:next".
+            seconds (float, optional): Number of seconds to wait until the latency of the action has been learned. Defaults to 3.0.
+
+        Returns:
+            None
+        """
+        if not Settings.enable_adaptive_delays:
+            return Game.wait(seconds)
+
+        fixed_delay = seconds - Settings.reduce_delay_seconds if 0.0 < Settings.reduce_delay_seconds <= seconds else seconds
+        is_learned = LatencyModel.has_enough_samples(action)
+
+        # Wait for the screen to settle rather than for a button to appear, as a button can already be visible while the page is still scrolling or loading. A screen
+        # that keeps animating never settles, so the learned wait is never longer than the default.
+        timeout = LatencyModel.get_delay(action, fixed_delay, max_delay = fixed_delay)
+        elapsed, responded = ImageUtils.wait_for_settle(timeout)
+
+        # A wait that ran into the timeout without the screen settling is not a measured latency, so it is not learned from.
+        if responded:
+            LatencyModel.record(action, elapsed)
+
+        if not is_learned and elapsed < fixed_delay:
+            with CaptureDaemon.idle():
+                time.sleep(fixed_delay - elapsed)
+
+        if Settings.debug_mode:
+            MessageLog.print_message(f"[DEBUG] UI {'responded' if responded else 'did not respond'} to {action} in {elapsed:.3f} seconds out of {timeout:.3f} seconds.")
+
         return None
 
     @staticmethod
@@ -187,91 +353,31 @@ class Game:
         if Settings.debug_mode:
             MessageLog.print_message(f"\n[DEBUG] Attempting to find and click the button: \"{button_name}\".")
 
-        if tries == 0:
-            if button_name.lower() == "quest":
-                temp_location = ImageUtils.find_button("quest_blue", custom_confidence = custom_confidence)
-                if temp_location is None:
-                    temp_location = ImageUtils.find_button("quest_red", custom_confidence = custom_confidence)
-
-                if temp_location is not None:
-                    MouseUtils.move_and_click_point(temp_location[0] + x_offset, temp_location[1] + y_offset, "quest_blue", mouse_clicks = clicks)
-                    return True
-            elif button_name.lower() == "raid":
-                temp_location = ImageUtils.find_button("raid_flat", custom_confidence = custom_confidence)
-                if temp_location is None:
-                    temp_location = ImageUtils.find_button("raid_bouncing", custom_confidence = custom_confidence)
-
-                if temp_location is not None:
-                    MouseUtils.move_and_click_point(temp_location[0] + x_offset, temp_location[1] + y_offset, "raid_flat", mouse_clicks = clicks)
-                    return True
-            elif button_name.lower() == "coop_start":
-                temp_location = ImageUtils.find_button("coop_start_flat", custom_confidence = custom_confidence)
-                if temp_location is None:
-                    temp_location = ImageUtils.find_button("coop_start_faded", custom_confidence = custom_confidence)
-
-                if temp_location is not None:
-                    MouseUtils.move_and_click_point(temp_location[0] + x_offset, temp_location[1] + y_offset, "coop_start_flat", mouse_clicks = clicks)
-                    return True
-            elif button_name.lower() == "event_special_quest":
-                temp_location = ImageUtils.find_button("event_special_quest", custom_confidence = custom_confidence)
-                if temp_location is None:
-                    temp_location = ImageUtils.find_button("event_special_quest_flat", custom_confidence = custom_confidence)
-                if temp_location is None:
-                    temp_location = ImageUtils.find_button("event_special_quest_bouncing", custom_confidence = custom_confidence)
-
-                if temp_location is not None:
-                    MouseUtils.move_and_click_point(temp_location[0] + x_offset, temp_location[1] + y_offset, "event_special_quest", mouse_clicks = clicks)
-                    return True
-            elif button_name.lower() == "play_again" and Settings.enable_defender and Settings.engaged_defender_battle and Settings.number_of_defeated_defenders >= Settings.number_of_defenders:
-                    return False
+        if button_name.lower() in Game._button_alternatives:
+            # Match all the alternative images of this button against the same screenshot and click whichever matched best.
+            alternatives = Game._button_alternatives[button_name.lower()]
+            if tries == 0:
+                result = ImageUtils.find_any(alternatives, custom_confidence = custom_confidence)
             else:
-                temp_location = ImageUtils.find_button(button_name.lower(), custom_confidence = custom_confidence)
-                if temp_location is not None:
-                    MouseUtils.move_and_click_point(temp_location[0] + x_offset, temp_location[1] + y_offset, button_name, mouse_clicks = clicks)
-                    return True
+                result = ImageUtils.find_any(alternatives, tries = tries, custom_confidence = custom_confidence, bypass_general_adjustment = bypass_general_adjustment)
+
+            if result is not None:
+                temp_location = result[1]
+                MouseUtils.move_and_click_point(temp_location[0] + x_offset, temp_location[1] + y_offset, alternatives[0], mouse_clicks = clicks)
+                return True
+        elif button_name.lower() == "play_again" and Settings.enable_defender and Settings.engaged_defender_battle and Settings.number_of_defeated_defenders >= Settings.number_of_defenders:
+            return False
+        elif tries == 0:
+            temp_location = ImageUtils.find_button(button_name.lower(), custom_confidence = custom_confidence)
+            if temp_location is not None:
+                MouseUtils.move_and_click_point(temp_location[0] + x_offset, temp_location[1] + y_offset, button_name, mouse_clicks = clicks)
+                return True
         else:
-            if button_name.lower() == "quest":
-                temp_location = ImageUtils.find_button("quest_blue", tries = tries, custom_confidence = custom_confidence, bypass_general_adjustment = bypass_general_adjustment)
-                if temp_location is None:
-                    temp_location = ImageUtils.find_button("quest_red", tries = tries, custom_confidence = custom_confidence, bypass_general_adjustment = bypass_general_adjustment)
-
-                if temp_location is not None:
-                    MouseUtils.move_and_click_point(temp_location[0] + x_offset, temp_location[1] + y_offset, "quest_blue", mouse_clicks = clicks)
-                    return True
-            elif button_name.lower() == "raid":
-                temp_location = ImageUtils.find_button("raid_flat", tries = tries, custom_confidence = custom_confidence, bypass_general_adjustment = bypass_general_adjustment)
-                if temp_location is None:
-                    temp_location = ImageUtils.find_button("raid_bouncing", tries = tries, custom_confidence = custom_confidence, bypass_general_adjustment = bypass_general_adjustment)
-
-                if temp_location is not None:
-                    MouseUtils.move_and_click_point(temp_location[0] + x_offset, temp_location[1] + y_offset, "raid_flat", mouse_clicks = clicks)
-                    return True
-            elif button_name.lower() == "coop_start":
-                temp_location = ImageUtils.find_button("coop_start_flat", tries = tries, custom_confidence = custom_confidence, bypass_general_adjustment = bypass_general_adjustment)
-                if temp_location is None:
-                    temp_location = ImageUtils.find_button("coop_start_faded", tries = tries, custom_confidence = custom_confidence, bypass_general_adjustment = bypass_general_adjustment)
-
-                if temp_location is not None:
-                    MouseUtils.move_and_click_point(temp_location[0] + x_offset, temp_location[1] + y_offset, "coop_start_flat", mouse_clicks = clicks)
-                    return True
-            elif button_name.lower() == "event_special_quest":
-                temp_location = ImageUtils.find_button("event_special_quest", tries = tries, custom_confidence = custom_confidence, bypass_general_adjustment = bypass_general_adjustment)
-                if temp_location is None:
-                    temp_location = ImageUtils.find_button("event_special_quest_flat", tries = tries, custom_confidence = custom_confidence, bypass_general_adjustment = bypass_general_adjustment)
-                if temp_location is None:
-                    temp_location = ImageUtils.find_button("event_special_quest_bouncing", tries = tries, custom_confidence = custom_confidence, bypass_general_adjustment = bypass_general_adjustment)
-
-                if temp_location is not None:
-                    MouseUtils.move_and_click_point(temp_location[0] + x_offset, temp_location[1] + y_offset, "event_special_quest", mouse_clicks = clicks)
-                    return True
-            elif button_name.lower() == "play_again" and Settings.enable_defender and Settings.engaged_defender_battle and Settings.number_of_defeated_defenders >= Settings.number_of_defenders:
-                    return False
-            else:
-                temp_location = ImageUtils.find_button(button_name.lower(), tries = tries, suppress_error = suppress_error, custom_confidence = custom_confidence,
-                                                       bypass_general_adjustment = bypass_general_adjustment)
-                if temp_location is not None:
-                    MouseUtils.move_and_click_point(temp_location[0] + x_offset, temp_location[1] + y_offset, button_name, mouse_clicks = clicks, custom_wait=custom_wait)
-                    return True
+            temp_location = ImageUtils.find_button(button_name.lower(), tries = tries, suppress_error = suppress_error, custom_confidence = custom_confidence,
+                                                   bypass_general_adjustment = bypass_general_adjustment)
+            if temp_location is not None:
+                MouseUtils.move_and_click_point(temp_location[0] + x_offset, temp_location[1] + y_offset, button_name, mouse_clicks = clicks, custom_wait=custom_wait)
+                return True
 
         return False
 
@@ -631,8 +737,6 @@ class Game:
         Returns:
             None
         """
-        temp_amount = 0
-
         # Close all popups until the bot reaches the Loot Collected screen.
         if skip_popup_check is False:
             loot_collection_tries = 30
@@ -654,31 +758,77 @@ class Game:
                 if Settings.debug_mode:
                     MessageLog.print_message("[DEBUG] Have not detected the Loot Collection screen yet...")
 
-        # Now that the bot is at the Loot Collected screen, detect any user-specified items.
+        # Now that the bot is at the Loot Collected screen, detect any user-specified items. If enabled, only capture the screen here and leave the detection, screenshot,
+        # API result and report to the loot worker so that the next run can start while they are being processed.
+        is_run = is_completed and not is_pending_battle and not is_event_nightmare and not is_defender and not is_herald
+        is_detecting_items = Settings.item_name != "EXP" and Settings.item_name != "Angel Halo Weapons" and Settings.item_name != "Repeated Runs"
+        if Settings.enable_async_loot_detection and is_detecting_items and (is_run or is_pending_battle) and not is_defender and not is_herald:
+            # The worker only detects the items. The counts are updated and reported back on this thread once its result is taken in.
+            frame = ImageUtils.capture_loot_frame()
+            future = Game._loot_executor.submit(ImageUtils.find_farmed_items, Game._get_tracked_items(), False, frame)
+            Game._pending_loot.append((future, frame, (is_completed, is_pending_battle, is_event_nightmare, skip_info, is_defender, is_herald, Settings.combat_elapsed_time)))
+        else:
+            Game._report_loot(is_completed, is_pending_battle, is_event_nightmare, skip_info, is_defender, is_herald, Settings.combat_elapsed_time)
+
+        return None
+
+    @staticmethod
+    def _report_loot(is_completed: bool, is_pending_battle: bool, is_event_nightmare: bool, skip_info: bool, is_defender: bool, is_herald: bool, elapsed_time: float,
+                     detected_amounts: Dict[str, int] = None, frame: numpy.ndarray = None):
+        """Detect the user-specified items on the Loot Collected screen, update the internal item count and report the results of the run.
+
+        Args:
+            is_completed (bool): Allows incrementing of number of runs completed.
+            is_pending_battle (bool): Skip the incrementation of runs attempted if this was a Pending Battle.
+            is_event_nightmare (bool): Skip the incrementation of runs attempted if this was a Event Nightmare.
+            skip_info (bool): Skip printing the information of the run.
+            is_defender (bool): Skip the incrementation of runs attempted if this was a Defender.
+            is_herald (bool): Skip the incrementation of runs attempted if this was a Herald.
+            elapsed_time (float): Elapsed time for Combat Mode from start to finish.
+            detected_amounts (Dict[str, int], optional): Amounts of each tracked item that the loot worker already detected instead of detecting them now. Defaults to None.
+            frame (numpy.ndarray, optional): Capture of the Loot Collected screen that the loot worker detected the items in. Defaults to None.
+
+        Returns:
+            None
+        """
+        temp_amount = 0
+        item_amounts: Dict[str, int] = {}
+        item_label = " + ".join(Game._get_tracked_items())
+
         if is_completed and not is_pending_battle and not is_event_nightmare and not is_defender and not is_herald:
             MessageLog.print_message("\n[INFO] Detecting if any user-specified loot dropped from this run...")
             if Settings.item_name != "EXP" and Settings.item_name != "Angel Halo Weapons" and Settings.item_name != "Repeated Runs":
-                temp_amount = ImageUtils.find_farmed_items(Settings.item_name)
+                item_amounts = Game._get_item_amounts(detected_amounts, frame)
+                temp_amount = sum(item_amounts.values())
             else:
                 temp_amount = 1
 
             Settings.amount_of_runs_finished += 1
             Settings.item_amount_farmed += temp_amount
+            Game._max_amount_per_run = max(Game._max_amount_per_run, temp_amount)
         elif is_pending_battle:
             MessageLog.print_message("\n[INFO] Detecting if any user-specified loot dropped from this pending battle...")
             if Settings.item_name != "EXP" and Settings.item_name != "Angel Halo Weapons" and Settings.item_name != "Repeated Runs":
-                temp_amount = ImageUtils.find_farmed_items(Settings.item_name)
+                item_amounts = Game._get_item_amounts(detected_amounts, frame)
+                temp_amount = sum(item_amounts.values())
             else:
                 temp_amount = 0
 
             Settings.item_amount_farmed += temp_amount
+            Game._max_amount_per_run = max(Game._max_amount_per_run, temp_amount)
+
+        for item_name, amount in item_amounts.items():
+            Settings.item_amounts_farmed[item_name] = Settings.item_amounts_farmed.get(item_name, 0) + amount
 
         # If there were item drops detected and the user opt in to sending their result to Granblue Automation Statistics, then have the frontend send the API request.
         if temp_amount != 0 and Settings.enable_opt_in_api:
             if is_pending_battle:
-                Game._send_api_result(temp_amount, 0.0)
-            else:
-                Game._send_api_result(temp_amount, Settings.combat_elapsed_time)
+                elapsed_time = 0.0
+
+            # Send a separate result for every item that dropped.
+            for item_name, amount in (item_amounts.items() if len(item_amounts) != 0 else [(Settings.item_name, temp_amount)]):
+                if amount != 0:
+                    Game._send_api_result(amount, elapsed_time, item_name = item_name)
 
         if is_completed and not is_pending_battle and not is_event_nightmare and not skip_info and not is_defender and not is_herald:
             if Settings.item_name != "EXP" and Settings.item_name != "Angel Halo Weapons" and Settings.item_name != "Repeated Runs":
@@ -687,18 +837,21 @@ class Game:
                 MessageLog.print_message(f"[FARM] Farming Mode: {Settings.farming_mode}")
                 MessageLog.print_message(f"[FARM] Mission: {Settings.mission_name}")
                 MessageLog.print_message(f"[FARM] Summons: {Settings.summon_list}")
-                MessageLog.print_message(f"[FARM] Amount of {Settings.item_name} gained from this run: {temp_amount}")
-                MessageLog.print_message(f"[FARM] Amount of {Settings.item_name} gained in total: {Settings.item_amount_farmed} / {Settings.item_amount_to_farm}")
+                MessageLog.print_message(f"[FARM] Amount of {item_label} gained from this run: {temp_amount}")
+                MessageLog.print_message(f"[FARM] Amount of {item_label} gained in total: {Settings.item_amount_farmed} / {Settings.item_amount_to_farm}")
+                if len(item_amounts) > 1:
+                    for item_name, amount in item_amounts.items():
+                        MessageLog.print_message(f"[FARM] - {item_name}: {amount} from this run, {Settings.item_amounts_farmed[item_name]} in total")
                 MessageLog.print_message(f"[FARM] Amount of runs completed: {Settings.amount_of_runs_finished}")
                 MessageLog.print_message("**********************************************************************")
                 MessageLog.print_message("**********************************************************************\n")
 
                 if temp_amount != 0:
                     if Settings.item_amount_farmed >= Settings.item_amount_to_farm:
-                        discord_string = f"> {temp_amount}x __{Settings.item_name}__ gained from this run: **[{Settings.item_amount_farmed - temp_amount} / {Settings.item_amount_to_farm}]** -> " \
+                        discord_string = f"> {temp_amount}x __{item_label}__ gained from this run: **[{Settings.item_amount_farmed - temp_amount} / {Settings.item_amount_to_farm}]** -> " \
                                          f"**[{Settings.item_amount_farmed} / {Settings.item_amount_to_farm}]** :white_check_mark:"
                     else:
-                        discord_string = f"> {temp_amount}x __{Settings.item_name}__ gained from this run: **[{Settings.item_amount_farmed - temp_amount} / {Settings.item_amount_to_farm}]** -> " \
+                        discord_string = f"> {temp_amount}x __{item_label}__ gained from this run: **[{Settings.item_amount_farmed - temp_amount} / {Settings.item_amount_to_farm}]** -> " \
                                          f"**[{Settings.item_amount_farmed} / {Settings.item_amount_to_farm}]**"
 
                     Game._discord_queue.put(discord_string)
@@ -727,18 +880,21 @@ class Game:
                 MessageLog.print_message(f"[FARM] Farming Mode: {Settings.farming_mode}")
                 MessageLog.print_message(f"[FARM] Mission: {Settings.mission_name}")
                 MessageLog.print_message(f"[FARM] Summons: {Settings.summon_list}")
-                MessageLog.print_message(f"[FARM] Amount of {Settings.item_name} gained from this pending battle: {temp_amount}")
-                MessageLog.print_message(f"[FARM] Amount of {Settings.item_name} gained in total: {Settings.item_amount_farmed} / {Settings.item_amount_to_farm}")
+                MessageLog.print_message(f"[FARM] Amount of {item_label} gained from this pending battle: {temp_amount}")
+                MessageLog.print_message(f"[FARM] Amount of {item_label} gained in total: {Settings.item_amount_farmed} / {Settings.item_amount_to_farm}")
+                if len(item_amounts) > 1:
+                    for item_name, amount in item_amounts.items():
+                        MessageLog.print_message(f"[FARM] - {item_name}: {amount} from this pending battle, {Settings.item_amounts_farmed[item_name]} in total")
                 MessageLog.print_message(f"[FARM] Amount of runs completed: {Settings.amount_of_runs_finished}")
                 MessageLog.print_message("**********************************************************************")
                 MessageLog.print_message("**********************************************************************\n")
 
                 if temp_amount != 0:
                     if Settings.item_amount_farmed >= Settings.item_amount_to_farm:
-                        discord_string = f"> {temp_amount}x __{Settings.item_name}__ gained from this pending battle: **[{Settings.item_amount_farmed - temp_amount} / {Settings.item_amount_to_farm}]** -> " \
+                        discord_string = f"> {temp_amount}x __{item_label}__ gained from this pending battle: **[{Settings.item_amount_farmed - temp_amount} / {Settings.item_amount_to_farm}]** -> " \
                                          f"**[{Settings.item_amount_farmed} / {Settings.item_amount_to_farm}]** :white_check_mark:"
                     else:
-                        discord_string = f"> {temp_amount}x __{Settings.item_name}__ gained from this pending battle: **[{Settings.item_amount_farmed - temp_amount} / {Settings.item_amount_to_farm}]** -> " \
+                        discord_string = f"> {temp_amount}x __{item_label}__ gained from this pending battle: **[{Settings.item_amount_farmed - temp_amount} / {Settings.item_amount_to_farm}]** -> " \
                                          f"**[{Settings.item_amount_farmed} / {Settings.item_amount_to_farm}]**"
 
                     Game._discord_queue.put(discord_string)
@@ -921,6 +1077,9 @@ class Game:
         """
         if Settings.enable_discord and Settings.discord_token != "" and Settings.user_id != 0:
             MessageLog.print_message("\n[DISCORD] Starting Discord process on a new Thread...")
+
+            # Only pay for importing discord.py when the Discord process is actually going to run.
+            from utils import discord_utils
             Game._discord_process = multiprocessing.Process(target = discord_utils.start_now, args = (Settings.discord_token, Settings.user_id, Game._discord_queue))
             Game._discord_process.start()
         else:
@@ -948,12 +1107,87 @@ class Game:
         return None
 
     @staticmethod
-    def _send_api_result(amount: int, elapsed_time: float):
+    def _get_item_amounts(detected_amounts: Optional[Dict[str, int]], frame: Optional[numpy.ndarray]) -> Dict[str, int]:
+        """Get the amounts of the tracked items on the Loot Collected screen, detecting them now if the loot worker did not already.
+
+        Args:
+            detected_amounts (Optional[Dict[str, int]]): Amounts of each tracked item that the loot worker detected or None to detect them now.
+            frame (Optional[numpy.ndarray]): Capture of the Loot Collected screen that the loot worker detected the items in.
+
+        Returns:
+            (Dict[str, int]): The amount gained for each tracked item.
+        """
+        if detected_amounts is None:
+            return ImageUtils.find_farmed_items(Game._get_tracked_items())
+
+        # The loot worker skips the screenshot so that it is taken here along with the rest of the report.
+        if sum(detected_amounts.values()) != 0:
+            ImageUtils.save_loot_screenshot(frame)
+
+        return detected_amounts
+
+    @staticmethod
+    def _take_loot_result():
+        """Take in the oldest result from the loot worker and update the internal item count and report the results of its run on this thread.
+
+        Returns:
+            None
+        """
+        future, frame, report_args = Game._pending_loot.pop(0)
+
+        # Raise any exception from the worker here the same way it would have been raised inside collect_loot().
+        Game._report_loot(*report_args, detected_amounts = future.result(), frame = frame)
+
+        return None
+
+    @staticmethod
+    def wait_for_loot_results():
+        """Wait for the loot worker to finish every Loot Collected screen handed to it so that the item counts are up to date.
+
+        Returns:
+            None
+        """
+        while len(Game._pending_loot) != 0:
+            Game._take_loot_result()
+
+        return None
+
+    @staticmethod
+    def _loot_could_reach_target() -> bool:
+        """Check if the runs that the loot worker is still processing could drop enough items to reach the amount to farm.
+
+        Each pending run is assumed to drop at most as many items as the best run so far, or 1 if nothing has dropped yet. A run that drops more than that can still
+        make the bot start one more run than needed.
+
+        Returns:
+            (bool): True if the bot should wait for the loot worker before deciding whether to keep farming.
+        """
+        # Take in the results that are already done, raising any exception from the worker.
+        while len(Game._pending_loot) != 0 and Game._pending_loot[0][0].done():
+            Game._take_loot_result()
+
+        if len(Game._pending_loot) == 0:
+            return False
+
+        return Settings.item_amount_farmed + len(Game._pending_loot) * max(1, Game._max_amount_per_run) >= Settings.item_amount_to_farm
+
+    @staticmethod
+    def _get_tracked_items() -> List[str]:
+        """Get the items to tally from the Loot Collected screen, which are the item being farmed followed by any extra items.
+
+        Returns:
+            (List[str]): The names of the tracked items without duplicates.
+        """
+        return list(dict.fromkeys([Settings.item_name] + Settings.extra_items))
+
+    @staticmethod
+    def _send_api_result(amount: int, elapsed_time: float, item_name: str = None):
         """Prints a formatted message as a way to send the event back to the frontend in order to have it send the result to the database.
 
         Args:
             amount (int): Amount of items detected for this run.
             elapsed_time (str): Elapsed time for Combat Mode from start to finish.
+            item_name (str, optional): Name of the detected item. Defaults to Settings.item_name.
 
         Returns:
             None
@@ -964,7 +1198,7 @@ class Game:
             formatted_elapsed_time = str(datetime.timedelta(seconds = elapsed_time)).split('.')[0]
 
         MessageLog.print_message(f"\nSending API request to Granblue Automation Statistics...")
-        MessageLog.print_message(f"API-RESULT|{Settings.item_name}|{amount}|{formatted_elapsed_time}")
+        MessageLog.print_message(f"API-RESULT|{item_name or Settings.item_name}|{amount}|{formatted_elapsed_time}")
         return None
 
     @staticmethod
@@ -982,18 +1216,34 @@ class Game:
                 Game.go_back_home(confirm_location_check = True, test_mode = True)
                 return True
 
+            StartupProfiler.mark("Reached window calibration")
+            StartupProfiler.print_report()
+            StartupProfiler.uninstall()
+
             # Calibrate the dimensions of the bot window on bot launch.
             if Settings.farming_mode.endswith("V2"):
                 Window.calibrate()
             else:
                 Game._calibrate_game_window(display_info_check = True)
 
+            # Load the EasyOCR models in the background while the bot gets to its first loot check.
+            if Settings.enable_ocr_warm_up:
+                ImageUtils.warm_up_ocr_reader()
+
+            # Start capturing the calibrated window (and the second window if there is one) in the background.
+            if Settings.enable_capture_daemon:
+                Game._start_capture_daemon()
+
+            # Check that every tracked item can be detected before the first Loot Collected screen and stop tallying the ones that can not.
+            if Settings.item_name != "EXP" and Settings.item_name != "Angel Halo Weapons" and Settings.item_name != "Repeated Runs":
+                ItemCatalog.get_known_items([Settings.item_name])
+                Settings.extra_items = ItemCatalog.get_known_items(Settings.extra_items)
 
             if Settings.item_name != "EXP":
                 MessageLog.print_message("\n######################################################################")
                 MessageLog.print_message("######################################################################")
                 MessageLog.print_message(f"[FARM] Starting Farming Mode for {Settings.farming_mode}.")
-                MessageLog.print_message(f"[FARM] Farming {Settings.item_amount_to_farm}x {Settings.item_name} at {Settings.mission_name}.")
+                MessageLog.print_message(f"[FARM] Farming {Settings.item_amount_to_farm}x {' + '.join(Game._get_tracked_items())} at {Settings.mission_name}.")
                 MessageLog.print_message(f"[FARM] Combat Script name: {Settings.combat_script_name}")
                 MessageLog.print_message(f"[FARM] Combat Script: {Settings.combat_script}")
                 MessageLog.print_message(f"[FARM] Summons: {Settings.summon_list}")
@@ -1016,6 +1266,9 @@ class Game:
 
             first_run = True
             while Settings.item_amount_farmed < Settings.item_amount_to_farm:
+                if not first_run:
+                    Game.check_window_drift()
+
                 if Settings.farming_mode == "Quest":
                     Quest.start(first_run)
                 elif Settings.farming_mode == "Special":
@@ -1044,6 +1297,10 @@ class Game:
                     GenericV2.start()
                     break
 
+                # Only wait for the loot worker if the runs it is still processing could finish farming. Otherwise, the next run starts while it keeps working.
+                if Game._loot_could_reach_target():
+                    Game.wait_for_loot_results()
+
                 if Settings.item_amount_farmed < Settings.item_amount_to_farm:
                     # Generate a resting period if the user enabled it.
                     Game._delay_between_runs()
@@ -1056,8 +1313,28 @@ class Game:
             MessageLog.print_message(f"\n[ERROR] Bot encountered exception in Farming Mode: \n{traceback.format_exc()}")
             ImageUtils.generate_alert(f"Bot encountered exception in Farming Mode: \n{e}")
 
+        # Reconcile the item counts with any loot that the worker has not finished processing yet before stopping.
+        try:
+            Game.wait_for_loot_results()
+        except Exception as e:
+            MessageLog.print_message(f"\n[ERROR] Failed to process the loot of the last run: \n{e}")
+        if Settings.enable_async_loot_detection:
+            MessageLog.print_message(f"\n[INFO] Item counts after reconciling all loot results: {Settings.item_amount_farmed} / {Settings.item_amount_to_farm}")
+
         Game.stop_discord_process()
 
+        # Keep what was learned about the latency of the game for the next session.
+        LatencyModel.save()
+
+        if Settings.debug_mode:
+            TemplateCache.print_statistics()
+            ImageUtils.print_settle_statistics()
+            LatencyModel.print_statistics()
+            if CaptureDaemon.is_running():
+                CaptureDaemon.print_statistics()
+
+        CaptureDaemon.stop()
+
         if exception_occurred:
             MessageLog.print_message("\n######################################################################")
             MessageLog.print_message("######################################################################")
@@ -864,7 +864,7 @@ class ArcarumSandbox:
 
         MouseUtils.scroll_screen_from_home_button(-300)
 
-        Game.wait(1.0)
+        Game.wait_for_ui("scroll", 1.0)
         # If there is no Defender, then the first action is the mission itself. Else, it is the second action.
         action_locations: List[Tuple[int, ...]] = ImageUtils.find_all("arcarum_sandbox_action")
         #if len(action_locations) == 1:
@@ -931,7 +931,7 @@ class ArcarumSandbox:
 
             ArcarumSandbox._first_run = False
         else:
-            Game.wait(4.0)
+            Game.wait_for_ui("arcarum_sandbox:return_to_map", 4.0)
 
         # If the bot is not at Replicard Sandbox and instead is at regular Arcarum, navigate to Replicard Sandbox by clicking on its banner.
         if ImageUtils.confirm_location("arcarum_sandbox") is False:
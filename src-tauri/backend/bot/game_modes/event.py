@@ -155,7 +155,7 @@ class Event:
                 raise EventException("Failed to detect Token Drawbox layout for this Event. Are you sure this Event has Token Drawboxes? If not, switch to \"Event\" Farming Mode.")
             MouseUtils.scroll_screen_from_home_button(-200)
 
-            Game.wait(1)
+            Game.wait_for_ui("scroll", 1.0)
 
             # Select the first category if the raids are split into two sections.
             categories = ImageUtils.find_all("event_raid_category")
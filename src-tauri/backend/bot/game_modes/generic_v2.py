@@ -32,6 +32,9 @@ class GenericV2:
             if actions[-1][0] == "subback":
                 # first time
                 Log.print_message(f"[GenericV2] First run with support window")
+                if Window.sub_start == None:
+                    # The cached dimensions may be from before the support window was opened.
+                    Window.calibrate(use_cache = False)
                 if Window.sub_start == None:
                     raise RuntimeError("There are no support Window.")
 
@@ -46,6 +49,7 @@ class GenericV2:
 
                 for i in range (1, repeat):
                     Log.print_message(f"[GenericV2] Repeat for {i} times")
+                    Game.check_window_drift()
                     GenericV2.single_battle_sub_back(summon)         
                     Game._delay_between_runs()
                     if (np.random.rand() > .9):
@@ -59,6 +63,7 @@ class GenericV2:
                 for i in range (0, repeat):
 
                     Log.print_message(f"[GenericV2] Repeat for {i+1} times")
+                    Game.check_window_drift()
                     Window.goto(url)
                     
                     GenericV2.single_battle(summon)
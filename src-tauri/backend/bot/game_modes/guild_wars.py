@@ -67,7 +67,7 @@ class GuildWars:
             # Scroll the screen down a little bit.
             MouseUtils.scroll_screen_from_home_button(-200)
 
-            Game.wait(3.0)
+            Game.wait_for_ui("scroll", 3.0)
 
             raid_battle_locations = ImageUtils.find_all("event_raid_battle")
 
@@ -144,6 +144,7 @@ class ProvingGrounds:
                         Game.collect_loot(is_completed = True, skip_popup_check = True)
 
                         # Reset the First Time flag so the bot can select a Summon and select the Mission again.
+                        Game.wait_for_loot_results()
                         if Settings.item_amount_farmed < Settings.item_amount_to_farm:
                             ProvingGrounds._first_time = True
                     else:
@@ -657,7 +657,7 @@ class Quest:
                     raise QuestException("Cannot find the mission location after scrolling down the Quest screen multiple times.")
 
                 MouseUtils.scroll_screen(Settings.home_button_location[0], Settings.home_button_location[1] - 50, -500)
-                Game.wait(0.5)
+                Game.wait_for_ui("scroll", 0.5)
 
             # Now click on the mission node to start.
             Game.find_and_click_button("mission_" + Settings.mission_name.replace(" ", "_"))
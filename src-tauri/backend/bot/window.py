@@ -1,10 +1,12 @@
 import cv2
 from PIL import Image
-from typing import List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from utils.settings import Settings
-from pyautogui import size as get_screen_size, hold, screenshot, click , press
+from pyautogui import size as get_screen_size, hold, click , press
 import pyautogui as pya
 from utils.message_log import MessageLog as Log
+from utils.capture import Capture
+from utils.calibration_cache import CalibrationCache
 from utils.mouse_utils import MouseUtils as mouse
 from time import sleep
 from pyperclip import paste, copy
@@ -22,6 +24,9 @@ class Window():
     sub_width: int = None
     sub_height: int = None
 
+    # The (left, top, width, height) of every calibrated window from left to right. The first two are also the main and sub windows above.
+    windows: List[Tuple[int, int, int, int]] = []
+
     BROWSER_TOP_COLOR = (53, 54, 58)
     calibration_complete: bool = False
     additional_calibration_required: bool = False
@@ -50,6 +55,9 @@ class Window():
             sleep(.03)
             press('enter')
 
+        from utils.image_utils import ImageUtils
+        ImageUtils.invalidate_frame()
+
     @staticmethod
     def sub_prepare_loot() -> None:
         """ prepare the support window to be ready to claim loot
@@ -70,12 +78,43 @@ class Window():
         sleep(np.random.uniform(0.04,0.15))
         pya.keyUp('f5')
 
+        from utils.image_utils import ImageUtils
+        ImageUtils.invalidate_frame()
+
     @staticmethod
-    def calibrate(display_info_check: bool = False) -> None:
-        """Calibrate the game window for fast and accurate image matching.
+    def _find_browser_tops(img: np.ndarray, columns: List[int], bottoms: List[int]) -> List[Optional[int]]:
+        """Find the top edge of every window at once by looking up each given column of the screenshot for 3 pixels in a row with the color of the browser above
+        the page.
 
         Args:
-            display_info_check: Displays the screen size and the dimensions of the bot window.
+            img: The RGB screenshot of the whole screen.
+            columns: The x-coordinate of the column to look up in for every window.
+            bottoms: The y-coordinate to start looking up from for every window.
+
+        Returns:
+            The y-coordinate of the top edge of every window or None for the windows without the browser color above them.
+        """
+        # Keep the columns inside of the screenshot, as a window at the left edge of the screen would otherwise give a negative column that wraps around to the right.
+        columns = np.clip(np.asarray(columns, dtype = int), 0, img.shape[1] - 1)
+
+        # Compare the needed columns of every window against the color in one pass. Row j is a hit when rows j, j - 1 and j - 2 all have the color.
+        is_color = np.all(img[:, columns, :3] == Window.BROWSER_TOP_COLOR, axis = 2)
+        hits = np.zeros_like(is_color)
+        hits[2:] = is_color[2:] & is_color[1:-1] & is_color[:-2]
+
+        # Only keep the rows from the bottom of each window up to row 4, the same rows the search used to walk through, and take the lowest hit of every column.
+        rows = np.arange(is_color.shape[0])[:, None]
+        hits &= (rows >= 4) & (rows <= np.asarray(bottoms)[None, :])
+        lowest_hits = is_color.shape[0] - 1 - np.argmax(hits[::-1], axis = 0)
+
+        return [int(lowest_hits[index]) + 1 if hits[:, index].any() else None for index in range(len(columns))]
+
+    @staticmethod
+    def _calibrate_from_screen() -> List[Tuple[int, int, int, int]]:
+        """Find every window by scanning the whole screen for the calibration buttons at both ends of their bottom bars.
+
+        Returns:
+            The (left, top, width, height) of every window from left to right.
         """
         from utils.image_utils import ImageUtils
 
@@ -85,64 +124,204 @@ class Window():
         calibration_left = sorted(ImageUtils.find_all("calibration_left", hide_info=True))
         calibration_right = sorted(ImageUtils.find_all("calibration_right", hide_info=True))
         
-        if len(calibration_right) != len(calibration_left):
-            raise RuntimeError(
-                "Calibration of window dimensions failed. Some window is partially visible")
         if len(calibration_right) == 0:
             raise RuntimeError(
                 "Calibration of window dimensions failed. Is the Home button on the bottom bar visible?")
         if len(calibration_left) == 0:
             raise RuntimeError(
                 "Calibration of window dimensions failed. Is the back button visible on the screen?")
-        if len(calibration_right) > 2:
+        if len(calibration_right) != len(calibration_left):
             raise RuntimeError(
-                "Calibration of window dimensions failed. maximum window is 2")
+                "Calibration of window dimensions failed. Some window is partially visible")
         # Save the location of the "Home" button at the bottom of the bot window.
         Settings.home_button_location = home_bttn_coords[0]
         screen_w, screen_h = get_screen_size()
 
         if not Settings.static_window:
             Log.print_message("[WARNING] V2 must use static window, ignoring settings and proceding...")
-        
-        calibraion_window = list(zip(calibration_left, calibration_right))
-
-        img = screenshot(region=(0,0, screen_w, screen_h))
 
         left_width, bar_height = ImageUtils.get_button_dimensions("calibration_left")
         right_width, _ = ImageUtils.get_button_dimensions("calibration_right")
-        for win_idx, win in enumerate(calibraion_window):
-            # get back the top right coordinates
-            (left_x, left_y), (right_x, _) = win
+
+        # Pair every left end of a bottom bar with the closest right end on the same row, so windows stacked on top of each other are paired correctly too.
+        calibraion_window = []
+        unpaired_right = list(calibration_right)
+        for left_x, left_y in calibration_left:
+            candidates = [right for right in unpaired_right if abs(right[1] - left_y) <= bar_height // 2 and right[0] > left_x]
+            if len(candidates) == 0:
+                raise RuntimeError(
+                    "Calibration of window dimensions failed. Some window is partially visible")
+            right = min(candidates)
+            unpaired_right.remove(right)
+            calibraion_window.append(((left_x, left_y), right))
+
+        img = Capture.grab(region=(0,0, screen_w, screen_h))
+
+        # get back the top left coordinates
+        columns = [left_x - left_width//2 + 2 for (left_x, _), _ in calibraion_window]
+        bottoms = [left_y - bar_height//2 for (_, left_y), _ in calibraion_window]
+        tops = Window._find_browser_tops(img, columns, bottoms)
+
+        windows = []
+        for ((left_x, left_y), (right_x, _)), top in zip(calibraion_window, tops):
+            if top is None:
+                raise RuntimeError("Cannot find consecutive color pixels on the top of browser!")
+
             left_x -= left_width//2
             left_y -= bar_height//2
             right_x -= right_width//2
-            # serach up to find color
-            for j in range (left_y, 3, -1):
-                # check if there are 3 consecutive pixel that match the color of browser top
-                if img.getpixel((left_x+2, j)) == img.getpixel((left_x+2, j-1))\
-                    == img.getpixel((left_x+2, j-2)) == Window.BROWSER_TOP_COLOR:
-
-                    if win_idx==0:
-                        Window.start = left_x
-                        Window.top = j+1
-                        Window.width = right_x + right_width - Window.start
-                        Window.height = left_y + bar_height - Window.top
-                    else:
-                        Window.sub_start = left_x 
-                        Window.sub_top = j+1
-                        Window.sub_width = right_x + right_width - Window.sub_start
-                        Window.sub_height = left_y + bar_height - Window.sub_top
-                    break
-            else:
-                raise RuntimeError("Cannot find consecutive color pixels on the top of browser!")
-            
+            windows.append((left_x, top, right_x + right_width - left_x, left_y + bar_height - top))
+
+        if len(windows) > 2:
+            Log.print_message(f"[INFO] Found {len(windows)} windows. The first two are used as the main and sub windows.")
+
+        return windows
+
+    @staticmethod
+    def _get_geometry() -> Dict[str, Any]:
+        """Get the calibrated geometry of the windows to cache.
+
+        Returns:
+            (Dict[str, Any]): The (left, top, width, height) of every window and the location of the Home button relative to the main window.
+        """
+        return {
+            "windows": [list(window) for window in Window.windows],
+            "home": [Settings.home_button_location[0] - Window.start, Settings.home_button_location[1] - Window.top]
+        }
+
+    @staticmethod
+    def _apply_geometry(geometry: Dict[str, Any]) -> None:
+        """Use the given geometry as the dimensions of the windows.
+
+        Args:
+            geometry: The geometry from Window._get_geometry().
+        """
+        from utils.image_utils import ImageUtils
+
+        Window.windows = [tuple(window) for window in geometry["windows"]]
+        Window.start, Window.top, Window.width, Window.height = Window.windows[0]
+        Window.sub_start, Window.sub_top, Window.sub_width, Window.sub_height = Window.windows[1] if len(Window.windows) > 1 else (None, None, None, None)
+        Settings.home_button_location = (Window.start + geometry["home"][0], Window.top + geometry["home"][1])
+
+        ImageUtils.update_window_dimensions(Window.start, Window.top, Window.width, Window.height)
+        ImageUtils.invalidate_frame()
+
+    @staticmethod
+    def _verify_window(region: List[int], radius: int = 2) -> bool:
+        """Check that a window is still at the given region by looking for the calibration buttons at both ends of its bottom bar and the browser color above it.
+        Only the small areas where they are expected are captured.
+
+        Args:
+            region: The (left, top, width, height) of the window.
+            radius: Number of pixels the calibration buttons are allowed to be away from where they are expected.
+
+        Returns:
+            True if the window is at the region.
+        """
+        from utils.image_utils import ImageUtils
+
+        left, top, width, height = region
+        if top < 3:
+            return False
+
+        left_width, bar_height = ImageUtils.get_button_dimensions("calibration_left")
+        right_width, _ = ImageUtils.get_button_dimensions("calibration_right")
+        bar_y = top + height - bar_height + bar_height // 2
+        if ImageUtils.find_button_near("calibration_left", (left + left_width // 2, bar_y), radius = radius) is None:
+            return False
+        if ImageUtils.find_button_near("calibration_right", (left + width - right_width + right_width // 2, bar_y), radius = radius) is None:
+            return False
+
+        # The same 3 pixels above the window that the full calibration searched for.
+        pixels = Capture.grab((left + 2, top - 3, 1, 3))
+        return all(tuple(int(channel) for channel in pixel[:3]) == Window.BROWSER_TOP_COLOR for pixel in pixels[:, 0])
+
+    @staticmethod
+    def _verify_geometry(geometry: Dict[str, Any]) -> bool:
+        """Check that every window is still where the geometry says it is.
+
+        Args:
+            geometry: The geometry from Window._get_geometry().
+
+        Returns:
+            True if every window is where it was calibrated.
+        """
+        return len(geometry.get("windows", [])) != 0 and all(Window._verify_window(window) for window in geometry["windows"])
+
+    @staticmethod
+    def _reanchor_window(region: List[int], radius: int = 300) -> Optional[List[int]]:
+        """Find where a window moved to by looking for the calibration button at the left end of its bottom bar around where it used to be.
+
+        Args:
+            region: The (left, top, width, height) of the window before it moved.
+            radius: Number of pixels around the old location to look in.
+
+        Returns:
+            The (left, top, width, height) of the window after it moved or None if it could not be found.
+        """
+        from utils.image_utils import ImageUtils
+
+        left, top, width, height = region
+        left_width, bar_height = ImageUtils.get_button_dimensions("calibration_left")
+        expected = (left + left_width // 2, top + height - bar_height + bar_height // 2)
+        location = ImageUtils.find_button_near("calibration_left", expected, radius = radius)
+        if location is None:
+            return None
+
+        # Moving a window keeps its size, so the whole region moves along with the button.
+        moved = [left + location[0] - expected[0], top + location[1] - expected[1], width, height]
+        return moved if Window._verify_window(moved) else None
+
+    @staticmethod
+    def check_drift() -> bool:
+        """Cheaply check that the windows are still where they were calibrated and re-anchor them if they were moved, without a full calibration.
+
+        Returns:
+            True if a window was moved and the dimensions were re-anchored.
+        """
+        if Window.start is None or Settings.home_button_location is None:
+            return False
+
+        geometry = Window._get_geometry()
+        if Window._verify_geometry(geometry):
+            return False
+
+        moved = dict(geometry, windows = [])
+        for index, window in enumerate(geometry["windows"]):
+            if not Window._verify_window(window):
+                window = Window._reanchor_window(window)
+                if window is None:
+                    # Something like a popup may be covering the bottom bar, so keep using the calibrated dimensions rather than failing in the middle of farming.
+                    Log.print_message(f"[WARNING] Could not find window #{index + 1} around where it was calibrated. Keeping the calibrated dimensions...")
+                    return False
+            moved["windows"].append(window)
+
+        Window._apply_geometry(moved)
+        CalibrationCache.put(CalibrationCache.get_layout_key("v2"), moved)
+        Log.print_message(f"[INFO] The window has moved since it was calibrated. Re-anchored to {', '.join(f'Region{window}' for window in Window.windows)}.")
+        return True
+
+    @staticmethod
+    def calibrate(display_info_check: bool = False, use_cache: bool = True) -> List[Tuple[int, int, int, int]]:
+        """Calibrate the game window for fast and accurate image matching.
+
+        Args:
+            display_info_check: Displays the screen size and the dimensions of the bot window.
+            use_cache: Verify the geometry cached for this display layout first and only scan the whole screen if the windows are not there anymore.
+
+        Returns:
+            The (left, top, width, height) of every window from left to right.
+        """
+        layout = CalibrationCache.get_layout_key("v2")
+        geometry = CalibrationCache.get(layout) if use_cache and Settings.enable_calibration_cache else None
+        if geometry is not None and Window._verify_geometry(geometry):
+            Log.print_message("\n[INFO] The windows are where they were last calibrated. Using the cached dimensions...")
+            Window._apply_geometry(geometry)
+        else:
+            windows = Window._calibrate_from_screen()
+            Window._apply_geometry({"windows": windows, "home": [Settings.home_button_location[0] - windows[0][0], Settings.home_button_location[1] - windows[0][1]]})
+            CalibrationCache.put(layout, Window._get_geometry())
 
-        ImageUtils.update_window_dimensions(
-            Window.start,
-            Window.top,
-            Window.width,
-            Window.height)
-        
         if Window.start != None and Window.top != None and \
             Window.width != None and Window.height != None:
             Log.print_message("[SUCCESS] Dimensions of the first window has been successfully recalibrated.")
@@ -161,5 +340,9 @@ class Window():
             Log.print_message(f"[INFO] Screen Size: {get_screen_size()}")
             Log.print_message(f"[INFO] Game Window Dimensions: Region({Window.start}, {Window.top}, {Window.width}, {Window.height})")
             Log.print_message(f"[INFO] Game Sub-Window Dimensions: Region({Window.sub_start}, {Window.sub_top}, {Window.sub_width}, {Window.sub_height})")
+            for index, window in enumerate(Window.windows[2:]):
+                Log.print_message(f"[INFO] Game Window #{index + 3} Dimensions: Region{window}")
             Log.print_message("**********************************************************************")
-            Log.print_message("**********************************************************************")
\ No newline at end of file
+            Log.print_message("**********************************************************************")
+
+        return Window.windows
\ No newline at end of file
@@ -1,9 +1,18 @@
 import multiprocessing
+import sys
 import time
 
 from utils.message_log import MessageLog
+from utils.startup_profiler import StartupProfiler
+
+# Time every import of the bot from here on with "python main.py --profile-startup". This has to happen before bot.game is imported.
+if "--profile-startup" in sys.argv:
+    StartupProfiler.install()
+
 from bot.game import Game
 
+StartupProfiler.mark("Imported the bot modules")
+
 
 class MainDriver:
     """
@@ -30,7 +39,9 @@ class MainDriver:
             None
         """
         # Initialize the Game class and start Farming Mode.
+        StartupProfiler.mark("Started the bot process")
         self._game = Game()
+        StartupProfiler.mark("Initialized the Game class")
         self._game.start_farming_mode()
         return None
 
@@ -0,0 +1,14 @@
+import json
+import os
+import sys
+import tempfile
+
+# The tests import the backend modules the same way main.py does, from the backend folder.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# utils.settings reads settings.json from the working directory as soon as it is imported, but the real one is only created by the GUI. So run the tests from a
+# temporary folder with a minimal settings.json, which also keeps every cache file written during the tests out of the repository.
+_working_dir = tempfile.mkdtemp(prefix = "gaa_tests_")
+with open(f"{_working_dir}/settings.json", "w") as file:
+    json.dump({"game": {"farmingMode": "Quest", "item": "", "map": "", "mission": ""}}, file)
+os.chdir(_working_dir)
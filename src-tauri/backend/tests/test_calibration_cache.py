@@ -0,0 +1,37 @@
+import pytest
+
+from utils.calibration_cache import CalibrationCache
+
+
+@pytest.fixture(autouse = True)
+def calibration_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(CalibrationCache, "_path", str(tmp_path / "calibration_cache.json"))
+    monkeypatch.setattr(CalibrationCache, "_layouts", None)
+    yield
+
+
+def test_get_returns_none_for_uncalibrated_layout():
+    assert CalibrationCache.get("v1:1920x1080") is None
+
+
+def test_put_persists_between_sessions(monkeypatch):
+    geometry = {"home": [100, 900], "home_back": [60, 900]}
+    CalibrationCache.put("v1:1920x1080", geometry)
+
+    monkeypatch.setattr(CalibrationCache, "_layouts", None)
+    assert CalibrationCache.get("v1:1920x1080") == geometry
+    assert CalibrationCache.get("v1:2560x1440") is None
+
+
+def test_put_replaces_layout():
+    CalibrationCache.put("v2:1920x1080", {"windows": [[0, 0, 400, 800]]})
+    CalibrationCache.put("v2:1920x1080", {"windows": [[10, 0, 400, 800]]})
+
+    assert CalibrationCache.get("v2:1920x1080") == {"windows": [[10, 0, 400, 800]]}
+
+
+def test_load_ignores_invalid_file():
+    with open(CalibrationCache._path, "w") as file:
+        file.write("{")
+
+    assert CalibrationCache.get("v1:1920x1080") is None
@@ -0,0 +1,91 @@
+import cv2
+import numpy
+import pytest
+
+from utils.digit_recognizer import DigitRecognizer
+from utils.image_utils import ImageUtils
+from utils.settings import Settings
+from utils.template_cache import TemplateCache
+
+
+@pytest.fixture(autouse = True)
+def single_scale(monkeypatch):
+    monkeypatch.setattr(ImageUtils, "_custom_scale", 1.0)
+    monkeypatch.setattr(ImageUtils, "_scale_affinity", {})
+    TemplateCache.clear()
+    yield
+    TemplateCache.clear()
+
+
+def make_template(tmp_path, name: str = "item.png", seed: int = 1) -> numpy.ndarray:
+    template = numpy.random.default_rng(seed).integers(0, 256, (12, 16), dtype = numpy.uint8)
+    cv2.imwrite(str(tmp_path / name), template)
+    return template
+
+
+def make_frame(placements) -> numpy.ndarray:
+    src = numpy.random.default_rng(0).integers(0, 256, (120, 160), dtype = numpy.uint8)
+    for template, (x, y) in placements:
+        src[y:y + template.shape[0], x:x + template.shape[1]] = template
+    return src
+
+
+def test_non_max_suppression_keeps_best_of_overlapping_boxes():
+    boxes = numpy.array([[0, 0, 10, 10], [1, 1, 11, 11], [50, 50, 60, 60], [20, 0, 30, 10]])
+    scores = numpy.array([0.9, 0.95, 0.8, 0.85])
+
+    assert ImageUtils._non_max_suppression(boxes, scores, overlap = 0.3) == [1, 3, 2]
+
+
+def test_non_max_suppression_keeps_boxes_below_overlap():
+    # These boxes only share half of their width so their Intersection over Union is 1/3.
+    boxes = numpy.array([[0, 0, 10, 10], [5, 0, 15, 10]])
+    scores = numpy.array([0.9, 0.8])
+
+    assert ImageUtils._non_max_suppression(boxes, scores, overlap = 0.5) == [0, 1]
+    assert ImageUtils._non_max_suppression(boxes, scores, overlap = 0.3) == [0]
+    assert ImageUtils._non_max_suppression(numpy.empty((0, 4)), numpy.empty(0)) == []
+
+
+def test_match_all_finds_every_match_once(tmp_path):
+    template = make_template(tmp_path)
+    src = make_frame([(template, (10, 20)), (template, (100, 20)), (template, (40, 80))])
+
+    # The centers of the matches from top to bottom and then from left to right.
+    assert ImageUtils._match_all(str(tmp_path / "item.png"), confidence = 0.9, src = src) == [(18, 26), (108, 26), (48, 86)]
+
+
+def test_match_all_only_searches_the_roi(tmp_path):
+    template = make_template(tmp_path)
+    src = make_frame([(template, (10, 20)), (template, (100, 20)), (template, (40, 80))])
+
+    # Only the bottom half is searched but the locations are still inside of the whole frame.
+    assert ImageUtils._match_all(str(tmp_path / "item.png"), confidence = 0.9, src = src, roi = (0.0, 0.5, 1.0, 1.0)) == [(48, 86)]
+
+
+def test_match_all_discards_better_neighbour_matches(tmp_path):
+    template = make_template(tmp_path)
+    neighbour = template.copy()
+    neighbour[:, :2] = 255 - neighbour[:, :2]
+    cv2.imwrite(str(tmp_path / "neighbour.png"), neighbour)
+
+    # The neighbour matches the second location perfectly while the item only matches it partially.
+    src = make_frame([(template, (10, 20)), (neighbour, (100, 20))])
+
+    assert len(ImageUtils._match_all(str(tmp_path / "item.png"), confidence = 0.5, src = src)) == 2
+    assert ImageUtils._match_all(str(tmp_path / "item.png"), confidence = 0.5, neighbour_paths = [str(tmp_path / "neighbour.png")], src = src) == [(18, 26)]
+
+
+def test_match_all_returns_nothing_below_confidence(tmp_path):
+    make_template(tmp_path)
+
+    assert ImageUtils._match_all(str(tmp_path / "item.png"), confidence = 0.9, src = make_frame([])) == []
+
+
+@pytest.mark.parametrize("text, amount", [("x10", 10), ("x3", 3), ("20", 20), ("x", 1), ("", 1)])
+def test_read_item_amounts_parses_every_digit(monkeypatch, text, amount):
+    monkeypatch.setattr(Settings, "ocr_engine", "digits")
+    monkeypatch.setattr(DigitRecognizer, "is_trained", lambda: True)
+    monkeypatch.setattr(DigitRecognizer, "recognize", lambda image: text)
+
+    assert ImageUtils._read_item_amounts(numpy.zeros((120, 160), dtype = numpy.uint8), [(20, 20), (80, 60)]) == [amount, amount]
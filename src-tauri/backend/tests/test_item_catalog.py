@@ -0,0 +1,90 @@
+import json
+import logging
+
+import cv2
+import numpy
+import pytest
+
+from utils.item_catalog import ItemCatalog
+from utils.settings import Settings
+
+
+@pytest.fixture
+def items_dir(tmp_path, monkeypatch):
+    for name in ["Fire Orb", "Water Orb", "Earth Orb"]:
+        cv2.imwrite(str(tmp_path / f"{name}.jpg"), numpy.zeros((10, 10, 3), dtype = numpy.uint8))
+
+    monkeypatch.setattr(ItemCatalog, "_items_dir", str(tmp_path))
+    monkeypatch.setattr(ItemCatalog, "_manifest_path", str(tmp_path / "manifest.json"))
+    monkeypatch.setattr(ItemCatalog, "_items", None)
+    return tmp_path
+
+
+def write_manifest(items_dir, items):
+    with open(items_dir / "manifest.json", "w") as file:
+        json.dump({"items": items}, file)
+
+
+def test_every_template_gets_a_default_profile(items_dir):
+    items = ItemCatalog.get_items()
+
+    assert sorted(items.keys()) == ["Earth Orb", "Fire Orb", "Water Orb"]
+    assert items["Fire Orb"].confidence == Settings.confidence_all
+    assert items["Fire Orb"].neighbours == []
+    assert items["Fire Orb"].roi == (0.0, 0.0, 1.0, 1.0)
+    assert items["Fire Orb"].path == f"{items_dir}/Fire Orb.jpg"
+
+
+def test_manifest_overrides_profiles(items_dir):
+    write_manifest(items_dir, {"Fire Orb": {"confidence": 0.95, "neighbours": ["Water Orb", "Earth Orb"]}})
+
+    profile = ItemCatalog.get("Fire Orb")
+    assert profile.confidence == 0.95
+    assert profile.neighbours == ["Water Orb", "Earth Orb"]
+    assert ItemCatalog.get_neighbour_paths(profile) == [f"{items_dir}/Water Orb.jpg", f"{items_dir}/Earth Orb.jpg"]
+
+
+def test_manifest_roi_overrides_the_whole_window(items_dir, caplog):
+    write_manifest(items_dir, {"Fire Orb": {"roi": [0.0, 0.25, 1.0, 0.75]}, "Water Orb": {"roi": [0.5, 0.0, 0.25, 1.0]}})
+
+    caplog.set_level(logging.INFO)
+    assert ItemCatalog.get("Fire Orb").roi == (0.0, 0.25, 1.0, 0.75)
+    assert ItemCatalog.get("Water Orb").roi == (0.0, 0.0, 1.0, 1.0)
+    assert "[WARNING] Ignoring the invalid roi of Water Orb" in caplog.text
+
+
+def test_manifest_names_without_templates_are_skipped_with_a_warning(items_dir, caplog):
+    write_manifest(items_dir, {"Wind Orb": {"confidence": 0.95}, "Fire Orb": {"neighbours": ["Light Orb", "Fire Orb", "Water Orb"]}})
+
+    # MessageLog prints through the root logger at the INFO level.
+    caplog.set_level(logging.INFO)
+    items = ItemCatalog.get_items()
+    assert "Wind Orb" not in items
+    assert items["Fire Orb"].neighbours == ["Water Orb"]
+
+    assert "[WARNING] Skipping Wind Orb" in caplog.text
+    assert "[WARNING] Skipping the neighbour Light Orb of Fire Orb" in caplog.text
+
+
+def test_invalid_confidence_keeps_the_default(items_dir):
+    write_manifest(items_dir, {"Fire Orb": {"confidence": "high"}})
+
+    assert ItemCatalog.get("Fire Orb").confidence == Settings.confidence_all
+
+
+def test_invalid_manifest_is_ignored(items_dir):
+    with open(items_dir / "manifest.json", "w") as file:
+        file.write("not json")
+
+    assert len(ItemCatalog.get_items()) == 3
+
+
+def test_get_unknown_item_has_no_profile(items_dir):
+    assert ItemCatalog.get("Dark Orb") is None
+    assert "Dark Orb" not in ItemCatalog.get_items()
+
+
+def test_unknown_items_are_skipped_with_a_warning(items_dir, caplog):
+    caplog.set_level(logging.INFO)
+    assert ItemCatalog.get_known_items(["Water Orb", "Dark Orb", "Fire Orb"]) == ["Water Orb", "Fire Orb"]
+    assert "[WARNING] Skipping Dark Orb" in caplog.text
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from utils.latency_model import LatencyModel
+
+
+@pytest.fixture(autouse = True)
+def latency_model(tmp_path, monkeypatch):
+    monkeypatch.setattr(LatencyModel, "_path", str(tmp_path / "latency_model.json"))
+    monkeypatch.setattr(LatencyModel, "_samples", None)
+    monkeypatch.setattr(LatencyModel, "_unsaved", 0)
+    yield
+
+
+def test_get_delay_uses_default_until_enough_samples():
+    for _ in range(LatencyModel._min_samples - 1):
+        LatencyModel.record("click:attack", 0.1)
+
+    assert not LatencyModel.has_enough_samples("click:attack")
+    assert LatencyModel.get_delay("click:attack", 1.0) == 1.0
+
+    LatencyModel.record("click:attack", 0.1)
+    assert LatencyModel.has_enough_samples("click:attack")
+    assert LatencyModel.get_delay("click:attack", 1.0) == pytest.approx(0.1 * (1.0 + LatencyModel._relative_margin) + LatencyModel._absolute_margin)
+
+
+def test_get_delay_is_capped():
+    for _ in range(LatencyModel._min_samples):
+        LatencyModel.record("combat:next", 10.0)
+
+    assert LatencyModel.get_delay("combat:next", 1.0) == 1.0 * LatencyModel._max_factor
+    assert LatencyModel.get_delay("combat:next", 1.0, max_delay = 1.5) == 1.5
+
+
+def test_record_keeps_only_recent_samples():
+    for index in range(LatencyModel._history_size + 10):
+        LatencyModel.record("scroll", float(index))
+
+    samples = LatencyModel._samples["scroll"]
+    assert len(samples) == LatencyModel._history_size
+    assert samples[0] == 10.0
+
+
+def test_save_and_load_samples(monkeypatch):
+    for _ in range(LatencyModel._min_samples):
+        LatencyModel.record("click:attack", 0.2)
+    LatencyModel.save()
+
+    monkeypatch.setattr(LatencyModel, "_samples", None)
+    assert LatencyModel.has_enough_samples("click:attack")
+
+
+def test_load_ignores_invalid_file():
+    with open(LatencyModel._path, "w") as file:
+        file.write("not json")
+
+    assert LatencyModel.get_delay("click:attack", 1.0) == 1.0
+    assert LatencyModel._samples == {}
+
+
+def test_record_saves_periodically():
+    for _ in range(LatencyModel._save_every):
+        LatencyModel.record("click:attack", 0.2)
+
+    with open(LatencyModel._path) as file:
+        assert len(json.load(file)["actions"]["click:attack"]) == LatencyModel._save_every
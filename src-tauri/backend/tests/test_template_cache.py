@@ -0,0 +1,72 @@
+import cv2
+import numpy
+import pytest
+
+from utils.template_cache import TemplateCache
+
+
+@pytest.fixture(autouse = True)
+def clear_cache():
+    TemplateCache.clear()
+    yield
+    TemplateCache.clear()
+
+
+def write_template(path, width: int = 20, height: int = 10) -> str:
+    cv2.imwrite(str(path), numpy.random.default_rng(0).integers(0, 256, (height, width, 3), dtype = numpy.uint8))
+    return str(path)
+
+
+def test_get_reads_each_template_once(tmp_path):
+    image_path = write_template(tmp_path / "button.png")
+
+    first = TemplateCache.get(image_path)
+    second = TemplateCache.get(image_path)
+
+    assert first is second
+    assert first.shape == (10, 20)
+    assert TemplateCache.get_statistics()["misses"] == 1
+    assert TemplateCache.get_statistics()["hits"] == 1
+
+
+def test_get_returns_read_only_arrays(tmp_path):
+    template_array = TemplateCache.get(write_template(tmp_path / "button.png"))
+
+    with pytest.raises(ValueError):
+        template_array[0, 0] = 0
+
+
+def test_get_rescales_and_crops(tmp_path):
+    image_path = write_template(tmp_path / "button.png")
+
+    assert TemplateCache.get(image_path, scale = 2.0).shape == (20, 40)
+    assert TemplateCache.get(image_path, crop_right = 5).shape == (10, 15)
+    assert TemplateCache.get(image_path, grayscale = False).shape == (10, 20, 3)
+    assert TemplateCache.get_statistics()["entries"] == 3
+
+
+def test_get_evicts_least_recently_used(tmp_path, monkeypatch):
+    paths = [write_template(tmp_path / f"button{index}.png") for index in range(3)]
+
+    # Only two of the 200 byte templates fit.
+    monkeypatch.setattr(TemplateCache, "_max_bytes", 450)
+    TemplateCache.get(paths[0])
+    TemplateCache.get(paths[1])
+    TemplateCache.get(paths[0])
+    TemplateCache.get(paths[2])
+
+    statistics = TemplateCache.get_statistics()
+    assert statistics["evictions"] == 1
+    assert statistics["entries"] == 2
+    assert statistics["bytes"] == 400
+
+    # The second template was the least recently used so it has to be read again.
+    TemplateCache.get(paths[0])
+    assert TemplateCache.get_statistics()["misses"] == 3
+    TemplateCache.get(paths[1])
+    assert TemplateCache.get_statistics()["misses"] == 4
+
+
+def test_get_raises_for_missing_template(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        TemplateCache.get(str(tmp_path / "missing.png"))
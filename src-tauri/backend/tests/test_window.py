@@ -0,0 +1,34 @@
+import numpy
+
+from bot.window import Window
+
+
+def make_screen(width: int = 40, height: int = 100) -> numpy.ndarray:
+    return numpy.zeros((height, width, 3), dtype = numpy.uint8)
+
+
+def test_find_browser_tops_finds_lowest_run_above_each_window():
+    img = make_screen()
+    img[10:13, 5] = Window.BROWSER_TOP_COLOR
+    img[30:33, 5] = Window.BROWSER_TOP_COLOR
+    img[20:23, 25] = Window.BROWSER_TOP_COLOR
+
+    # The first window starts right below the lowest 3 pixel run of the color above its bottom.
+    assert Window._find_browser_tops(img, [5, 25], [90, 90]) == [33, 23]
+
+
+def test_find_browser_tops_ignores_runs_below_the_window_or_too_short():
+    img = make_screen()
+    img[60:63, 5] = Window.BROWSER_TOP_COLOR
+    img[10:12, 25] = Window.BROWSER_TOP_COLOR
+
+    assert Window._find_browser_tops(img, [5, 25], [50, 90]) == [None, None]
+
+
+def test_find_browser_tops_clamps_columns_to_the_screen():
+    img = make_screen()
+    img[10:13, 0] = Window.BROWSER_TOP_COLOR
+    img[40:43, img.shape[1] - 1] = Window.BROWSER_TOP_COLOR
+
+    # A negative column would otherwise wrap around to the right edge of the screen.
+    assert Window._find_browser_tops(img, [-3, img.shape[1] + 5], [90, 90]) == [13, 43]
@@ -0,0 +1,94 @@
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import pyautogui
+
+from utils.message_log import MessageLog
+
+
+class CalibrationCache:
+    """
+    Remembers the last calibrated window geometry of every display layout in calibration_cache.json next to settings.json, so that the next launch on the same
+    layout only has to verify it instead of scanning the whole screen again.
+    """
+
+    _path: str = f"{os.getcwd()}/backend/calibration_cache.json" if os.path.isdir(f"{os.getcwd()}/backend") else f"{os.getcwd()}/calibration_cache.json"
+
+    _layouts: Dict[str, Dict[str, Any]] = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _load():
+        """Load the cached geometries if they have not been loaded yet.
+
+        Returns:
+            None
+        """
+        if CalibrationCache._layouts is not None:
+            return None
+
+        CalibrationCache._layouts = {}
+        if os.path.exists(CalibrationCache._path):
+            try:
+                with open(CalibrationCache._path) as file:
+                    CalibrationCache._layouts = dict(json.load(file).get("layouts", {}))
+            except (ValueError, TypeError, AttributeError) as e:
+                MessageLog.print_message(f"[WARNING] Failed to read the calibration cache from {CalibrationCache._path} so the window will be calibrated from scratch: {e}")
+                CalibrationCache._layouts = {}
+
+        return None
+
+    @staticmethod
+    def get_layout_key(kind: str) -> str:
+        """Get the key of the current display layout.
+
+        Args:
+            kind (str): Name of the kind of calibration, as each one caches different geometry.
+
+        Returns:
+            (str): The key made out of the kind of calibration and the screen size.
+        """
+        width, height = pyautogui.size()
+        return f"{kind}:{width}x{height}"
+
+    @staticmethod
+    def get(layout: str) -> Optional[Dict[str, Any]]:
+        """Get the cached geometry of the display layout.
+
+        Args:
+            layout (str): Key of the display layout.
+
+        Returns:
+            (Optional[Dict[str, Any]]): The geometry that was last calibrated on the display layout or None if it has not been calibrated yet.
+        """
+        with CalibrationCache._lock:
+            CalibrationCache._load()
+            return CalibrationCache._layouts.get(layout)
+
+    @staticmethod
+    def put(layout: str, geometry: Dict[str, Any]):
+        """Cache the calibrated geometry of the display layout and save it to disk.
+
+        Args:
+            layout (str): Key of the display layout.
+            geometry (Dict[str, Any]): The JSON serializable geometry.
+
+        Returns:
+            None
+        """
+        with CalibrationCache._lock:
+            CalibrationCache._load()
+            CalibrationCache._layouts[layout] = geometry
+
+            # Write to a temporary file first so that stopping the bot in the middle of saving does not corrupt the cache.
+            temp_path = f"{CalibrationCache._path}.tmp"
+            try:
+                with open(temp_path, "w") as file:
+                    json.dump({"layouts": CalibrationCache._layouts}, file)
+                os.replace(temp_path, CalibrationCache._path)
+            except OSError as e:
+                MessageLog.print_message(f"[WARNING] Failed to save the calibration cache to {CalibrationCache._path}: {e}")
+
+        return None
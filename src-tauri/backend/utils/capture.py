@@ -0,0 +1,477 @@
+import abc
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+import PIL.Image
+import cv2
+import numpy
+import pyautogui
+
+from utils.settings import Settings
+from utils.message_log import MessageLog
+
+try:
+    import mss
+except ImportError:
+    mss = None
+
+
+class CaptureBackend(abc.ABC):
+    """
+    Base class of the screen capture backends. Every backend returns frames as RGB numpy arrays.
+    """
+
+    name: str = "base"
+
+    @abc.abstractmethod
+    def grab(self, region: Optional[Tuple[int, int, int, int]] = None) -> numpy.ndarray:
+        """Capture the region of the screen.
+
+        Args:
+            region (Optional[Tuple[int, int, int, int]], optional): The (left, top, width, height) region to capture or None for the whole screen. Defaults to None.
+
+        Returns:
+            (numpy.ndarray): The RGB frame.
+        """
+        ...
+
+    def close(self):
+        """Release any resources held by the backend.
+
+        Returns:
+            None
+        """
+        return None
+
+
+class PyAutoGUICapture(CaptureBackend):
+    """
+    Capture through pyautogui.screenshot(), which works everywhere but goes through scrot or Pillow's grab on every call.
+    """
+
+    name: str = "pyautogui"
+
+    def grab(self, region: Optional[Tuple[int, int, int, int]] = None) -> numpy.ndarray:
+        return numpy.asarray(pyautogui.screenshot(region = region))
+
+
+class MSSCapture(CaptureBackend):
+    """
+    Capture through MSS, which grabs straight from shared memory on X11 (XShm) and through the native APIs on Windows and macOS.
+    """
+
+    name: str = "mss"
+
+    def __init__(self):
+        # MSS instances hold per-thread display handles so every thread gets its own.
+        self._local = threading.local()
+
+    def _get_instance(self):
+        instance = getattr(self._local, "instance", None)
+        if instance is None:
+            instance = mss.mss()
+            self._local.instance = instance
+
+        return instance
+
+    def grab(self, region: Optional[Tuple[int, int, int, int]] = None) -> numpy.ndarray:
+        instance = self._get_instance()
+        if region is None:
+            monitor = instance.monitors[1]
+        else:
+            monitor = {"left": int(region[0]), "top": int(region[1]), "width": int(region[2]), "height": int(region[3])}
+
+        return cv2.cvtColor(numpy.asarray(instance.grab(monitor)), cv2.COLOR_BGRA2RGB)
+
+    def close(self):
+        instance = getattr(self._local, "instance", None)
+        if instance is not None:
+            instance.close()
+            self._local.instance = None
+
+        return None
+
+
+class ReplayCapture(CaptureBackend):
+    """
+    Replay recorded full screen screenshots from a folder in file name order for offline testing. Every grab moves on to the next recording and the last one is
+    repeated once all of them have been replayed.
+    """
+
+    name: str = "replay"
+
+    def __init__(self, directory: str):
+        self._paths: List[str] = [os.path.join(directory, file_name) for file_name in sorted(os.listdir(directory)) if file_name.lower().endswith((".png", ".jpg", ".jpeg", ".bmp"))]
+        if len(self._paths) == 0:
+            raise FileNotFoundError(f"There are no recorded screenshots to replay in {directory}.")
+
+        self._index: int = 0
+        self._lock = threading.Lock()
+
+    def seek(self, index: int):
+        """Jump to the recording at the index.
+
+        Args:
+            index (int): Index of the recording in file name order.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._index = max(0, min(index, len(self._paths) - 1))
+
+        return None
+
+    def grab(self, region: Optional[Tuple[int, int, int, int]] = None) -> numpy.ndarray:
+        with self._lock:
+            path = self._paths[self._index]
+            self._index = min(self._index + 1, len(self._paths) - 1)
+
+        frame = cv2.imread(path, cv2.IMREAD_COLOR)
+        if frame is None:
+            raise ValueError(f"Failed to read the recorded screenshot {path}. Is it a valid image file?")
+
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if region is not None:
+            left, top, width, height = (int(value) for value in region)
+            frame = frame[top:top + height, left:left + width]
+
+        return frame
+
+
+class Capture:
+    """
+    Screen capture through the backend chosen in the settings.
+    """
+
+    _backend: CaptureBackend = None
+
+    @staticmethod
+    def _create_backend(name: str) -> CaptureBackend:
+        """Create the capture backend with the given name, falling back to pyautogui if it is unavailable.
+
+        Args:
+            name (str): Name of the capture backend, either "pyautogui", "mss" or "replay".
+
+        Returns:
+            (CaptureBackend): The capture backend.
+        """
+        if name == "mss":
+            if mss is not None:
+                return MSSCapture()
+
+            MessageLog.print_message(f"[WARNING] The mss package is not installed. Falling back to capturing through pyautogui...")
+        elif name == "replay":
+            return ReplayCapture(Settings.capture_replay_directory)
+        elif name != "pyautogui":
+            MessageLog.print_message(f"[WARNING] Unknown capture backend \"{name}\". Falling back to capturing through pyautogui...")
+
+        return PyAutoGUICapture()
+
+    @staticmethod
+    def get_backend() -> CaptureBackend:
+        """Get the capture backend, creating it from the settings on first use.
+
+        Returns:
+            (CaptureBackend): The capture backend.
+        """
+        if Capture._backend is None:
+            Capture._backend = Capture._create_backend(Settings.capture_backend)
+
+        return Capture._backend
+
+    @staticmethod
+    def set_backend(backend: CaptureBackend):
+        """Replace the capture backend, like with a ReplayCapture for offline testing.
+
+        Args:
+            backend (CaptureBackend): The new capture backend.
+
+        Returns:
+            None
+        """
+        if Capture._backend is not None:
+            Capture._backend.close()
+
+        Capture._backend = backend
+        return None
+
+    @staticmethod
+    def grab(region: Optional[Tuple[int, int, int, int]] = None) -> numpy.ndarray:
+        """Capture the region of the screen as a RGB numpy array.
+
+        Args:
+            region (Optional[Tuple[int, int, int, int]], optional): The (left, top, width, height) region to capture or None for the whole screen. Defaults to None.
+
+        Returns:
+            (numpy.ndarray): The RGB frame.
+        """
+        return Capture.get_backend().grab(region)
+
+    @staticmethod
+    def grab_image(region: Optional[Tuple[int, int, int, int]] = None) -> PIL.Image.Image:
+        """Capture the region of the screen as a PIL image for pixel lookups and saving.
+
+        Args:
+            region (Optional[Tuple[int, int, int, int]], optional): The (left, top, width, height) region to capture or None for the whole screen. Defaults to None.
+
+        Returns:
+            (PIL.Image.Image): The RGB image.
+        """
+        return PIL.Image.fromarray(numpy.ascontiguousarray(Capture.grab(region)))
+
+
+class CaptureDaemon:
+    """
+    Optional background thread that keeps capturing the watched regions of the screen into ring buffers of preallocated grayscale frames, so that image matching can
+    read the latest frame instead of waiting on its own screenshot.
+    """
+
+    _thread: threading.Thread = None
+    _stop_event: threading.Event = threading.Event()
+    _wake_event: threading.Event = threading.Event()
+    _lock = threading.Lock()
+
+    _fps: float = 15.0
+    _idle_fps: float = 1.0
+    _buffer_size: int = 4
+    _idle_depth: int = 0
+    _last_invalidation: float = 0.0
+
+    # Ring buffers keyed by region, each holding the preallocated frames, their capture timestamps, whether they were read and the index of the latest one.
+    _rings: Dict[Optional[Tuple[int, int, int, int]], Dict[str, Any]] = {}
+
+    _statistics: Dict[str, int] = {"captured": 0, "dropped": 0, "late": 0, "served": 0, "misses": 0}
+
+    @staticmethod
+    def start(regions: List[Optional[Tuple[int, int, int, int]]], fps: float = 15.0, idle_fps: float = 1.0, buffer_size: int = 4):
+        """Start capturing the given regions in the background, replacing the watched regions if the daemon is already running.
+
+        Args:
+            regions (List[Optional[Tuple[int, int, int, int]]]): The (left, top, width, height) regions to capture or None for the whole screen.
+            fps (float, optional): Target number of captures per second of every region. Defaults to 15.0.
+            idle_fps (float, optional): Number of captures per second of every region while the bot is idle. Defaults to 1.0.
+            buffer_size (int, optional): Number of frames kept in every ring buffer. Defaults to 4.
+
+        Returns:
+            None
+        """
+        with CaptureDaemon._lock:
+            CaptureDaemon._fps = max(0.1, float(fps))
+            CaptureDaemon._idle_fps = max(0.1, min(float(idle_fps), CaptureDaemon._fps))
+            CaptureDaemon._buffer_size = max(2, int(buffer_size))
+            CaptureDaemon._rings = {region: None for region in regions}
+
+        if CaptureDaemon._thread is None or not CaptureDaemon._thread.is_alive():
+            CaptureDaemon._stop_event.clear()
+            CaptureDaemon._thread = threading.Thread(target = CaptureDaemon._run, name = "CaptureDaemon", daemon = True)
+            CaptureDaemon._thread.start()
+            MessageLog.print_message(f"[INFO] Started capturing {len(regions)} region(s) in the background at {CaptureDaemon._fps:.0f} FPS.")
+
+        return None
+
+    @staticmethod
+    def stop():
+        """Stop the background capture and release its ring buffers.
+
+        Returns:
+            None
+        """
+        if CaptureDaemon._thread is not None:
+            CaptureDaemon._stop_event.set()
+            CaptureDaemon._wake_event.set()
+            CaptureDaemon._thread.join(timeout = 2.0)
+            CaptureDaemon._thread = None
+
+        with CaptureDaemon._lock:
+            CaptureDaemon._rings = {}
+
+        return None
+
+    @staticmethod
+    def is_running() -> bool:
+        """Check if the background capture is running.
+
+        Returns:
+            (bool): True if the background capture is running.
+        """
+        return CaptureDaemon._thread is not None and CaptureDaemon._thread.is_alive()
+
+    @staticmethod
+    def is_watching(region: Optional[Tuple[int, int, int, int]]) -> bool:
+        """Check if the background capture is running and watching the region.
+
+        Args:
+            region (Optional[Tuple[int, int, int, int]]): The (left, top, width, height) region.
+
+        Returns:
+            (bool): True if the region is being captured in the background.
+        """
+        return CaptureDaemon.is_running() and region in CaptureDaemon._rings
+
+    @staticmethod
+    def invalidate():
+        """Discard every frame captured so far because the screen is about to change from a click, scroll or page reload.
+
+        Returns:
+            None
+        """
+        CaptureDaemon._last_invalidation = time.perf_counter()
+        CaptureDaemon._wake_event.set()
+        return None
+
+    @staticmethod
+    @contextmanager
+    def idle():
+        """Context that throttles the background capture down to the idle FPS while the bot is sleeping.
+
+        Returns:
+            None
+        """
+        with CaptureDaemon._lock:
+            CaptureDaemon._idle_depth += 1
+        try:
+            yield
+        finally:
+            with CaptureDaemon._lock:
+                CaptureDaemon._idle_depth -= 1
+                is_awake = CaptureDaemon._idle_depth == 0
+            if is_awake:
+                # Capture a fresh frame right away as the bot is about to look at the screen again.
+                CaptureDaemon._wake_event.set()
+
+    @staticmethod
+    def get_latest(region: Optional[Tuple[int, int, int, int]], max_age: float = None, timeout: float = None) -> Optional[numpy.ndarray]:
+        """Get a copy of the latest frame of the region that was captured after the last invalidation.
+
+        Args:
+            region (Optional[Tuple[int, int, int, int]]): The (left, top, width, height) region.
+            max_age (float, optional): Maximum age in seconds of the frame. Defaults to two frame intervals at the target FPS.
+            timeout (float, optional): Number of seconds to wait for such a frame to be captured. Defaults to two frame intervals at the target FPS.
+
+        Returns:
+            (Optional[numpy.ndarray]): The grayscale frame or None if there is no fresh enough frame.
+        """
+        if max_age is None:
+            max_age = 2.0 / CaptureDaemon._fps
+        if timeout is None:
+            timeout = 2.0 / CaptureDaemon._fps
+
+        deadline = time.perf_counter() + timeout
+        while True:
+            with CaptureDaemon._lock:
+                ring = CaptureDaemon._rings.get(region)
+                if ring is not None and ring["latest"] is not None:
+                    index = ring["latest"]
+                    captured_at = ring["timestamps"][index]
+                    now = time.perf_counter()
+                    if captured_at > CaptureDaemon._last_invalidation and now - captured_at <= max_age:
+                        ring["read"][index] = True
+                        CaptureDaemon._statistics["served"] += 1
+                        return ring["frames"][index].copy()
+
+            if time.perf_counter() >= deadline or not CaptureDaemon.is_running():
+                with CaptureDaemon._lock:
+                    CaptureDaemon._statistics["misses"] += 1
+                return None
+
+            CaptureDaemon._wake_event.set()
+            time.sleep(0.005)
+
+    @staticmethod
+    def _store(region: Optional[Tuple[int, int, int, int]], frame: numpy.ndarray, captured_at: float):
+        """Copy the captured frame into the next slot of the ring buffer of the region, reallocating the ring if the size of the region changed.
+
+        Args:
+            region (Optional[Tuple[int, int, int, int]]): The (left, top, width, height) region.
+            frame (numpy.ndarray): The grayscale frame.
+            captured_at (float): The time.perf_counter() value from right before the capture started.
+
+        Returns:
+            None
+        """
+        with CaptureDaemon._lock:
+            if region not in CaptureDaemon._rings:
+                return None
+
+            ring = CaptureDaemon._rings[region]
+            if ring is None or ring["frames"].shape[1:] != frame.shape:
+                ring = {
+                    "frames": numpy.empty((CaptureDaemon._buffer_size,) + frame.shape, dtype = numpy.uint8),
+                    "timestamps": [0.0] * CaptureDaemon._buffer_size,
+                    "read": [True] * CaptureDaemon._buffer_size,
+                    "latest": None
+                }
+                CaptureDaemon._rings[region] = ring
+
+            index = 0 if ring["latest"] is None else (ring["latest"] + 1) % CaptureDaemon._buffer_size
+            if not ring["read"][index]:
+                CaptureDaemon._statistics["dropped"] += 1
+
+            numpy.copyto(ring["frames"][index], frame)
+            ring["timestamps"][index] = captured_at
+            ring["read"][index] = False
+            ring["latest"] = index
+            CaptureDaemon._statistics["captured"] += 1
+
+        return None
+
+    @staticmethod
+    def _run():
+        """Capture every watched region at the target FPS, or at the idle FPS while idle, until stopped.
+
+        Returns:
+            None
+        """
+        while not CaptureDaemon._stop_event.is_set():
+            CaptureDaemon._wake_event.clear()
+            with CaptureDaemon._lock:
+                interval = 1.0 / (CaptureDaemon._idle_fps if CaptureDaemon._idle_depth > 0 else CaptureDaemon._fps)
+                regions = list(CaptureDaemon._rings.keys())
+            start_time = time.perf_counter()
+
+            for region in regions:
+                try:
+                    captured_at = time.perf_counter()
+                    frame = Capture.grab(region)
+                    if frame.ndim == 3:
+                        frame = cv2.cvtColor(frame, cv2.COLOR_RGBA2GRAY if frame.shape[2] == 4 else cv2.COLOR_RGB2GRAY)
+                    CaptureDaemon._store(region, frame, captured_at)
+                except Exception as e:
+                    MessageLog.print_message(f"[WARNING] Background capture of region {region} failed: {e}")
+                    CaptureDaemon._stop_event.wait(1.0)
+
+            elapsed = time.perf_counter() - start_time
+            if elapsed > interval:
+                with CaptureDaemon._lock:
+                    CaptureDaemon._statistics["late"] += 1
+            else:
+                CaptureDaemon._wake_event.wait(interval - elapsed)
+
+        return None
+
+    @staticmethod
+    def get_statistics() -> Dict[str, int]:
+        """Get the counters of the background capture.
+
+        Returns:
+            (Dict[str, int]): The number of frames captured, dropped without ever being read, captures that overran their frame interval, frames served and
+                requests that found no fresh frame.
+        """
+        with CaptureDaemon._lock:
+            return dict(CaptureDaemon._statistics)
+
+    @staticmethod
+    def print_statistics():
+        """Print the counters of the background capture to the message log.
+
+        Returns:
+            None
+        """
+        statistics = CaptureDaemon.get_statistics()
+        MessageLog.print_message(f"[DEBUG] Background capture: {statistics['captured']} frames captured, {statistics['dropped']} dropped unread, {statistics['late']} late, "
+                                 f"{statistics['served']} served and {statistics['misses']} misses.")
+        return None
@@ -0,0 +1,217 @@
+import os
+import time
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy
+
+from utils.message_log import MessageLog
+
+
+class DigitRecognizer:
+    """
+    Lightweight recognizer for the item amounts on the loot screen, which are rendered as a few glyphs in one fixed game font. Each glyph is segmented out of the amount crop,
+    normalized and then classified with a k-nearest neighbors vote against labelled glyphs, using only OpenCV and NumPy.
+
+    Labelled samples are amount crops saved as "<text>_<anything>.png" like "x3_0001.png". Debug mode saves every crop that EasyOCR read into temp/digit_samples/ with its
+    reading as the label, up to a fixed number per label, so after correcting any wrong names they can be passed to train().
+    """
+
+    _model_path: str = f"{os.getcwd()}/backend/model/digit_glyphs.npz"
+    _sample_dir: str = f"{os.getcwd()}/temp/digit_samples"
+    _glyph_size: Tuple[int, int] = (8, 12)
+    _k: int = 3
+    _max_samples_per_label: int = 50
+
+    _features: numpy.ndarray = None
+    _labels: numpy.ndarray = None
+    _sample_counts: Dict[str, int] = None
+
+    @staticmethod
+    def is_trained() -> bool:
+        """Check if there is a trained model, loading it from disk if needed.
+
+        Returns:
+            (bool): True if the recognizer can be used.
+        """
+        if DigitRecognizer._features is None and os.path.exists(DigitRecognizer._model_path):
+            with numpy.load(DigitRecognizer._model_path) as model:
+                DigitRecognizer._features = model["features"]
+                DigitRecognizer._labels = model["labels"]
+
+        return DigitRecognizer._features is not None and len(DigitRecognizer._features) != 0
+
+    @staticmethod
+    def _segment(crop: numpy.ndarray) -> List[numpy.ndarray]:
+        """Split the grayscale amount crop into the feature vectors of its glyphs from left to right.
+
+        Args:
+            crop (numpy.ndarray): The grayscale amount crop.
+
+        Returns:
+            (List[numpy.ndarray]): The feature vector of every glyph.
+        """
+        _, binary = cv2.threshold(crop, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+        # The glyphs always cover less of the crop than the background around them.
+        if numpy.count_nonzero(binary) > binary.size // 2:
+            binary = cv2.bitwise_not(binary)
+
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity = 8)
+        if count <= 1:
+            return []
+
+        # Drop specks that are much shorter than the tallest glyph.
+        tallest = stats[1:, cv2.CC_STAT_HEIGHT].max()
+        components = [index for index in range(1, count) if stats[index, cv2.CC_STAT_HEIGHT] >= 0.4 * tallest and stats[index, cv2.CC_STAT_AREA] >= 4]
+        components.sort(key = lambda index: stats[index, cv2.CC_STAT_LEFT])
+
+        features = []
+        for index in components:
+            left, top, width, height = stats[index, cv2.CC_STAT_LEFT], stats[index, cv2.CC_STAT_TOP], stats[index, cv2.CC_STAT_WIDTH], stats[index, cv2.CC_STAT_HEIGHT]
+            glyph = numpy.where(labels[top:top + height, left:left + width] == index, 255, 0).astype(numpy.uint8)
+            glyph = cv2.resize(glyph, DigitRecognizer._glyph_size, interpolation = cv2.INTER_AREA).astype(numpy.float32) / 255.0
+
+            # Keep the aspect ratio and relative height as features as resizing to a fixed size throws them away, like for "1" against "7".
+            features.append(numpy.concatenate((glyph.ravel(), [width / height, height / tallest])))
+
+        return features
+
+    @staticmethod
+    def recognize(crop: numpy.ndarray) -> str:
+        """Read the text of the amount crop.
+
+        Args:
+            crop (numpy.ndarray): The grayscale amount crop.
+
+        Returns:
+            (str): The recognized text like "x3" or an empty string if there were no glyphs.
+        """
+        if not DigitRecognizer.is_trained():
+            raise RuntimeError("The digit recognizer has not been trained yet.")
+
+        text = ""
+        for feature in DigitRecognizer._segment(crop):
+            distances = numpy.sum((DigitRecognizer._features - feature) ** 2, axis = 1)
+            nearest = numpy.argsort(distances)[:DigitRecognizer._k]
+            values, counts = numpy.unique(DigitRecognizer._labels[nearest], return_counts = True)
+            text += str(values[numpy.argmax(counts)])
+
+        return text
+
+    @staticmethod
+    def _load_samples(samples_dir: str) -> List[Tuple[str, numpy.ndarray]]:
+        """Load the labelled amount crops from the folder.
+
+        Args:
+            samples_dir (str): Path to the folder of "<text>_<anything>.png" crops.
+
+        Returns:
+            (List[Tuple[str, numpy.ndarray]]): The label and the grayscale crop of every sample.
+        """
+        samples = []
+        for file_name in sorted(os.listdir(samples_dir)):
+            if file_name.lower().endswith((".png", ".jpg")):
+                crop = cv2.imread(os.path.join(samples_dir, file_name), cv2.IMREAD_GRAYSCALE)
+                if crop is not None:
+                    samples.append((file_name.split("_")[0], crop))
+
+        return samples
+
+    @staticmethod
+    def train(samples_dir: str = None) -> int:
+        """Train the recognizer from labelled amount crops and save the model next to the EasyOCR models.
+
+        Args:
+            samples_dir (str, optional): Path to the folder of "<text>_<anything>.png" crops. Defaults to temp/digit_samples/.
+
+        Returns:
+            (int): Number of glyphs the model was trained with.
+        """
+        samples_dir = samples_dir or DigitRecognizer._sample_dir
+
+        features, labels = [], []
+        skipped = 0
+        for label, crop in DigitRecognizer._load_samples(samples_dir):
+            glyphs = DigitRecognizer._segment(crop)
+
+            # Only trust crops that split into exactly one glyph per character of the label.
+            if len(glyphs) != len(label):
+                skipped += 1
+                continue
+
+            features.extend(glyphs)
+            labels.extend(label)
+
+        if len(features) == 0:
+            raise ValueError(f"There are no usable labelled samples in {samples_dir}.")
+
+        DigitRecognizer._features = numpy.array(features, dtype = numpy.float32)
+        DigitRecognizer._labels = numpy.array(labels)
+
+        os.makedirs(os.path.dirname(DigitRecognizer._model_path), exist_ok = True)
+        numpy.savez_compressed(DigitRecognizer._model_path, features = DigitRecognizer._features, labels = DigitRecognizer._labels)
+        MessageLog.print_message(f"[INFO] Trained the digit recognizer with {len(features)} glyphs. Skipped {skipped} samples that did not segment into their label.")
+
+        return len(features)
+
+    @staticmethod
+    def save_sample(crop: numpy.ndarray, text: str):
+        """Save the amount crop as a labelled sample for training, unless enough samples of its label have already been saved.
+
+        Args:
+            crop (numpy.ndarray): The grayscale amount crop.
+            text (str): The text that was read from it.
+
+        Returns:
+            None
+        """
+        label = "".join(char for char in text if char.isdigit() or char == "x")
+        if len(label) == 0:
+            return None
+
+        # Count the samples saved in previous sessions so that the folder stops growing once every label has enough of them.
+        if DigitRecognizer._sample_counts is None:
+            DigitRecognizer._sample_counts = {}
+            if os.path.isdir(DigitRecognizer._sample_dir):
+                for file_name in os.listdir(DigitRecognizer._sample_dir):
+                    saved_label = file_name.split("_")[0]
+                    DigitRecognizer._sample_counts[saved_label] = DigitRecognizer._sample_counts.get(saved_label, 0) + 1
+
+        if DigitRecognizer._sample_counts.get(label, 0) < DigitRecognizer._max_samples_per_label:
+            os.makedirs(DigitRecognizer._sample_dir, exist_ok = True)
+            cv2.imwrite(f"{DigitRecognizer._sample_dir}/{label}_{time.time_ns()}.png", crop)
+            DigitRecognizer._sample_counts[label] = DigitRecognizer._sample_counts.get(label, 0) + 1
+
+        return None
+
+    @staticmethod
+    def benchmark(samples_dir: str = None, reader = None) -> Dict[str, float]:
+        """Compare the recognizer against EasyOCR on labelled amount crops from recorded loot screens.
+
+        Args:
+            samples_dir (str, optional): Path to the folder of "<text>_<anything>.png" crops. Defaults to temp/digit_samples/.
+            reader (easyocr.Reader, optional): The EasyOCR reader to compare against. Defaults to only benchmarking the recognizer.
+
+        Returns:
+            (Dict[str, float]): The number of samples and the accuracy and total seconds of the recognizer and of EasyOCR if it was given.
+        """
+        samples = DigitRecognizer._load_samples(samples_dir or DigitRecognizer._sample_dir)
+
+        start_time = time.perf_counter()
+        correct = sum(DigitRecognizer.recognize(crop) == label for label, crop in samples)
+        results = {"samples": len(samples), "digits_accuracy": correct / max(1, len(samples)), "digits_seconds": time.perf_counter() - start_time}
+
+        if reader is not None:
+            start_time = time.perf_counter()
+            correct = 0
+            for label, crop in samples:
+                read = reader.recognize(crop, horizontal_list = [[0, crop.shape[1], 0, crop.shape[0]]], free_list = [], allowlist = "0123456789x", detail = 0)
+                correct += len(read) != 0 and read[0].strip() == label
+            results["easyocr_accuracy"] = correct / max(1, len(samples))
+            results["easyocr_seconds"] = time.perf_counter() - start_time
+
+        MessageLog.print_message(f"[INFO] Digit recognizer benchmark over {len(samples)} samples: " +
+                                 ", ".join(f"{key} = {value:.3f}" for key, value in results.items() if key != "samples"))
+
+        return results
@@ -1,23 +1,34 @@
 import datetime
+import json
 import os
+import re
 import sys
 import codecs
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import date
-from typing import List, Tuple, Optional
+from typing import TYPE_CHECKING, Any, Callable, Collection, Dict, List, Tuple, Optional, Union
 
-import PIL
+import PIL.Image
 import cv2
-import easyocr
 import numpy
 import pyautogui
-from PIL.Image import Image
 from playsound import playsound
 
 from utils.settings import Settings
 from utils.message_log import MessageLog
+from utils.template_cache import TemplateCache
+from utils.capture import Capture, CaptureDaemon
+from utils.digit_recognizer import DigitRecognizer
+from utils.item_catalog import ItemCatalog
 from bot.window import Window
 
+if TYPE_CHECKING:
+    # EasyOCR is only imported when the reader is first needed as it takes a while to load.
+    import easyocr
+
 
 class ImageUtils:
     """
@@ -33,16 +44,56 @@ class ImageUtils:
     _summon_selection_same_element = False
 
     _match_method: int = cv2.TM_CCOEFF_NORMED
+
+    # Either "full" to correlate at full resolution or "coarse_to_fine" to find candidates at a lower resolution first and only refine those at full resolution.
+    _matcher_strategy: str = Settings.matcher_strategy
+    _coarse_slack: float = 0.2
+    _coarse_candidates: int = 3
+    _executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers = min(8, os.cpu_count() or 1), thread_name_prefix = "ImageUtils")
     _match_location: Tuple[int, int] = None
+    _match_scale: float = Settings.custom_scale
     _custom_scale = Settings.custom_scale
 
+    # Scale that each template last matched at, keyed by the template path and how much was cropped off of it. Items are matched on the worker threads of the
+    # executor and the loot worker, so it is only read and written through ImageUtils._get_scale_affinity() and ImageUtils._set_scale_affinity().
+    _scale_affinity: Dict[Tuple[str, int], float] = {}
+    _scale_affinity_lock = threading.Lock()
+
+    # Regions of interest for each template path as (left, top, right, bottom) fractions of the searched frame. Declared ones come from the optional
+    # images/buttons/roi.json manifest keyed by button name and learned ones are the bounding box of the top-left corners of all past matches.
+    _declared_rois: Dict[str, Tuple[float, float, float, float]] = None
+    _learned_rois: Dict[str, Tuple[float, float, float, float]] = {}
+    _roi_margin: float = 0.05
+
     # Check if the temp folder is created in the images folder.
     _current_dir: str = os.getcwd()
     _temp_dir: str = _current_dir + "/temp/"
     if not os.path.exists(_temp_dir):
         os.makedirs(_temp_dir)
 
-    _reader: easyocr.Reader = None
+    # EasyOCR pulls in torch, so it is only imported when the reader is first needed.
+    _reader: "easyocr.Reader" = None
+    _reader_lock = threading.Lock()
+
+    # Frames shared by a group of checks inside ImageUtils.shared_frame(), keyed by their capture region. Every thread has its own depth, freshness and frames in
+    # ImageUtils._get_shared_frame_state() while the frame ID is bumped for all threads whenever the screen is expected to change.
+    _frame_id: int = 0
+    _shared_frame_local = threading.local()
+
+    # Difference in gray levels that any cell of two frame thumbnails must exceed for the frame to count as changed in ImageUtils.wait_until().
+    _frame_change_threshold: int = 4
+
+    # Last few search results of each template group together with the full resolution pixels they depend on, so unchanged regions are not searched again. A hit
+    # depends on the template-sized box at its location and a miss on the whole region that was searched.
+    _result_cache: Dict[Tuple, List[Tuple[Tuple[int, int, int, int], numpy.ndarray, Tuple]]] = {}
+    _result_cache_size: int = 4
+    _result_cache_threshold: int = 8
+    _change_detector_statistics: Dict[str, int] = {"searches": 0, "skipped": 0, "correlations_saved": 0}
+
+    # Seconds that the screen took to settle after clicking each template, keeping the most recent ones for tuning the settle detector.
+    _settle_times: Dict[str, List[float]] = {}
+    _settle_timeouts: Dict[str, int] = {}
+    _settle_history_size: int = 200
 
     page_key_pixel = {}
 
@@ -58,7 +109,7 @@ class ImageUtils:
             (450,500),
             (450,600)
         ]
-        scrshot = pyautogui.screenshot(region=(Window.start, Window.top, Window.width, Window.height))
+        scrshot = Capture.grab_image(region=(Window.start, Window.top, Window.width, Window.height))
         pixel_check = ImageUtils.page_key_pixel.get(page_name)
         if pixel_check is None:
             pixel = {}
@@ -107,23 +158,728 @@ class ImageUtils:
         return Settings.window_left, Settings.window_top, Settings.window_width, Settings.window_height
 
     @staticmethod
-    def _rescale(template: Image, scale: float) -> Image:
-        """Rescales the Image object using the provided factors.
+    def get_capture_region(is_sub: bool = False) -> Optional[Tuple[int, int, int, int]]:
+        """Get the region of the screen that is captured for image matching.
+
+        Args:
+            is_sub (bool, optional): Get the region of the sub window instead of the main window. Defaults to False.
+
+        Returns:
+            (Optional[Tuple[int, int, int, int]]): The (left, top, width, height) region or None for the whole screen.
+        """
+        if is_sub:
+            return Window.sub_start, Window.sub_top, Window.width, Window.sub_height
+        elif Settings.window_left is not None and Settings.window_top is not None and Settings.window_width is not None and Settings.window_height is not None:
+            return Settings.window_left, Settings.window_top, Settings.window_width, Settings.window_height
+        else:
+            return None
+
+    @staticmethod
+    def get_dual_capture_region() -> Optional[Tuple[int, int, int, int]]:
+        """Get the bounding box of both the main and sub windows if grabbing it once is worth it over grabbing each window on its own.
+
+        Returns:
+            (Optional[Tuple[int, int, int, int]]): The (left, top, width, height) bounding box or None if there is no sub window or the windows are too far apart.
+        """
+        main_region = ImageUtils.get_capture_region()
+        if not Settings.enable_dual_window_capture or main_region is None or Window.sub_start is None or Window.sub_top is None or Window.sub_height is None:
+            return None
+
+        sub_region = ImageUtils.get_capture_region(is_sub = True)
+        left, top = min(main_region[0], sub_region[0]), min(main_region[1], sub_region[1])
+        right, bottom = max(main_region[0] + main_region[2], sub_region[0] + sub_region[2]), max(main_region[1] + main_region[3], sub_region[1] + sub_region[3])
+
+        # Skip the bounding box if most of it would be the space in between the windows.
+        if (right - left) * (bottom - top) > 1.5 * (main_region[2] * main_region[3] + sub_region[2] * sub_region[3]):
+            return None
+
+        return left, top, right - left, bottom - top
+
+    @staticmethod
+    def _get_shared_frame_state() -> threading.local:
+        """Get the shared frame state of the current thread, setting it up the first time that the thread asks for it.
+
+        Returns:
+            (threading.local): The depth of the shared frame contexts, the freshness that they allow and the frames keyed by their capture region.
+        """
+        state = ImageUtils._shared_frame_local
+        if not hasattr(state, "depth"):
+            state.depth = 0
+            state.freshness = 0.5
+            state.frames = {}
+
+        return state
+
+    @staticmethod
+    def _capture_source(is_sub: bool = False, fresh: bool = False) -> numpy.ndarray:
+        """Capture the region of the screen used for image matching and convert it straight into a grayscale array without going through the disk.
+
+        Args:
+            is_sub (bool, optional): Capture the sub window instead of the main window. Defaults to False.
+            fresh (bool, optional): Always capture a new frame instead of reusing the shared frame, which still replaces the shared frame for the checks after it.
+                Defaults to False.
+
+        Returns:
+            (numpy.ndarray): The grayscale source image.
+        """
+        region = ImageUtils.get_capture_region(is_sub = is_sub)
+        state = ImageUtils._get_shared_frame_state()
+
+        # Reuse the frame already captured for this region if a group of checks is sharing one frame and it has not gone stale yet.
+        if state.depth > 0 and not fresh:
+            shared_frame = state.frames.get(region)
+            if shared_frame is not None and shared_frame[1] == ImageUtils._frame_id and time.perf_counter() - shared_frame[0] <= state.freshness:
+                return shared_frame[2]
+
+        # With a second window, grab the bounding box of both windows at once and hand out a view of each window.
+        dual_region = ImageUtils.get_dual_capture_region()
+        capture_region = dual_region if dual_region is not None else region
+
+        # Take the latest frame from the background capture if it is watching this region. Otherwise, capture it now.
+        src: Optional[numpy.ndarray] = None
+        if CaptureDaemon.is_watching(capture_region):
+            src = CaptureDaemon.get_latest(capture_region)
+        if src is None:
+            src = ImageUtils._to_grayscale(Capture.grab(capture_region))
+
+        frames = {region: src}
+        if dual_region is not None:
+            src.flags.writeable = False
+            frames = {}
+            for window_region in [ImageUtils.get_capture_region(), ImageUtils.get_capture_region(is_sub = True)]:
+                left, top = window_region[0] - dual_region[0], window_region[1] - dual_region[1]
+                frames[window_region] = src[top:top + window_region[3], left:left + window_region[2]]
+            src = frames[region]
+
+        # Only write the source image to the temp folder when debugging.
+        if Settings.debug_mode:
+            cv2.imwrite(f"temp/source.png", src)
+
+        if state.depth > 0:
+            captured_at = time.perf_counter()
+            for frame_region, frame in frames.items():
+                frame.flags.writeable = False
+                state.frames[frame_region] = (captured_at, ImageUtils._frame_id, frame)
+
+        return src
+
+    @staticmethod
+    @contextmanager
+    def shared_frame(freshness: float = 0.5):
+        """Context that lets a group of checks run against one captured frame instead of taking a new screenshot for each of them.
+
+        The shared frame is dropped when it is older than the freshness window or when the screen is expected to change from a click, scroll or reload. Each thread
+        shares its own frames. A nested context can only tighten the freshness window of the contexts around it until it exits.
+
+        Args:
+            freshness (float, optional): Number of seconds that a captured frame can be reused for. Defaults to 0.5.
+
+        Returns:
+            None
+        """
+        state = ImageUtils._get_shared_frame_state()
+        outer_freshness = state.freshness
+        state.freshness = freshness if state.depth == 0 else min(outer_freshness, freshness)
+
+        state.depth += 1
+        try:
+            yield
+        finally:
+            state.depth -= 1
+            state.freshness = outer_freshness
+            if state.depth == 0:
+                state.frames.clear()
+
+    @staticmethod
+    def invalidate_frame():
+        """Mark any shared frame as stale because the screen is about to change. Called after every click, scroll or page reload.
+
+        Returns:
+            None
+        """
+        ImageUtils._frame_id += 1
+        ImageUtils._get_shared_frame_state().frames.clear()
+        ImageUtils._result_cache.clear()
+        CaptureDaemon.invalidate()
+        return None
+
+    @staticmethod
+    def _to_grayscale(frame: numpy.ndarray) -> numpy.ndarray:
+        """Convert a RGB or RGBA screenshot array into a grayscale array.
+
+        Args:
+            frame (numpy.ndarray): The screenshot array.
+
+        Returns:
+            (numpy.ndarray): The grayscale array.
+        """
+        if frame.ndim == 2:
+            return frame
+        elif frame.shape[2] == 4:
+            return cv2.cvtColor(frame, cv2.COLOR_RGBA2GRAY)
+        else:
+            return cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+
+    @staticmethod
+    def _get_scales(use_single_scale: bool = False) -> List[float]:
+        """Create the range of scales to match templates with.
+
+        Args:
+            use_single_scale (bool, optional): Use a range of scales if this is disabled. Otherwise, it will use the custom_scale value. Defaults to False.
+
+        Returns:
+            (List[float]): List of scales to try in order.
+        """
+        if ImageUtils._custom_scale != 1.0 and use_single_scale is False:
+            return [ImageUtils._custom_scale - 0.02, ImageUtils._custom_scale - 0.01, ImageUtils._custom_scale, ImageUtils._custom_scale + 0.01, ImageUtils._custom_scale + 0.02]
+        elif ImageUtils._custom_scale != 1.0 and use_single_scale:
+            return [ImageUtils._custom_scale]
+        else:
+            return [1.0]
+
+    @staticmethod
+    def _score_map(src: numpy.ndarray, template_array: numpy.ndarray) -> numpy.ndarray:
+        """Run template matching of the template against the source image.
+
+        Args:
+            src (numpy.ndarray): The grayscale source image.
+            template_array (numpy.ndarray): The grayscale template image.
+
+        Returns:
+            (numpy.ndarray): The result map where higher is always better regardless of the match method.
+        """
+        result: numpy.ndarray = cv2.matchTemplate(src, template_array, ImageUtils._match_method)
+        if ImageUtils._match_method == cv2.TM_SQDIFF or ImageUtils._match_method == cv2.TM_SQDIFF_NORMED:
+            return 1.0 - result
+        else:
+            return result
+
+    @staticmethod
+    def _correlate(src: numpy.ndarray, template_array: numpy.ndarray, strategy: str = None, confidence: float = 0.8,
+                   coarse_srcs: Dict[int, numpy.ndarray] = None) -> Tuple[float, Tuple[int, int]]:
+        """Run template matching of the template against the source image and get the best score and its location.
+
+        Args:
+            src (numpy.ndarray): The grayscale source image.
+            template_array (numpy.ndarray): The grayscale template image.
+            strategy (str, optional): The matcher strategy to use, either "full" or "coarse_to_fine". Defaults to the matcherStrategy setting.
+            confidence (float, optional): Accuracy threshold for matching that the coarse pass selects candidates with. Defaults to 0.8.
+            coarse_srcs (Dict[int, numpy.ndarray], optional): The downsampled versions of the source image keyed by their factor, shared by the templates that are
+                correlated against the same source. Defaults to downsampling the source for this template alone.
+
+        Returns:
+            (Tuple[float, Tuple[int, int]]): The best score, where higher is always better regardless of the match method, and the top-left location of it.
+        """
+        if template_array.shape[0] > src.shape[0] or template_array.shape[1] > src.shape[1]:
+            return 0.0, (0, 0)
+
+        if (strategy or ImageUtils._matcher_strategy) == "coarse_to_fine":
+            factor = ImageUtils._get_coarse_factor(template_array)
+            if factor > 1:
+                return ImageUtils._correlate_coarse_to_fine(src, template_array, factor, confidence, coarse_srcs = coarse_srcs)
+
+        result = ImageUtils._score_map(src, template_array)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        return max_val, max_loc
+
+    @staticmethod
+    def _get_coarse_factor(template_array: numpy.ndarray) -> int:
+        """Determine how much the template can be downsampled while still keeping enough detail for the coarse pass.
+
+        Args:
+            template_array (numpy.ndarray): The grayscale template image.
+
+        Returns:
+            (int): The downsampling factor, where 1 means the template is too small for a coarse pass.
+        """
+        smallest_side = min(template_array.shape[0], template_array.shape[1])
+        if smallest_side >= 64:
+            return 4
+        elif smallest_side >= 24:
+            return 2
+        else:
+            return 1
+
+    @staticmethod
+    def _downsample(src: numpy.ndarray, factor: int) -> numpy.ndarray:
+        """Downsample the source image for the coarse pass.
+
+        Args:
+            src (numpy.ndarray): The grayscale source image.
+            factor (int): The downsampling factor.
+
+        Returns:
+            (numpy.ndarray): The downsampled source image.
+        """
+        return cv2.resize(src, (src.shape[1] // factor, src.shape[0] // factor), interpolation = cv2.INTER_AREA)
+
+    @staticmethod
+    def _correlate_coarse_to_fine(src: numpy.ndarray, template_array: numpy.ndarray, factor: int, confidence: float,
+                                  coarse_srcs: Dict[int, numpy.ndarray] = None) -> Tuple[float, Tuple[int, int]]:
+        """Correlate downsampled versions of the source and template to find candidate locations and then refine only those at full resolution.
+
+        Args:
+            src (numpy.ndarray): The grayscale source image.
+            template_array (numpy.ndarray): The grayscale template image.
+            factor (int): The downsampling factor of the coarse pass.
+            confidence (float): Accuracy threshold for matching. Coarse candidates are kept if they score within the coarse slack of it.
+            coarse_srcs (Dict[int, numpy.ndarray], optional): The downsampled versions of the source image keyed by their factor. Defaults to downsampling the
+                source for this template alone.
+
+        Returns:
+            (Tuple[float, Tuple[int, int]]): The best score, where higher is always better regardless of the match method, and the top-left location of it.
+        """
+        # Downsample the source only once for all the templates that are correlated against it.
+        small_src = coarse_srcs.get(factor) if coarse_srcs is not None else None
+        if small_src is None:
+            small_src = ImageUtils._downsample(src, factor)
+            if coarse_srcs is not None:
+                coarse_srcs[factor] = small_src
+
+        small_template = cv2.resize(template_array, (template_array.shape[1] // factor, template_array.shape[0] // factor), interpolation = cv2.INTER_AREA)
+        if small_template.shape[0] > small_src.shape[0] or small_template.shape[1] > small_src.shape[1]:
+            return 0.0, (0, 0)
+
+        coarse_result = ImageUtils._score_map(small_src, small_template)
+        peaks = (coarse_result >= confidence - ImageUtils._coarse_slack) & (coarse_result >= cv2.dilate(coarse_result, numpy.ones((3, 3), numpy.uint8)))
+        ys, xs = numpy.nonzero(peaks)
+
+        if len(xs) == 0:
+            # Nothing came close at the coarse resolution so report the coarse score which is already below the confidence.
+            _, max_val, _, max_loc = cv2.minMaxLoc(coarse_result)
+            return min(max_val, confidence - ImageUtils._coarse_slack), (max_loc[0] * factor, max_loc[1] * factor)
+
+        best_score, best_location = -1.0, (0, 0)
+        height, width = template_array.shape
+        for index in numpy.argsort(-coarse_result[ys, xs])[:ImageUtils._coarse_candidates]:
+            # Refine inside a window around the candidate that covers the rounding of the downsampling.
+            left = max(0, int(xs[index]) * factor - factor)
+            top = max(0, int(ys[index]) * factor - factor)
+            right = min(src.shape[1], int(xs[index]) * factor + width + factor)
+            bottom = min(src.shape[0], int(ys[index]) * factor + height + factor)
+
+            result = ImageUtils._score_map(src[top:bottom, left:right], template_array)
+            _, max_val, _, max_loc = cv2.minMaxLoc(result)
+            if max_val > best_score:
+                best_score, best_location = max_val, (max_loc[0] + left, max_loc[1] + top)
+
+        return best_score, best_location
+
+    @staticmethod
+    def verify_matcher_accuracy(frames_dir: str, image_names: List[str] = None, confidence: float = Settings.confidence) -> Dict[str, object]:
+        """Compare the coarse-to-fine matcher against the full resolution matcher on recorded frames to verify that it never changes any hit or miss.
+
+        Args:
+            frames_dir (str): Path to the folder of recorded screenshots of the game window.
+            image_names (List[str], optional): Names of the templates in the /images/buttons/ and /images/headers/ folders, like "attack" or "quest_header". Defaults to every template.
+            confidence (float, optional): Accuracy threshold for matching. Defaults to the confidence setting.
+
+        Returns:
+            (Dict[str, object]): The number of comparisons, the list of (frame, template, full outcome, coarse outcome) mismatches and the seconds spent by each matcher.
+        """
+        template_paths = []
+        for folder_name in ["buttons", "headers"]:
+            folder_path = f"{ImageUtils._current_dir}/images/{folder_name}"
+            for file_name in sorted(os.listdir(folder_path)):
+                if file_name.endswith(".jpg") and (image_names is None or file_name[:-4] in image_names):
+                    template_paths.append(f"{folder_path}/{file_name}")
+
+        comparisons = 0
+        mismatches = []
+        full_seconds, coarse_seconds = 0.0, 0.0
+        for frame_name in sorted(os.listdir(frames_dir)):
+            if not frame_name.lower().endswith((".png", ".jpg")):
+                continue
+
+            src = cv2.imread(f"{frames_dir}/{frame_name}", cv2.IMREAD_GRAYSCALE)
+            for template_path in template_paths:
+                template_array = TemplateCache.get(template_path, ImageUtils._custom_scale)
+
+                start_time = time.perf_counter()
+                full_score, full_location = ImageUtils._correlate(src, template_array, strategy = "full", confidence = confidence)
+                full_seconds += time.perf_counter() - start_time
+
+                start_time = time.perf_counter()
+                coarse_score, coarse_location = ImageUtils._correlate(src, template_array, strategy = "coarse_to_fine", confidence = confidence)
+                coarse_seconds += time.perf_counter() - start_time
+
+                comparisons += 1
+                full_hit, coarse_hit = full_score >= confidence, coarse_score >= confidence
+                if full_hit != coarse_hit or (full_hit and (abs(full_location[0] - coarse_location[0]) > 1 or abs(full_location[1] - coarse_location[1]) > 1)):
+                    mismatches.append((frame_name, os.path.basename(template_path), (full_score, full_location), (coarse_score, coarse_location)))
+                    MessageLog.print_message(f"[WARNING] Matchers disagree on {os.path.basename(template_path)} in {frame_name}: full {full_score:.4f} at {full_location} "
+                                             f"vs coarse_to_fine {coarse_score:.4f} at {coarse_location}.")
+
+        MessageLog.print_message(f"[INFO] Compared {comparisons} matches with {len(mismatches)} mismatches. Full resolution took {full_seconds:.2f}s and coarse_to_fine took {coarse_seconds:.2f}s.")
+
+        return {"comparisons": comparisons, "mismatches": mismatches, "full_seconds": full_seconds, "coarse_seconds": coarse_seconds}
+
+    @staticmethod
+    def _translate_center(location: Tuple[int, int], width: int, height: int) -> Tuple[int, int]:
+        """Translate the top-left location of a match inside the source image into the center of the match on the screen.
+
+        Args:
+            location (Tuple[int, int]): The top-left location of the match inside the source image.
+            width (int): Width of the template image.
+            height (int): Height of the template image.
+
+        Returns:
+            (Tuple[int, int]): The center of the match on the screen.
+        """
+        temp_location = list(location)
+        if Settings.additional_calibration_required is False:
+            temp_location[0] += int(width / 2)
+            temp_location[1] += int(height / 2)
+        else:
+            temp_location[0] += (pyautogui.size()[0] - (pyautogui.size()[0] - Settings.window_left)) + int(width / 2)
+            temp_location[1] += (pyautogui.size()[1] - (pyautogui.size()[1] - Settings.window_top)) + int(height / 2)
+
+        return temp_location[0], temp_location[1]
+
+    @staticmethod
+    def _translate_location(location: Tuple[int, int], width: int, height: int, is_sub: bool = False) -> Tuple[int, int]:
+        """Translate the top-left location of a match inside the source image into the screen location that the bot clicks on.
+
+        Args:
+            location (Tuple[int, int]): The top-left location of the match inside the source image.
+            width (int): Width of the template image.
+            height (int): Height of the template image.
+            is_sub (bool, optional): The match was found in the sub window. Defaults to False.
+
+        Returns:
+            (Tuple[int, int]): The location on the screen.
+        """
+        if Settings.farming_mode.endswith("V2"):
+            if is_sub:
+                return location[0] + Window.sub_start, location[1] + Window.sub_top
+            else:
+                return location[0] + Window.start, location[1] + Window.top
+        else:
+            return ImageUtils._translate_center(location, width, height)
+
+    @staticmethod
+    def _get_scale_affinity(image_path: str, crop_right: int = 0) -> Optional[float]:
+        """Get the scale that the template last matched at.
+
+        Args:
+            image_path (str): The file path of the template image.
+            crop_right (int, optional): Number of pixels cropped off the right edge of the template image. Defaults to 0.
+
+        Returns:
+            (Optional[float]): The rounded scale or None if the template has not matched yet.
+        """
+        with ImageUtils._scale_affinity_lock:
+            return ImageUtils._scale_affinity.get((image_path, crop_right))
+
+    @staticmethod
+    def _set_scale_affinity(image_path: str, scale: float, crop_right: int = 0):
+        """Remember the scale that the template just matched at.
+
+        Args:
+            image_path (str): The file path of the template image.
+            scale (float): The scale of the match.
+            crop_right (int, optional): Number of pixels cropped off the right edge of the template image. Defaults to 0.
+
+        Returns:
+            None
+        """
+        with ImageUtils._scale_affinity_lock:
+            ImageUtils._scale_affinity[(image_path, crop_right)] = round(scale, 4)
+
+        return None
+
+    @staticmethod
+    def _order_scales(image_path: str, scales: List[float], crop_right: int = 0) -> List[float]:
+        """Move the scale that last matched the template to the front of the scales to try.
+
+        Args:
+            image_path (str): The file path of the template image.
+            scales (List[float]): List of scales to try.
+            crop_right (int, optional): Number of pixels cropped off the right edge of the template image. Defaults to 0.
+
+        Returns:
+            (List[float]): List of scales to try with the known-good scale first if it is one of them.
+        """
+        affinity = ImageUtils._get_scale_affinity(image_path, crop_right)
+        if affinity is None:
+            return list(scales)
+
+        for index, scale in enumerate(scales):
+            if round(scale, 4) == affinity:
+                return [scale] + list(scales[:index]) + list(scales[index + 1:])
+
+        return list(scales)
+
+    @staticmethod
+    def _search(src: numpy.ndarray, image_paths: List[str], scales: List[float], confidence: float, crop_right: int = 0) -> Tuple[Optional[int], float, float, Tuple[int, int], numpy.ndarray]:
+        """Search the source image for the given templates at every given scale and get the best match.
+
+        The scale that last matched each template is correlated first and if it passes the confidence, the rest of the scales are skipped.
+        Otherwise, every remaining template and scale variant is correlated concurrently in one batch as OpenCV releases the GIL during template matching.
+
+        Args:
+            src (numpy.ndarray): The grayscale source image.
+            image_paths (List[str]): The file paths of the template images.
+            scales (List[float]): List of scales to try for every template.
+            confidence (float): Accuracy threshold for matching.
+            crop_right (int, optional): Number of pixels to crop off the right edge of the template images. Defaults to 0.
+
+        Returns:
+            (Tuple[Optional[int], float, float, Tuple[int, int], numpy.ndarray]): Index of the best template or None if nothing was correlated, its score, its scale,
+                the top-left location of it and the template variant that produced it.
+        """
+        pending = []
+        best = (None, -1.0, 0.0, (0, 0), None)
+
+        # The downsampled versions of this source are local to the search so that concurrent searches on other threads never see each other's frames.
+        coarse_srcs: Dict[int, numpy.ndarray] = {}
+
+        # Try the known-good scale of every template first.
+        for index, image_path in enumerate(image_paths):
+            ordered_scales = ImageUtils._order_scales(image_path, scales, crop_right)
+            if round(ordered_scales[0], 4) == ImageUtils._get_scale_affinity(image_path, crop_right):
+                template_array = TemplateCache.get(image_path, ordered_scales[0], crop_right = crop_right)
+                score, location = ImageUtils._correlate(src, template_array, confidence = confidence, coarse_srcs = coarse_srcs)
+                if score > best[1]:
+                    best = (index, score, ordered_scales[0], location, template_array)
+
+                pending.extend((index, scale) for scale in ordered_scales[1:])
+            else:
+                pending.extend((index, scale) for scale in ordered_scales)
+
+        if best[1] < confidence and len(pending) != 0:
+            # Precompute every remaining scaled variant from the template cache and then correlate all of them at once.
+            variants = [(index, scale, TemplateCache.get(image_paths[index], scale, crop_right = crop_right)) for index, scale in pending]
+            if len(variants) == 1:
+                futures = [(variants[0][0], variants[0][1], variants[0][2], None)]
+            else:
+                # Downsample the source for every needed factor up front so that the workers only ever read the shared versions.
+                if ImageUtils._matcher_strategy == "coarse_to_fine":
+                    for factor in {ImageUtils._get_coarse_factor(template_array) for _, _, template_array in variants} - {1} - coarse_srcs.keys():
+                        coarse_srcs[factor] = ImageUtils._downsample(src, factor)
+
+                futures = [(index, scale, template_array, ImageUtils._executor.submit(ImageUtils._correlate, src, template_array, None, confidence, coarse_srcs))
+                           for index, scale, template_array in variants]
+
+            for index, scale, template_array, future in futures:
+                score, location = future.result() if future is not None else ImageUtils._correlate(src, template_array, confidence = confidence, coarse_srcs = coarse_srcs)
+                if score > best[1]:
+                    best = (index, score, scale, location, template_array)
+
+        if best[0] is not None and best[1] >= confidence:
+            ImageUtils._set_scale_affinity(image_paths[best[0]], best[2], crop_right)
+
+        return best
+
+    @staticmethod
+    def _get_declared_rois() -> Dict[str, Tuple[float, float, float, float]]:
+        """Load the regions of interest declared in the images/buttons/roi.json manifest if it exists.
+
+        The manifest maps button names to their [left, top, right, bottom] region as fractions of the game window, like {"attack": [0.5, 0.3, 1.0, 0.6]}.
+
+        Returns:
+            (Dict[str, Tuple[float, float, float, float]]): The declared regions of interest keyed by template path.
+        """
+        if ImageUtils._declared_rois is None:
+            ImageUtils._declared_rois = {}
+            manifest_path = f"{ImageUtils._current_dir}/images/buttons/roi.json"
+            if os.path.exists(manifest_path):
+                try:
+                    with open(manifest_path) as file:
+                        for image_name, region in json.load(file).items():
+                            ImageUtils._declared_rois[f"{ImageUtils._current_dir}/images/buttons/{image_name.lower()}.jpg"] = tuple(float(value) for value in region)
+                except (ValueError, TypeError) as e:
+                    MessageLog.print_message(f"[WARNING] Failed to read the regions of interest from {manifest_path}: {e}")
+
+        return ImageUtils._declared_rois
+
+    @staticmethod
+    def _get_roi(image_paths: List[str], frame_shape: Tuple[int, ...], padding: Tuple[int, int]) -> Optional[Tuple[int, int, int, int]]:
+        """Get the region of the frame that the given templates are expected to appear in.
+
+        Args:
+            image_paths (List[str]): The file paths of the template images.
+            frame_shape (Tuple[int, ...]): Shape of the frame that will be searched.
+            padding (Tuple[int, int]): Width and height of the largest template variant that will be searched for.
+
+        Returns:
+            (Optional[Tuple[int, int, int, int]]): The (left, top, right, bottom) pixel region covering every template or None if any template has no region of interest yet.
+        """
+        frame_height, frame_width = frame_shape[0], frame_shape[1]
+        declared_rois = ImageUtils._get_declared_rois()
+
+        left, top, right, bottom = frame_width, frame_height, 0, 0
+        for image_path in image_paths:
+            if image_path in declared_rois:
+                region = declared_rois[image_path]
+                region = (region[0] * frame_width, region[1] * frame_height, region[2] * frame_width, region[3] * frame_height)
+            elif image_path in ImageUtils._learned_rois:
+                # Learned regions only hold the top-left corners of the matches so extend them by the template size.
+                region = ImageUtils._learned_rois[image_path]
+                region = (region[0] * frame_width, region[1] * frame_height, region[2] * frame_width + padding[0], region[3] * frame_height + padding[1])
+            else:
+                return None
+
+            left, top, right, bottom = min(left, region[0]), min(top, region[1]), max(right, region[2]), max(bottom, region[3])
+
+        margin_x, margin_y = ImageUtils._roi_margin * frame_width, ImageUtils._roi_margin * frame_height
+        left, top = max(0, int(left - margin_x)), max(0, int(top - margin_y))
+        right, bottom = min(frame_width, int(right + margin_x)), min(frame_height, int(bottom + margin_y))
+
+        # Skip the region of interest if it would not save any work.
+        if right - left < padding[0] or bottom - top < padding[1] or (right - left) * (bottom - top) >= 0.75 * frame_width * frame_height:
+            return None
+
+        return left, top, right, bottom
+
+    @staticmethod
+    def _learn_roi(image_path: str, location: Tuple[int, int], frame_shape: Tuple[int, ...]):
+        """Grow the learned region of interest of the template to include the top-left corner of a new match.
+
+        Args:
+            image_path (str): The file path of the template image.
+            location (Tuple[int, int]): The top-left location of the match inside the frame.
+            frame_shape (Tuple[int, ...]): Shape of the frame that was searched.
+
+        Returns:
+            None
+        """
+        x, y = location[0] / frame_shape[1], location[1] / frame_shape[0]
+        region = ImageUtils._learned_rois.get(image_path)
+        if region is None:
+            ImageUtils._learned_rois[image_path] = (x, y, x, y)
+        else:
+            ImageUtils._learned_rois[image_path] = (min(region[0], x), min(region[1], y), max(region[2], x), max(region[3], y))
+
+        return None
+
+    @staticmethod
+    def _search_roi(src: numpy.ndarray, image_paths: List[str], scales: List[float], confidence: float, crop_right: int = 0) -> Tuple[Optional[int], float, float, Tuple[int, int], numpy.ndarray]:
+        """Search the region of interest of the given templates first and fall back to searching the whole source image on a miss.
+
+        Args:
+            src (numpy.ndarray): The grayscale source image.
+            image_paths (List[str]): The file paths of the template images.
+            scales (List[float]): List of scales to try for every template.
+            confidence (float): Accuracy threshold for matching.
+            crop_right (int, optional): Number of pixels to crop off the right edge of the template images. Defaults to 0.
+
+        Returns:
+            (Tuple[Optional[int], float, float, Tuple[int, int], numpy.ndarray]): Same as ImageUtils._search() with the location relative to the whole source image.
+        """
+        key = (tuple(image_paths), tuple(scales), confidence, crop_right, src.shape)
+        ImageUtils._change_detector_statistics["searches"] += 1
+        if Settings.enable_frame_change_detection:
+            cached_result = ImageUtils._get_cached_result(key, src)
+            if cached_result is not None:
+                ImageUtils._change_detector_statistics["skipped"] += 1
+                ImageUtils._change_detector_statistics["correlations_saved"] += len(image_paths) * len(scales)
+                return cached_result
+
+        largest_shapes = [TemplateCache.get(image_path, max(scales), crop_right = crop_right).shape for image_path in image_paths]
+        padding = (max(shape[1] for shape in largest_shapes), max(shape[0] for shape in largest_shapes))
+
+        roi = ImageUtils._get_roi(image_paths, src.shape, padding)
+        if roi is not None:
+            left, top, right, bottom = roi
+            index, score, new_scale, location, template_array = ImageUtils._search(src[top:bottom, left:right], image_paths, scales, confidence, crop_right = crop_right)
+            if index is not None and score >= confidence:
+                location = (location[0] + left, location[1] + top)
+                ImageUtils._learn_roi(image_paths[index], location, src.shape)
+                result = (index, score, new_scale, location, template_array)
+
+                # A hit stays valid for as long as the pixels under the match do not change.
+                if Settings.enable_frame_change_detection:
+                    ImageUtils._cache_result(key, src, (location[0], location[1], location[0] + template_array.shape[1], location[1] + template_array.shape[0]), result)
+
+                return result
+            elif Settings.debug_mode:
+                MessageLog.print_message(f"[DEBUG] Match not found inside the region of interest {roi}. Searching the whole frame...")
+
+        result = ImageUtils._search(src, image_paths, scales, confidence, crop_right = crop_right)
+        if result[0] is not None and result[1] >= confidence:
+            ImageUtils._learn_roi(image_paths[result[0]], result[3], src.shape)
+
+        if Settings.enable_frame_change_detection:
+            if result[0] is not None and result[1] >= confidence:
+                location, template_array = result[3], result[4]
+                ImageUtils._cache_result(key, src, (location[0], location[1], location[0] + template_array.shape[1], location[1] + template_array.shape[0]), result)
+            else:
+                ImageUtils._cache_result(key, src, (0, 0, src.shape[1], src.shape[0]), result)
+
+        return result
+
+    @staticmethod
+    def _get_cached_result(key: Tuple, src: numpy.ndarray) -> Optional[Tuple]:
+        """Get a previous search result for the same templates if the region of the frame that produced it has not changed since.
+
+        Args:
+            key (Tuple): The templates, scales, confidence, crop and frame shape of the search.
+            src (numpy.ndarray): The grayscale source image.
+
+        Returns:
+            (Optional[Tuple]): The cached result of ImageUtils._search_roi() or None if every cached region has changed.
+        """
+        for region, pixels, result in ImageUtils._result_cache.get(key, []):
+            left, top, right, bottom = region
+            if cv2.absdiff(src[top:bottom, left:right], pixels).max() <= ImageUtils._result_cache_threshold:
+                return result
+
+        return None
+
+    @staticmethod
+    def _cache_result(key: Tuple, src: numpy.ndarray, region: Tuple[int, int, int, int], result: Tuple):
+        """Remember the search result together with the full resolution pixels of the region of the frame that it depends on, keeping only the most recent ones.
 
         Args:
-            template (Image): The template image to be resized.
-            scale (float): The factor to scale by.
+            key (Tuple): The templates, scales, confidence, crop and frame shape of the search.
+            src (numpy.ndarray): The grayscale source image.
+            region (Tuple[int, int, int, int]): The (left, top, right, bottom) region of the source image that the result depends on.
+            result (Tuple): The result of ImageUtils._search_roi().
+
+        Returns:
+            None
+        """
+        left, top, right, bottom = region
+        entries = ImageUtils._result_cache.setdefault(key, [])
+        entries.insert(0, (region, src[top:bottom, left:right].copy(), result))
+        del entries[ImageUtils._result_cache_size:]
+        return None
+
+    @staticmethod
+    def get_change_detector_statistics() -> Dict[str, int]:
+        """Get the counters of the frame change detector.
+
+        Returns:
+            (Dict[str, int]): The number of searches, how many of them were skipped because their region had not changed and how many correlations that saved.
+        """
+        return dict(ImageUtils._change_detector_statistics)
+
+    @staticmethod
+    def reset_change_detector_statistics():
+        """Reset the counters of the frame change detector.
+
+        Returns:
+            None
+        """
+        ImageUtils._change_detector_statistics = {"searches": 0, "skipped": 0, "correlations_saved": 0}
+        return None
+
+    @staticmethod
+    def print_change_detector_statistics():
+        """Print the counters of the frame change detector to the message log.
 
         Returns:
-            The Image object rescaled.
+            None
         """
-        width = template.width
-        height = template.height
-        return template.resize(size = (int(width * scale), int(height * scale)), resample = None)
+        statistics = ImageUtils._change_detector_statistics
+        MessageLog.print_message(f"[DEBUG] Frame change detector: skipped {statistics['skipped']} of {statistics['searches']} searches on unchanged frames, "
+                                 f"saving {statistics['correlations_saved']} correlations.")
+        return None
 
     @staticmethod
     def _match(image_path: str, confidence: float = 0.8, \
-               use_single_scale: bool = False, is_summon: bool = False, is_sub: bool = False) -> bool:
+               use_single_scale: bool = False, is_summon: bool = False, is_sub: bool = False, scales: List[float] = None) -> bool:
         """Match the given template image against the source screenshot to find a match location.
 
         Args:
@@ -132,275 +888,236 @@ class ImageUtils:
             use_single_scale: Use a range of scales if this is disabled. Otherwise, it will use the custom_scale value.
             is_summon: Crop out the plus signs on a summon template image before doing template matching.
             is_sub: if is searching on sub window.
+            scales: List of scales to search instead of the ones around the custom_scale value.
+
+        Returns:
+            (bool): True if the template was found inside the source image and False otherwise.
+        """
+        src: numpy.ndarray = ImageUtils._capture_source(is_sub = is_sub)
+
+        # Summon templates are cropped so that plus marks would not potentially obscure any match.
+        crop_right = int(40 * ImageUtils._custom_scale) if is_summon else 0
+        if scales is None:
+            scales = ImageUtils._get_scales(use_single_scale)
+
+        index, score, new_scale, location, template_array = ImageUtils._search_roi(src, [image_path], scales, confidence, crop_right = crop_right)
+
+        if index is not None and score >= confidence:
+            height, width = template_array.shape
+            if Settings.debug_mode:
+                region = (location[0] + width, location[1] + height)
+                cv2.imwrite(f"temp/match.png", cv2.rectangle(src.copy(), location, region, 255, 5))
+
+            ImageUtils._match_location = ImageUtils._translate_location(location, width, height, is_sub = is_sub)
+            ImageUtils._match_scale = new_scale
+
+            if Settings.debug_mode:
+                MessageLog.print_message(f"[DEBUG] Match found with {score:.4f} >= {confidence:.2f} at Point {ImageUtils._match_location} using scale: {new_scale:.2f}")
+
+            return True
+        elif Settings.debug_mode:
+            MessageLog.print_message(f"[WARNING] Match not found with {score:.4f} not >= {confidence:.2f} at Point {location} using scale: {new_scale:.2f}.")
+
+        return False
+
+    @staticmethod
+    def _match_any(image_paths: List[str], confidence: float = 0.8, use_single_scale: bool = False, is_sub: bool = False) -> Optional[int]:
+        """Match all the given template images against one source screenshot in parallel and keep the best match.
+
+        Args:
+            image_paths (List[str]): The file paths of the template images to match against in a source image.
+            confidence (float, optional): Accuracy threshold for matching. Defaults to 0.8.
+            use_single_scale (bool, optional): Use a range of scales if this is disabled. Otherwise, it will use the custom_scale value. Defaults to False.
+            is_sub (bool, optional): Search on the sub window. Defaults to False.
+
+        Returns:
+            (Optional[int]): Index of the template image with the best match if it passed the confidence. Otherwise, None.
+        """
+        src: numpy.ndarray = ImageUtils._capture_source(is_sub = is_sub)
+
+        best_index, best_score, best_scale, best_location, best_template = ImageUtils._search_roi(src, image_paths, ImageUtils._get_scales(use_single_scale), confidence)
+
+        if best_index is not None and best_score >= confidence:
+            height, width = best_template.shape
+            ImageUtils._match_location = ImageUtils._translate_location(best_location, width, height, is_sub = is_sub)
+            ImageUtils._match_scale = best_scale
+
+            if Settings.debug_mode:
+                MessageLog.print_message(f"[DEBUG] Best match was {os.path.basename(image_paths[best_index])} with {best_score:.4f} >= {confidence:.2f} at Point {ImageUtils._match_location} using scale: {best_scale:.2f}")
+
+            return best_index
+        elif Settings.debug_mode:
+            MessageLog.print_message(f"[WARNING] Match not found with {best_score:.4f} not >= {confidence:.2f} for any of {len(image_paths)} templates.")
+
+        return None
+
+    @staticmethod
+    def _non_max_suppression(boxes: numpy.ndarray, scores: numpy.ndarray, overlap: float = 0.3) -> List[int]:
+        """Greedily keep the highest scoring boxes and suppress every other box that overlaps a kept box by more than the allowed Intersection over Union.
+
+        Args:
+            boxes (numpy.ndarray): Array of shape (N, 4) containing the (left, top, right, bottom) of each box.
+            scores (numpy.ndarray): Array of shape (N,) containing the score of each box where higher is better.
+            overlap (float, optional): Maximum Intersection over Union that two kept boxes are allowed to have. Defaults to 0.3.
 
         Returns:
-            (bool): True if the template was found inside the source image and False otherwise.
+            (List[int]): Indices of the kept boxes ordered from highest to lowest score.
         """
+        if len(boxes) == 0:
+            return []
 
-        match_check = False
-        if is_sub:
-            image: Image = pyautogui.screenshot(region = (Window.sub_start, Window.sub_top, Window.width, Window.sub_height))
-        elif Settings.window_left is not None and Settings.window_top is not None and Settings.window_width is not None and Settings.window_height is not None:
-            image: Image = pyautogui.screenshot(region = (Settings.window_left, Settings.window_top, Settings.window_width, Settings.window_height))
-        else:
-            image: Image = pyautogui.screenshot()
-
-        # Create the range of scales.
-        scales = []
-        if ImageUtils._custom_scale != 1.0 and use_single_scale is False:
-            scales.append(ImageUtils._custom_scale - 0.02)
-            scales.append(ImageUtils._custom_scale - 0.01)
-            scales.append(ImageUtils._custom_scale)
-            scales.append(ImageUtils._custom_scale + 0.01)
-            scales.append(ImageUtils._custom_scale + 0.02)
-        elif ImageUtils._custom_scale != 1.0 and use_single_scale:
-            scales.append(ImageUtils._custom_scale)
-        else:
-            scales.append(1.0)
-
-        while len(scales) != 0:
-            new_scale = scales.pop(0)
+        boxes = boxes.astype(numpy.float32)
+        areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+        order = numpy.argsort(-scores, kind = "stable")
 
-            # Rescale if necessary.
-            if new_scale != 1.0:
-                template = PIL.Image.open(image_path)
-                template = ImageUtils._rescale(template, new_scale)
-                Image.save(template, f"temp/rescaled.png")
-                template_array = cv2.imread(f"temp/rescaled.png", 0)
-            else:
-                template_array = cv2.imread(image_path, 0)
+        keep = []
+        while order.size > 0:
+            index = order[0]
+            keep.append(int(index))
+            rest = order[1:]
 
-            if is_summon:
-                # Crop the summon template image so that plus marks would not potentially obscure any match.
-                height, width = template_array.shape
-                template_array = template_array[0:height, 0:width - int(40 * ImageUtils._custom_scale)]
+            # Intersection over Union of the kept box against every remaining box at once.
+            inter_width = numpy.clip(numpy.minimum(boxes[index, 2], boxes[rest, 2]) - numpy.maximum(boxes[index, 0], boxes[rest, 0]), 0, None)
+            inter_height = numpy.clip(numpy.minimum(boxes[index, 3], boxes[rest, 3]) - numpy.maximum(boxes[index, 1], boxes[rest, 1]), 0, None)
+            intersection = inter_width * inter_height
+            iou = intersection / (areas[index] + areas[rest] - intersection)
 
-            image.save(f"temp/source.png")
-            src: numpy.ndarray = cv2.imread(f"temp/source.png", 0)
-            height, width = template_array.shape
+            order = rest[iou <= overlap]
 
-            result: numpy.ndarray = cv2.matchTemplate(src, template_array, ImageUtils._match_method)
-            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-
-            if (ImageUtils._match_method == cv2.TM_SQDIFF or ImageUtils._match_method == cv2.TM_SQDIFF_NORMED) and min_val <= 1.0 - confidence:
-                ImageUtils._match_location = min_loc
-                match_check = True
-            elif ImageUtils._match_method != cv2.TM_SQDIFF and ImageUtils._match_method != cv2.TM_SQDIFF_NORMED and max_val >= confidence:
-                ImageUtils._match_location = max_loc
-                match_check = True
-            elif Settings.debug_mode:
-                if ImageUtils._match_method == cv2.TM_SQDIFF or ImageUtils._match_method == cv2.TM_SQDIFF_NORMED:
-                    MessageLog.print_message(f"[WARNING] Match not found with {min_val:.4f} not <= {(1.0 - confidence):.2f} at Point {min_loc} using scale: {new_scale:.2f}.")
-                else:
-                    MessageLog.print_message(f"[WARNING] Match not found with {max_val:.4f} not >= {confidence:.2f} at Point {max_loc} using scale: {new_scale:.2f}.")
+        return keep
 
-            if match_check:
-                region = (ImageUtils._match_location[0] + width, ImageUtils._match_location[1] + height)
-                cv2.rectangle(src, ImageUtils._match_location, region, 255, 5)
+    @staticmethod
+    def _sort_row_major(locations: List[Tuple[int, int]], row_tolerance: int) -> List[Tuple[int, int]]:
+        """Sort locations from top to bottom and then from left to right, treating locations whose y values are close to each other as the same row.
 
-                if Settings.debug_mode:
-                    cv2.imwrite(f"temp/match.png", src)
+        Args:
+            locations (List[Tuple[int, int]]): The locations to sort.
+            row_tolerance (int): Maximum distance in pixels on the y axis for a location to belong to the current row.
 
-                if Settings.farming_mode.endswith("V2"):
-                    if is_sub:
-                        temp_location = list(ImageUtils._match_location)
-                        temp_location[0] += Window.sub_start
-                        temp_location[1] += Window.sub_top
-                    else:
-                        temp_location = list(ImageUtils._match_location)
-                        temp_location[0] += Window.start
-                        temp_location[1] += Window.top
-                else:
-                    if Settings.additional_calibration_required is False:
-                        temp_location = list(ImageUtils._match_location)
-                        temp_location[0] += int(width / 2)
-                        temp_location[1] += int(height / 2)
-                    else:
-                        temp_location = list(ImageUtils._match_location)
-                        temp_location[0] += (pyautogui.size()[0] - (pyautogui.size()[0] - Settings.window_left)) + int(width / 2)
-                        temp_location[1] += (pyautogui.size()[1] - (pyautogui.size()[1] - Settings.window_top)) + int(height / 2)
+        Returns:
+            (List[Tuple[int, int]]): The sorted locations.
+        """
+        sorted_locations: List[Tuple[int, int]] = []
+        row: List[Tuple[int, int]] = []
+        row_y = None
+        for location in sorted(locations, key = lambda point: point[1]):
+            if row_y is not None and location[1] - row_y > row_tolerance:
+                sorted_locations.extend(sorted(row))
+                row = []
+                row_y = None
+
+            if row_y is None:
+                row_y = location[1]
+            row.append(location)
+
+        sorted_locations.extend(sorted(row))
+        return sorted_locations
 
-                ImageUtils._match_location = tuple(temp_location)
+    @staticmethod
+    def _is_neighbour_match(src: numpy.ndarray, box: Tuple[int, int, int, int], score: float, neighbour_paths: List[str], scale: float) -> bool:
+        """Check if any of the look-alike templates matches the area of a match better than the template that found it.
 
-                if ImageUtils._match_method == cv2.TM_SQDIFF or ImageUtils._match_method == cv2.TM_SQDIFF_NORMED:
-                    if Settings.debug_mode:
-                        MessageLog.print_message(f"[DEBUG] Match found with {min_val:.4f} <= {confidence:.2f} at Point {ImageUtils._match_location} using scale: {new_scale:.2f}")
-                else:
-                    if Settings.debug_mode:
-                        MessageLog.print_message(f"[DEBUG] Match found with {max_val:.4f} >= {confidence:.2f} at Point {ImageUtils._match_location} using scale: {new_scale:.2f}")
+        Args:
+            src (numpy.ndarray): The grayscale source image.
+            box (Tuple[int, int, int, int]): The (left, top, width, height) of the match inside the source image.
+            score (float): Score of the template that found the match.
+            neighbour_paths (List[str]): The file paths of the look-alike templates.
+            scale (float): Scale that the match was found at.
 
+        Returns:
+            (bool): True if the match actually belongs to one of the look-alike templates.
+        """
+        left, top, width, height = box
+        for neighbour_path in neighbour_paths:
+            neighbour_array = TemplateCache.get(neighbour_path, scale)
+
+            # Only search the area of the match with some room for the neighbour to be offset or sized slightly differently.
+            margin_x = 4 + max(0, neighbour_array.shape[1] - width)
+            margin_y = 4 + max(0, neighbour_array.shape[0] - height)
+            window = src[max(0, top - margin_y):top + height + margin_y, max(0, left - margin_x):left + width + margin_x]
+            if neighbour_array.shape[0] > window.shape[0] or neighbour_array.shape[1] > window.shape[1]:
+                continue
+
+            if float(ImageUtils._score_map(window, neighbour_array).max()) > score:
                 return True
 
-        del scales
         return False
 
     @staticmethod
-    def _match_all(image_path: str, confidence: float = 0.8, use_single_scale: bool = False) -> List[Tuple[int, ...]]:
+    def _match_all(image_path: str, confidence: float = 0.8, use_single_scale: bool = False, overlap: float = 0.3, neighbour_paths: List[str] = None,
+                   src: numpy.ndarray = None, roi: Tuple[float, float, float, float] = None) -> List[Tuple[int, ...]]:
         """Match the given template image against the source screenshot to find all match locations.
 
         Args:
             image_path (str): The file path of the template image to match against in a source image.
             confidence (float, optional): Accuracy threshold for matching. Defaults to 0.8.
             use_single_scale (bool, optional): Use a range of scales if this is disabled. Otherwise, it will use the custom_scale value. Defaults to False.
+            overlap (float, optional): Maximum Intersection over Union that two matches are allowed to have before the weaker one is discarded. Defaults to 0.3.
+            neighbour_paths (List[str], optional): The file paths of look-alike templates. Matches that any of them matches better are discarded. Defaults to None.
+            src (numpy.ndarray, optional): Grayscale frame that was captured earlier to search instead of capturing a new one. The locations are then the centers of
+                the matches inside that frame. Defaults to None.
+            roi (Tuple[float, float, float, float], optional): The (left, top, right, bottom) region of the source image as fractions to search in. Defaults to the
+                whole source image.
 
         Returns:
-            (List[Tuple[int, ...]]): List of Tuples containing match locations.
+            (List[Tuple[int, ...]]): List of Tuples containing match locations sorted from top to bottom and then from left to right.
         """
-        if Settings.window_left is not None and Settings.window_top is not None and Settings.window_width is not None and Settings.window_height is not None:
-            image: Image = pyautogui.screenshot(region = (Settings.window_left, Settings.window_top, Settings.window_width, Settings.window_height))
-        else:
-            image: Image = pyautogui.screenshot()
-
-        # Create the range of scales.
-        scales = []
-        if ImageUtils._custom_scale != 1.0 and use_single_scale is False:
-            scales.append(ImageUtils._custom_scale - 0.02)
-            scales.append(ImageUtils._custom_scale - 0.01)
-            scales.append(ImageUtils._custom_scale)
-            scales.append(ImageUtils._custom_scale + 0.01)
-            scales.append(ImageUtils._custom_scale + 0.02)
-        elif ImageUtils._custom_scale != 1.0 and use_single_scale:
-            scales.append(ImageUtils._custom_scale)
-        else:
-            scales.append(1.0)
-
-        match_check = False
-        new_scale = 0.0
-        match_locations = []
-        src: numpy.ndarray
-        template_array: numpy.ndarray
-
-        # Determine which scale can be used to find the very first match.
-        while match_check is False and len(scales) != 0:
-            new_scale = scales.pop(0)
-
-            # Rescale if necessary.
-            if new_scale != 1.0:
-                template = PIL.Image.open(image_path)
-                template = ImageUtils._rescale(template, new_scale)
-                Image.save(template, f"temp/rescaled.png")
-                template_array = cv2.imread(f"temp/rescaled.png", 0)
-            else:
-                template_array = cv2.imread(image_path, 0)
-
-            image.save(f"temp/source.png")
+        translate = src is None
+        if src is None:
+            src = ImageUtils._capture_source()
+
+        offset_x, offset_y = 0, 0
+        if roi is not None:
+            offset_x, offset_y = int(roi[0] * src.shape[1]), int(roi[1] * src.shape[0])
+            src = src[offset_y:int(roi[3] * src.shape[0]), offset_x:int(roi[2] * src.shape[1])]
+
+        for new_scale in ImageUtils._order_scales(image_path, ImageUtils._get_scales(use_single_scale)):
+            # Grab the rescaled template from the cache.
+            template_array = TemplateCache.get(image_path, new_scale)
             height, width = template_array.shape
-            src: numpy.ndarray = cv2.imread(f"temp/source.png", 0)
-
-            result: numpy.ndarray = cv2.matchTemplate(src, template_array, ImageUtils._match_method)
-            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-
-            if (ImageUtils._match_method == cv2.TM_SQDIFF or ImageUtils._match_method == cv2.TM_SQDIFF_NORMED) and min_val <= 1.0 - confidence:
-                ImageUtils._match_location = min_loc
-                match_check = True
-
-                region = (ImageUtils._match_location[0] + width, ImageUtils._match_location[1] + height)
-                cv2.rectangle(src, ImageUtils._match_location, region, 255, 5)
-
-                if Settings.additional_calibration_required is False:
-                    temp_location = list(ImageUtils._match_location)
-                    temp_location[0] += int(width / 2)
-                    temp_location[1] += int(height / 2)
-                else:
-                    temp_location = list(ImageUtils._match_location)
-                    temp_location[0] += (pyautogui.size()[0] - (pyautogui.size()[0] - Settings.window_left)) + int(width / 2)
-                    temp_location[1] += (pyautogui.size()[1] - (pyautogui.size()[1] - Settings.window_top)) + int(height / 2)
-
-                ImageUtils._match_location = tuple(temp_location)
-                match_locations.append(ImageUtils._match_location)
-            elif ImageUtils._match_method != cv2.TM_SQDIFF and ImageUtils._match_method != cv2.TM_SQDIFF_NORMED and max_val >= confidence:
-                ImageUtils._match_location = max_loc
-                match_check = True
-
-                region = (ImageUtils._match_location[0] + width, ImageUtils._match_location[1] + height)
-                cv2.rectangle(src, ImageUtils._match_location, region, 255, 5)
-
-                if Settings.additional_calibration_required is False:
-                    temp_location = list(ImageUtils._match_location)
-                    temp_location[0] += int(width / 2)
-                    temp_location[1] += int(height / 2)
-                else:
-                    temp_location = list(ImageUtils._match_location)
-                    temp_location[0] += (pyautogui.size()[0] - (pyautogui.size()[0] - Settings.window_left)) + int(width / 2)
-                    temp_location[1] += (pyautogui.size()[1] - (pyautogui.size()[1] - Settings.window_top)) + int(height / 2)
 
-                ImageUtils._match_location = tuple(temp_location)
-                match_locations.append(ImageUtils._match_location)
-
-        # Now loop until all other matches are found and break out when there are no more to be found.
-        while match_check:
-            height, width = template_array.shape
+            if height > src.shape[0] or width > src.shape[1]:
+                continue
 
+            # Correlate the template once and then pick out every match from the result map.
             result: numpy.ndarray = cv2.matchTemplate(src, template_array, ImageUtils._match_method)
-            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+            if ImageUtils._match_method == cv2.TM_SQDIFF or ImageUtils._match_method == cv2.TM_SQDIFF_NORMED:
+                result = 1.0 - result
 
-            if (ImageUtils._match_method == cv2.TM_SQDIFF or ImageUtils._match_method == cv2.TM_SQDIFF_NORMED) and min_val <= 1.0 - confidence:
-                ImageUtils._match_location = min_loc
+            # Only keep the local peaks that pass the confidence instead of every pixel around them.
+            peaks = (result >= confidence) & (result >= cv2.dilate(result, numpy.ones((3, 3), numpy.uint8)))
+            ys, xs = numpy.nonzero(peaks)
 
+            if len(xs) == 0:
                 if Settings.debug_mode:
-                    MessageLog.print_message(f"[DEBUG] Match found with {min_val:.4f} <= {confidence:.2f} at Point {ImageUtils._match_location} using scale: {new_scale:.2f}.")
-                    cv2.imwrite(f"temp/matchAll.png", src)
+                    MessageLog.print_message(f"[WARNING] Match not found with {float(result.max()):.4f} not >= {confidence:.2f} using scale: {new_scale:.2f}.")
+                continue
 
-                region = (ImageUtils._match_location[0] + width, ImageUtils._match_location[1] + height)
-                cv2.rectangle(src, ImageUtils._match_location, region, 255, 5)
+            scores = result[ys, xs]
+            boxes = numpy.stack((xs, ys, xs + width, ys + height), axis = 1)
+            keep = ImageUtils._non_max_suppression(boxes, scores, overlap)
 
-                if Settings.additional_calibration_required is False:
-                    temp_location = list(ImageUtils._match_location)
-                    temp_location[0] += int(width / 2)
-                    temp_location[1] += int(height / 2)
-                else:
-                    temp_location = list(ImageUtils._match_location)
-                    temp_location[0] += (pyautogui.size()[0] - (pyautogui.size()[0] - Settings.window_left)) + int(width / 2)
-                    temp_location[1] += (pyautogui.size()[1] - (pyautogui.size()[1] - Settings.window_top)) + int(height / 2)
-
-                ImageUtils._match_location = tuple(temp_location)
-
-                if match_locations.__contains__(ImageUtils._match_location) is False and \
-                        match_locations.__contains__(tuple([ImageUtils._match_location[0] + 1, ImageUtils._match_location[1]])) is False and \
-                        match_locations.__contains__(tuple([ImageUtils._match_location[0], ImageUtils._match_location[1] + 1])) is False and \
-                        match_locations.__contains__(tuple([ImageUtils._match_location[0] + 1, ImageUtils._match_location[1] + 1])) is False:
-                    match_locations.append(ImageUtils._match_location)
-                elif match_locations.__contains__(ImageUtils._match_location):
-                    break
-            elif ImageUtils._match_method != cv2.TM_SQDIFF and ImageUtils._match_method != cv2.TM_SQDIFF_NORMED and max_val >= confidence:
-                ImageUtils._match_location = max_loc
-
-                if Settings.debug_mode:
-                    MessageLog.print_message(f"[DEBUG] Match found with {max_val:.4f} >= {confidence:.2f} at Point {ImageUtils._match_location} using scale: {new_scale:.2f}.")
-                    cv2.imwrite(f"temp/matchAll.png", src)
-
-                region = (ImageUtils._match_location[0] + width, ImageUtils._match_location[1] + height)
-                cv2.rectangle(src, ImageUtils._match_location, region, 255, 5)
+            if neighbour_paths:
+                kept_count = len(keep)
+                keep = [index for index in keep if not ImageUtils._is_neighbour_match(src, (int(xs[index]), int(ys[index]), width, height), float(scores[index]), neighbour_paths, new_scale)]
+                if Settings.debug_mode and len(keep) != kept_count:
+                    MessageLog.print_message(f"[DEBUG] Discarded {kept_count - len(keep)} matches that look-alike templates matched better.")
 
-                if Settings.additional_calibration_required is False:
-                    temp_location = list(ImageUtils._match_location)
-                    temp_location[0] += int(width / 2)
-                    temp_location[1] += int(height / 2)
-                else:
-                    temp_location = list(ImageUtils._match_location)
-                    temp_location[0] += (pyautogui.size()[0] - (pyautogui.size()[0] - Settings.window_left)) + int(width / 2)
-                    temp_location[1] += (pyautogui.size()[1] - (pyautogui.size()[1] - Settings.window_top)) + int(height / 2)
-
-                ImageUtils._match_location = tuple(temp_location)
-
-                if match_locations.__contains__(ImageUtils._match_location) is False and \
-                        match_locations.__contains__(tuple([ImageUtils._match_location[0] + 1, ImageUtils._match_location[1]])) is False and \
-                        match_locations.__contains__(tuple([ImageUtils._match_location[0], ImageUtils._match_location[1] + 1])) is False and \
-                        match_locations.__contains__(tuple([ImageUtils._match_location[0] + 1, ImageUtils._match_location[1] + 1])) is False:
-                    match_locations.append(ImageUtils._match_location)
-                elif match_locations.__contains__(ImageUtils._match_location):
-                    break
+            if Settings.debug_mode:
+                MessageLog.print_message(f"[DEBUG] Found {len(keep)} matches from {len(xs)} peaks >= {confidence:.2f} using scale: {new_scale:.2f}.")
+                debug_src = src.copy()
+                for index in keep:
+                    cv2.rectangle(debug_src, (int(xs[index]), int(ys[index])), (int(xs[index]) + width, int(ys[index]) + height), 255, 5)
+                cv2.imwrite(f"temp/matchAll.png", debug_src)
+
+            ImageUtils._set_scale_affinity(image_path, new_scale)
+            if translate:
+                match_locations = [ImageUtils._translate_center((int(xs[index]) + offset_x, int(ys[index]) + offset_y), width, height) for index in keep]
             else:
-                if Settings.debug_mode:
-                    if ImageUtils._match_method == cv2.TM_SQDIFF or ImageUtils._match_method == cv2.TM_SQDIFF_NORMED:
-                        MessageLog.print_message(f"[WARNING] Match not found with {min_val:.4f} not <= {(1.0 - confidence):.2f} at Point {min_loc} using scale: {new_scale:.2f}.")
-                    else:
-                        MessageLog.print_message(f"[WARNING] Match not found with {max_val:.4f} not >= {confidence:.2f} at Point {max_loc} using scale: {new_scale:.2f}.")
+                match_locations = [(int(xs[index]) + offset_x + int(width / 2), int(ys[index]) + offset_y + int(height / 2)) for index in keep]
+            return ImageUtils._sort_row_major(match_locations, row_tolerance = max(1, height // 2))
 
-                match_check = False
-
-        del scales
-        return match_locations
+        return []
 
     @staticmethod
     def _determine_adjustment(image_name: str) -> int:
@@ -485,35 +1202,109 @@ class ImageUtils:
         else:
             new_tries = tries
 
-        # If Test Mode is enabled, prepare for it by setting initial scale.
         if test_mode:
-            new_tries = 50
-            ImageUtils._custom_scale = 0.30
+            # Search every scale from 0.30 up to 1.28 in steps of 0.02 against the same screenshot in one pass and keep the best one. Unlike stepping up the scales
+            # until the first one passes, the best scale sits in the middle of the scales that pass so the recommendation is centered on it instead of above it.
+            test_scales = [round(0.30 + (0.02 * step), 2) for step in range(50)]
+            if ImageUtils._match(f"{ImageUtils._current_dir}/images/buttons/{image_name.lower()}.jpg", confidence = custom_confidence, is_sub = is_sub, scales = test_scales):
+                ImageUtils._custom_scale = ImageUtils._match_scale
+                MessageLog.print_message(f"[SUCCESS] Found {image_name.upper()} at {ImageUtils._match_location} with scale {ImageUtils._custom_scale:.2f}, the best match out of " +
+                                         f"every scale from 0.30 to 1.28.\n\nRecommended to use scale {(ImageUtils._custom_scale - 0.01):.2f}, {ImageUtils._custom_scale:.2f} or " +
+                                         f"{(ImageUtils._custom_scale + 0.01):.2f} around the best matching scale.")
+                return ImageUtils._match_location
+
+            if not suppress_error:
+                MessageLog.print_message(f"[WARNING] Failed to find the {image_name.upper()} button.")
+            return None
 
         while new_tries > 0:
             result_flag: bool = ImageUtils._match(f"{ImageUtils._current_dir}/images/buttons/{image_name.lower()}.jpg", confidence = custom_confidence,
                                                   use_single_scale = Settings.enable_test_for_home_screen, is_sub = is_sub)
 
             if result_flag is False:
-                if test_mode:
-                    # Increment scale by 0.02 until a match is found if Test Mode is enabled.
-                    ImageUtils._custom_scale += 0.02
-
                 new_tries -= 1
                 if new_tries <= 0:
                     if not suppress_error:
                         MessageLog.print_message(f"[WARNING] Failed to find the {image_name.upper()} button.")
                     return None
             else:
-                if test_mode:
-                    MessageLog.print_message(f"[SUCCESS] Found {image_name.upper()} at {ImageUtils._match_location} with scale {ImageUtils._custom_scale:.2f}.\n\nRecommended to use " +
-                                             f"scale {(ImageUtils._custom_scale + 0.01):.2f}, {(ImageUtils._custom_scale + 0.02):.2f}, {(ImageUtils._custom_scale + 0.03):.2f} or "
-                                             f"{(ImageUtils._custom_scale + 0.04):.2f}.")
-
                 return ImageUtils._match_location
 
         return None
 
+    @staticmethod
+    def find_button_near(image_name: str, location: Tuple[int, int], radius: int = 2, custom_confidence: float = Settings.confidence) -> Optional[Tuple[int, int]]:
+        """Find the button only within the given number of pixels around where its center is expected to be, which only needs a screenshot of that small area.
+
+        Args:
+            image_name (str): Name of the button image file in the /images/buttons/ folder.
+            location (Tuple[int, int]): The location on the screen where the center of the button is expected to be.
+            radius (int, optional): Number of pixels the button is allowed to be away from the location. Defaults to 2.
+            custom_confidence (float, optional): Accuracy threshold for matching. Defaults to 0.8.
+
+        Returns:
+            (Optional[Tuple[int, int]]): The center of the button on the screen if it was found near the location.
+        """
+        image_path = f"{ImageUtils._current_dir}/images/buttons/{image_name.lower()}.jpg"
+        scales = ImageUtils._get_scales()
+        height, width = TemplateCache.get(image_path, max(scales)).shape
+
+        screen_width, screen_height = pyautogui.size()
+        left, top = max(0, location[0] - width // 2 - radius), max(0, location[1] - height // 2 - radius)
+        right, bottom = min(screen_width, location[0] - width // 2 + width + radius), min(screen_height, location[1] - height // 2 + height + radius)
+        if right - left < width or bottom - top < height:
+            return None
+
+        src = ImageUtils._to_grayscale(Capture.grab((left, top, right - left, bottom - top)))
+        index, score, _, match_location, template_array = ImageUtils._search(src, [image_path], scales, custom_confidence)
+        if index is None or score < custom_confidence:
+            return None
+
+        match_height, match_width = template_array.shape
+        return left + match_location[0] + match_width // 2, top + match_location[1] + match_height // 2
+
+    @staticmethod
+    def find_any(image_names: List[str], custom_confidence: float = Settings.confidence, tries: int = 5, suppress_error: bool = False, disable_adjustment: bool = False,
+                 bypass_general_adjustment: bool = False, is_sub: bool = False) -> Optional[Tuple[str, Tuple[int, int]]]:
+        """Find the best match out of several alternative button images, all matched against the same screenshot.
+
+        Args:
+            image_names (List[str]): Names of the button image files in the /images/buttons/ folder.
+            custom_confidence (float, optional): Accuracy threshold for matching. Defaults to 0.8.
+            tries (int, optional): Number of tries before failing. Note that this gets overridden if the first image_name is one of the adjustments. Defaults to 5.
+            suppress_error (bool, optional): Suppresses template matching error if True. Defaults to False.
+            disable_adjustment (bool, optional): Disable the usage of adjustment to tries. Defaults to False.
+            bypass_general_adjustment (bool, optional): Bypass using the general adjustment for the number of tries. Defaults to False.
+            is_sub (bool, optional): Flag to enable usage of a second window. Defaults to False.
+
+        Returns:
+            (Optional[Tuple[str, Tuple[int, int]]]): Name of the button image that matched best and the coordinates of where its center is located if image matching was successful.
+        """
+        if Settings.debug_mode:
+            MessageLog.print_message(f"\n[DEBUG] Starting process to find any of the {[image_name.upper() for image_name in image_names]} button images...")
+
+        new_tries = ImageUtils._determine_adjustment(image_names[0])
+        if new_tries == 0 and disable_adjustment is False:
+            if Settings.enable_general_adjustment and bypass_general_adjustment is False and tries == 5:
+                new_tries = Settings.adjust_button_search_general
+            else:
+                new_tries = tries
+        else:
+            new_tries = tries
+
+        image_paths = [f"{ImageUtils._current_dir}/images/buttons/{image_name.lower()}.jpg" for image_name in image_names]
+        while new_tries > 0:
+            index = ImageUtils._match_any(image_paths, confidence = custom_confidence, use_single_scale = Settings.enable_test_for_home_screen, is_sub = is_sub)
+            if index is not None:
+                return image_names[index], ImageUtils._match_location
+
+            new_tries -= 1
+
+        if not suppress_error:
+            MessageLog.print_message(f"[WARNING] Failed to find any of the {[image_name.upper() for image_name in image_names]} buttons.")
+
+        return None
+
     @staticmethod
     def confirm_location(image_name: str, custom_confidence: float = Settings.confidence, tries: int = 5, suppress_error: bool = False, disable_adjustment: bool = False,
                          bypass_general_adjustment: bool = False):
@@ -671,7 +1462,8 @@ class ImageUtils:
             Game.wait(1.0)
 
     @staticmethod
-    def find_all(image_name: str, is_item: bool = False, custom_confidence: float = Settings.confidence_all, hide_info: bool = False) -> List[Tuple[int, ...]]:
+    def find_all(image_name: str, is_item: bool = False, custom_confidence: float = Settings.confidence_all, hide_info: bool = False, overlap: float = 0.3,
+                 neighbour_paths: List[str] = None) -> List[Tuple[int, ...]]:
         """Find the specified image file by locating all occurrences on the screen.
 
         Args:
@@ -679,165 +1471,448 @@ class ImageUtils:
             is_item (bool, optional): Determines whether to search for the image file in the /images/buttons/ or /images/items/ folder. Defaults to False.
             custom_confidence (float, optional): Accuracy threshold for matching. Defaults to 0.8.
             hide_info (bool, optional): Whether to print the matches' locations. Defaults to False.
+            overlap (float, optional): Maximum Intersection over Union that two occurrences are allowed to have before the weaker one is discarded. Defaults to 0.3.
+            neighbour_paths (List[str], optional): The file paths of look-alike templates. Occurrences that any of them matches better are discarded. Defaults to None.
 
         Returns:
-            (List[Tuple[int, ...]): List of occurrences found on the screen. If no occurrence was found, return a empty list.
+            (List[Tuple[int, ...]): List of occurrences found on the screen sorted from top to bottom and then from left to right. If no occurrence was found, return a empty list.
         """
         if is_item:
             folder_name = "items"
         else:
             folder_name = "buttons"
 
-        locations = ImageUtils._match_all(f"{ImageUtils._current_dir}/images/{folder_name}/{image_name}.jpg", custom_confidence)
-        filtered_locations: List[Tuple[int, ...]] = []
-        same_y: int = 0
-        sort_flag: bool = False
+        locations = ImageUtils._match_all(f"{ImageUtils._current_dir}/images/{folder_name}/{image_name}.jpg", custom_confidence, overlap = overlap, neighbour_paths = neighbour_paths)
 
         if len(locations) != 0:
-            for (index, location) in enumerate(locations):
-                if index > 0:
-                    # Filter out duplicate locations where they are 1 pixel away from each other.
-                    if location[0] != (locations[index - 1][0] + 1) and location[1] != (locations[index - 1][1] + 1):
-                        filtered_locations.append(location)
-                        if same_y != location[1]:
-                            same_y = location[1]
-                            sort_flag = False
-                        else:
-                            sort_flag = True
-                else:
-                    filtered_locations.append(location)
-                    same_y = location[1]
-                    sort_flag = False
+            if not hide_info:
+                MessageLog.print_message(f"[INFO] Occurrence for {image_name.upper()} found at: {locations}")
+        else:
+            if Settings.debug_mode:
+                MessageLog.print_message(f"[DEBUG] Failed to detect any occurrences of {image_name.upper()} images.")
 
-            # Sort the matched locations.
-            def first(point):
-                return point[0]
+        return locations
 
-            def second(point):
-                return point[1]
+    @staticmethod
+    def get_ocr_reader() -> "easyocr.Reader":
+        """Get the EasyOCR reader, creating it on first use and reusing it for the rest of the process.
 
-            if sort_flag:
-                if Settings.debug_mode:
-                    MessageLog.print_message(f"[DEBUG] Sorting array using first key")
-                filtered_locations.sort(key = first)
-            else:
-                if Settings.debug_mode:
-                    MessageLog.print_message(f"[DEBUG] Sorting array using second key")
-                filtered_locations.sort(key = second)
+        Returns:
+            (easyocr.Reader): The EasyOCR reader.
+        """
+        with ImageUtils._reader_lock:
+            if ImageUtils._reader is not None:
+                return ImageUtils._reader
 
-            if not hide_info:
-                MessageLog.print_message(f"[INFO] Occurrence for {image_name.upper()} found at: {filtered_locations}")
+            if not os.path.exists(ImageUtils._current_dir + "/backend/model/"):
+                os.makedirs(ImageUtils._current_dir + "/backend/model/")
+
+            import easyocr
+
+            # Only ask for the GPU if CUDA is actually available instead of letting EasyOCR fall back with a warning.
+            try:
+                import torch
+                use_gpu = torch.cuda.is_available()
+            except ImportError:
+                use_gpu = False
+
+            try:
+                MessageLog.print_message(f"\n[INFO] Initializing EasyOCR reader {'on the GPU' if use_gpu else 'on the CPU'}. This may take a few seconds...")
+                ImageUtils._reader = easyocr.Reader(["en"], model_storage_directory = ImageUtils._current_dir + "/backend/model/", gpu = use_gpu)
+                MessageLog.print_message(f"[INFO] EasyOCR reader initialized.")
+            except UnicodeEncodeError:
+                # Tauri spawns the Python process using encoding cp1252 and not utf-8. Need to do this hacky way to force stdout to be utf-8 to get through
+                # EasyOCR initialization as it uses Unicode characters. This process is not needed after EasyOCR downloads the models to the /model/ folder.
+                MessageLog.print_message(f"\n[INFO] Seems that the models for EasyOCR has not been downloaded yet. Downloading them now after setting stdout encoding from cp1252 to utf-8...\n\n")
+                sys.stdout = codecs.getwriter("utf-8")(sys.stdout.detach())
+                ImageUtils._reader = easyocr.Reader(["en"], model_storage_directory = ImageUtils._current_dir + "/backend/model/", gpu = use_gpu)
+                MessageLog.print_message(f"\n[INFO] Models for EasyOCR has been downloaded successfully.\n\n")
+
+            return ImageUtils._reader
+
+    @staticmethod
+    def warm_up_ocr_reader():
+        """Create the EasyOCR reader and run it once on a blank image in a background thread so that the first loot check does not pay for loading the models.
+
+        Returns:
+            None
+        """
+        def warm_up():
+            reader = ImageUtils.get_ocr_reader()
+            reader.readtext(numpy.zeros((25, 30, 3), dtype = numpy.uint8), detail = 0)
+
+        threading.Thread(target = warm_up, name = "OCRWarmUp", daemon = True).start()
+        return None
+
+    @staticmethod
+    def _read_item_amounts(src: numpy.ndarray, locations: List[Tuple[int, ...]]) -> List[int]:
+        """Read the amount next to every detected item from one capture of the loot screen with a single batched recognition pass.
+
+        Args:
+            src (numpy.ndarray): The grayscale capture of the loot screen.
+            locations (List[Tuple[int, ...]]): Locations of the detected items inside the capture.
+
+        Returns:
+            (List[int]): Amount gained for each item location, in the same order.
+        """
+        if len(locations) == 0:
+            return []
+
+        # Adjust the width and height variables if EasyOCR cannot detect the numbers correctly.
+        width = 30
+        height = 25
+        boxes = [(max(0, location[0] + 10), max(0, location[1] - 5)) for location in locations]
+
+        # Slice every amount out of the capture and stack them on top of each other so that each box is its own row of the image in the order of the locations.
+        crops = [src[box[1]:box[1] + height, box[0]:box[0] + width] for box in boxes]
+        loot_image = numpy.zeros((height * len(crops), width), dtype = src.dtype)
+        for index, crop in enumerate(crops):
+            loot_image[index * height:index * height + crop.shape[0], :crop.shape[1]] = crop
+        # cv2.imwrite(f"temp/test.png", loot_image) # Uncomment this line of code to see what the bot captured for the region of the detected text.
+
+        horizontal_list = [[0, width, index * height, (index + 1) * height] for index in range(len(crops))]
+
+        use_digit_recognizer = Settings.ocr_engine == "digits"
+        if use_digit_recognizer and not DigitRecognizer.is_trained():
+            MessageLog.print_message(f"[WARNING] The digit recognizer has not been trained yet. Falling back to EasyOCR...")
+            use_digit_recognizer = False
+
+        if use_digit_recognizer:
+            texts = [DigitRecognizer.recognize(loot_image[box[2]:box[3], box[0]:box[1]]) for box in horizontal_list]
         else:
+            # The boxes are already known so skip text detection and only run recognition over all of them as one batch.
+            results = ImageUtils.get_ocr_reader().recognize(loot_image, horizontal_list = horizontal_list, free_list = [], batch_size = len(horizontal_list),
+                                                           allowlist = "0123456789x", detail = 1)
+
+            # EasyOCR returns the results sorted by position so map them back to the index of their box through the row they are in. A box without a result stays empty.
+            texts = [""] * len(horizontal_list)
+            for result in results:
+                index = int(result[0][0][1]) // height
+                if 0 <= index < len(texts):
+                    texts[index] = result[1]
+
+            # Keep what EasyOCR read as labelled samples for training the digit recognizer.
             if Settings.debug_mode:
-                MessageLog.print_message(f"[DEBUG] Failed to detect any occurrences of {image_name.upper()} images.")
+                for box, text in zip(horizontal_list, texts):
+                    DigitRecognizer.save_sample(loot_image[box[2]:box[3], box[0]:box[1]], text)
+
+        amounts = []
+        for text in texts:
+            # Take the first number out of the extracted text, like the 10 in "x10". The item was detected so a text without any digits means it dropped once.
+            match = re.search(r"\d+", text)
+            amounts.append(int(match.group()) if match is not None else 1)
+
+        return amounts
+
+    @staticmethod
+    def capture_loot_frame() -> numpy.ndarray:
+        """Capture the Loot Collected screen so that its items can be detected later with ImageUtils.find_farmed_items() after the bot has moved on.
 
-        return filtered_locations
+        Returns:
+            (numpy.ndarray): The RGB capture of the game window.
+        """
+        return Capture.grab(ImageUtils.get_capture_region())
+
+    @staticmethod
+    def save_loot_screenshot(frame: numpy.ndarray):
+        """Save a capture of the Loot Collected screen from ImageUtils.capture_loot_frame() in the /results/ folder, for items that were detected with the screenshot skipped.
+
+        Args:
+            frame (numpy.ndarray): The RGB capture of the Loot Collected screen.
+
+        Returns:
+            None
+        """
+        ImageUtils._take_screenshot(frame)
+        return None
 
     @staticmethod
-    def find_farmed_items(item_name: str, take_screenshot: bool = True) -> int:
+    def find_farmed_items(item_names: Union[str, Collection[str]], take_screenshot: bool = True, frame: numpy.ndarray = None) -> Union[int, Dict[str, int]]:
         """Detect amounts of items gained according to the desired items specified.
 
+        Every item is matched against the same capture of the Loot Collected screen and all of their amounts are read in a single OCR batch.
+
         Args:
-            item_name (str): Item to be found.
+            item_names (Union[str, Collection[str]]): Item to be found or the items to be found together.
             take_screenshot (bool, optional): Takes a screenshot whenever matches were detected. Defaults to True.
+            frame (numpy.ndarray, optional): Capture of the Loot Collected screen from ImageUtils.capture_loot_frame() to use instead of capturing the screen now. Defaults to None.
 
         Returns:
-            (int): Amount gained for the item.
+            (Union[int, Dict[str, int]]): Amount gained for the item or the amount gained for each item if a collection of items was given.
         """
-        try:
-            if not os.path.exists(ImageUtils._current_dir + "/backend/model/"):
-                os.makedirs(ImageUtils._current_dir + "/backend/model/")
-
-            MessageLog.print_message(f"\n[INFO] Initializing EasyOCR reader. This may take a few seconds...")
-            ImageUtils._reader = easyocr.Reader(["en"], model_storage_directory = ImageUtils._current_dir + "/backend/model/", gpu = True)
-            MessageLog.print_message(f"[INFO] EasyOCR reader initialized.")
-        except UnicodeEncodeError:
-            # Tauri spawns the Python process using encoding cp1252 and not utf-8. Need to do this hacky way to force stdout to be utf-8 to get through
-            # EasyOCR initialization as it uses Unicode characters. This process is not needed after EasyOCR downloads the models to the /model/ folder.
-            MessageLog.print_message(f"\n[INFO] Seems that the models for EasyOCR has not been downloaded yet. Downloading them now after setting stdout encoding from cp1252 to utf-8...\n\n")
-            sys.stdout = codecs.getwriter("utf-8")(sys.stdout.detach())
-            ImageUtils._reader = easyocr.Reader(["en"], model_storage_directory = ImageUtils._current_dir + "/backend/model/", gpu = True)
-            MessageLog.print_message(f"\n[INFO] Models for EasyOCR has been downloaded successfully.\n\n")
-
-        # List of items blacklisted from using the standard confidence and instead need a custom confidence to detect them.
-        blacklisted_items = ["Fire Orb", "Water Orb", "Earth Orb", "Wind Orb", "Light Orb", "Dark Orb",
-                             "Red Tome", "Blue Tome", "Brown Tome", "Green Tome", "White Tome", "Black Tome",
-                             "Hellfire Scroll", "Flood Scroll", "Thunder Scroll", "Gale Scroll", "Skylight Scroll", "Chasm Scroll",
-                             "Jasper Scale", "Crystal Spirit", "Luminous Judgment", "Sagittarius Rune", "Sunlight Quartz", "Shadow Silver",
-                             "Ifrit Anima", "Cocytus Anima", "Vohu Manah Anima", "Sagittarius Anima", "Corow Anima", "Diablo Anima",
-                             "Ifrit Omega Anima", "Cocytus Omega Anima", "Vohu Manah Omega Anima", "Sagittarius Omega Anima", "Corow Omega Anima", "Diablo Omega Anima",
-                             "Ancient Ecke Sachs", "Ancient Auberon", "Ancient Perseus", "Ancient Nalakuvara", "Ancient Bow of Artemis", "Ancient Cortana",
-                             "Ecke Sachs", "Auberon", "Perseus", "Nalakuvara", "Bow of Artemis", "Cortana"]
-
-        lite_blacklisted_items = ["Infernal Garnet", "Frozen Hell Prism", "Evil Judge Crystal", "Horseman's Plate", "Halo Light Quartz", "Phantom Demon Jewel",
-                                  "Tiamat Anima", "Colossus Anima", "Leviathan Anima", "Yggdrasil Anima", "Luminiera Anima", "Celeste Anima",
-                                  "Tiamat Omega Anima", "Colossus Omega Anima", "Leviathan Omega Anima", "Yggdrasil Omega Anima", "Luminiera Omega Anima", "Celeste Omega Anima",
-                                  "Shiva Anima", "Europa Anima", "Alexiel Anima", "Grimnir Anima", "Metatron Anima", "Avatar Anima",
-                                  "Shiva Omega Anima", "Europa Omega Anima", "Alexiel Omega Anima", "Grimnir Omega Anima", "Metatron Omega Anima", "Avatar Omega Anima",
-                                  "Twin Elements Anima", "Macula Marius Anima", "Medusa Anima", "Nezha Anima", "Apollo Anima", "Dark Angel Olivia Anima",
-                                  "Twin Elements Omega Anima", "Macula Marius Omega Anima", "Medusa Omega Anima", "Nezha Omega Anima", "Apollo Omega Anima", "Dark Angel Olivia Omega Anima",
-                                  "Athena Anima", "Grani Anima", "Baal Anima", "Garuda Anima", "Odin Anima", "Lich Anima",
-                                  "Athena Omega Anima", "Grani Omega Anima", "Baal Omega Anima", "Garuda Omega Anima", "Odin Omega Anima", "Lich Omega Anima",
-                                  "Prometheus Anima", "Ca Ong Anima", "Gilgamesh Anima", "Morrigna Anima", "Hector Anima", "Anubis Anima",
-                                  "Prometheus Omega Anima", "Ca Ong Omega Anima", "Gilgamesh Omega Anima", "Morrigna Omega Anima", "Hector Omega Anima", "Anubis Omega Anima",
-                                  "Huanglong Anima", "Huanglong Omega Anima", "Qilin Anima", "Qilin Omega Anima"]
+        single_item = isinstance(item_names, str)
+        names = [item_names] if single_item else list(dict.fromkeys(item_names))
 
         MessageLog.print_message(f"[INFO] Now detecting item rewards...")
 
-        total_amount_farmed = 0
+        if frame is None:
+            frame = ImageUtils.capture_loot_frame()
+        src = ImageUtils._to_grayscale(frame)
 
-        # Detect amounts gained from each item on the Loot Collected screen. If the item is on the blacklist, use my method instead.
-        if item_name in blacklisted_items:
-            locations = ImageUtils.find_all(item_name, is_item = True, custom_confidence = 0.99)
-        elif item_name in lite_blacklisted_items:
-            locations = ImageUtils.find_all(item_name, is_item = True, custom_confidence = 0.85)
+        # Detect each item using the confidence, region and look-alikes from its profile in the item catalog.
+        def find_item(item_name: str) -> List[Tuple[int, ...]]:
+            profile = ItemCatalog.get(item_name)
+            if profile is None:
+                if Settings.debug_mode:
+                    MessageLog.print_message(f"[DEBUG] Skipping {item_name.upper()} as it has no template image.")
+                return []
+
+            locations = ImageUtils._match_all(profile.path, profile.confidence, neighbour_paths = ItemCatalog.get_neighbour_paths(profile), src = src, roi = profile.roi)
+            if len(locations) != 0:
+                MessageLog.print_message(f"[INFO] Occurrence for {item_name.upper()} found at: {locations}")
+            elif Settings.debug_mode:
+                MessageLog.print_message(f"[DEBUG] Failed to detect any occurrences of {item_name.upper()} images.")
+
+            return locations
+
+        if len(names) == 1:
+            item_locations = [find_item(names[0])]
         else:
-            locations = ImageUtils.find_all(item_name, is_item = True)
-
-        for index, location in enumerate(locations):
-            check = False
-
-            # Filter out any duplicate locations that are 1 pixels from each other when the item is in either of the blacklists.
-            if item_name in blacklisted_items or item_name in lite_blacklisted_items:
-                for x in range(index):
-                    if (abs(location[0] - locations[x][0]) <= 1 and location[1] == locations[x][1]) or (abs(location[1] - locations[x][1]) and location[0] == locations[x][0]) or (
-                            abs(location[0] - locations[x][0]) and abs(location[1] - locations[x][1])):
-                        check = True
-
-            if not check:
-                # Create a screenshot in the specified region named "test" and save it in the /temp/ folder. Then use EasyOCR to extract text from it into a list.
-                # Adjust the width and height variables if EasyOCR cannot detect the numbers correctly.
-                left = location[0] + 10
-                top = location[1] - 5
-                width = 30
-                height = 25
-                test_image = pyautogui.screenshot(f"temp/test.png", region = (left, top, width, height))
-                # test_image.show() # Uncomment this line of code to see what the bot captured for the region of the detected text.
-                result = ImageUtils._reader.readtext(f"temp/test.png", detail = 0)
-
-                # Split any unnecessary characters in the extracted text until only the number remains.
-                result_cleaned = 0
-                if len(result) != 0:
-                    result_split = [char for char in result[0]]
-                    for char in result_split:
-                        try:
-                            if int(char):
-                                result_cleaned = int(char)
-                        except ValueError:
-                            continue
-                else:
-                    result_cleaned = 1
+            item_locations = list(ImageUtils._executor.map(find_item, names))
 
-                total_amount_farmed += result_cleaned
-            else:
-                MessageLog.print_message(f"[INFO] Duplicate location detected. Removing it...")
+        # Overlapping matches of the same item were already suppressed so every location is a distinct item. Read all of them at once and split the amounts back up by item.
+        amounts = ImageUtils._read_item_amounts(src, [location for locations in item_locations for location in locations])
+
+        amounts_farmed: Dict[str, int] = {}
+        start = 0
+        for item_name, locations in zip(names, item_locations):
+            amounts_farmed[item_name] = sum(amounts[start:start + len(locations)])
+            start += len(locations)
 
         # If items were detected on the Quest Results screen, take a screenshot and save in the /results/ folder.    
-        if take_screenshot and total_amount_farmed != 0:
-            ImageUtils._take_screenshot()
+        if take_screenshot and sum(amounts_farmed.values()) != 0:
+            ImageUtils._take_screenshot(frame)
 
         MessageLog.print_message(f"[INFO] Detection of item rewards finished.")
-        return total_amount_farmed
+        return amounts_farmed[names[0]] if single_item else amounts_farmed
+
+    @staticmethod
+    def _frame_thumbnail(frame: numpy.ndarray) -> numpy.ndarray:
+        """Shrink the frame into a small thumbnail that is cheap to compare against another one.
+
+        Args:
+            frame (numpy.ndarray): The grayscale frame.
+
+        Returns:
+            (numpy.ndarray): The 64x64 thumbnail as signed integers.
+        """
+        return cv2.resize(frame, (64, 64), interpolation = cv2.INTER_AREA).astype(numpy.int16)
+
+    @staticmethod
+    def wait_until(predicate: Callable[[], Any], timeout: Optional[float] = 10.0, poll_interval: float = 0.1, backoff: float = 1.5, max_poll_interval: float = 1.0,
+                   is_sub: bool = False) -> Any:
+        """Wait until the predicate holds, evaluating it again as soon as the captured window has changed since the last evaluation and at least every maximum poll interval.
+
+        Every poll captures a new frame, even when called inside another ImageUtils.shared_frame(). The predicate runs inside ImageUtils.shared_frame() so its checks
+        reuse the frame that was captured for change detection. Change detection is only a fast path, as a change too small for the thumbnails to pick up can still
+        make the predicate hold. While the window stays the same, the poll interval grows by the backoff factor up to the maximum and goes back to the starting poll
+        interval as soon as the window changes.
+
+        Args:
+            predicate (Callable[[], Any]): Function that returns a truthy value when the condition holds.
+            timeout (Optional[float], optional): Number of seconds to wait before giving up or None to wait forever. Defaults to 10.0.
+            poll_interval (float, optional): Starting number of seconds between captures. Defaults to 0.1.
+            backoff (float, optional): Factor to grow the poll interval by while the window has not changed. Defaults to 1.5.
+            max_poll_interval (float, optional): Maximum number of seconds between captures. Defaults to 1.0.
+            is_sub (bool, optional): Detect changes on the sub window. Defaults to False.
+
+        Returns:
+            (Any): The truthy value returned by the predicate or None if the timeout was reached.
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        interval = poll_interval
+        last_thumbnail = None
+        last_evaluated_at = 0.0
+
+        while True:
+            with ImageUtils.shared_frame():
+                thumbnail = ImageUtils._frame_thumbnail(ImageUtils._capture_source(is_sub = is_sub, fresh = True))
+                changed = last_thumbnail is None or numpy.abs(thumbnail - last_thumbnail).max() > ImageUtils._frame_change_threshold
+                if changed:
+                    interval = poll_interval
+                else:
+                    interval = min(interval * backoff, max_poll_interval)
+
+                if changed or time.perf_counter() - last_evaluated_at >= max_poll_interval:
+                    last_thumbnail = thumbnail
+                    last_evaluated_at = time.perf_counter()
+
+                    result = predicate()
+                    if result:
+                        return result
+
+            if deadline is not None:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return None
+                time.sleep(min(interval, remaining))
+            else:
+                time.sleep(interval)
+
+    @staticmethod
+    def wait_for_settle(timeout: float, location: Optional[Tuple[int, int]] = None, is_sub: bool = False, poll_interval: float = 0.03, stable_seconds: float = 0.3,
+                        baseline: Optional[numpy.ndarray] = None) -> Tuple[float, bool]:
+        """Wait for the screen to change and then settle, instead of always sleeping for the whole timeout.
+
+        Frames are captured from the start of the wait. Once the window or the area around the given location has changed from the first frame, or from the baseline
+        if one was given, this returns as soon as both have stayed the same for the given number of seconds. A screen that never changes does not count as settled, as
+        a page that is loading over the network can stay still for a while before it starts rendering. Every poll captures a new frame, even when called inside
+        ImageUtils.shared_frame().
+
+        Args:
+            timeout (float): Maximum number of seconds to wait.
+            location (Optional[Tuple[int, int]], optional): Location on the screen to also watch the area around, like where a click happened. Defaults to None.
+            is_sub (bool, optional): Watch the sub window. Defaults to False.
+            poll_interval (float, optional): Number of seconds between captures. Defaults to 0.03.
+            stable_seconds (float, optional): Number of seconds without changes for the screen to count as settled. Defaults to 0.3.
+            baseline (Optional[numpy.ndarray], optional): Grayscale frame of the watched window from before the action, so that a change that already happened before
+                the first capture of the wait still counts. Defaults to None.
+
+        Returns:
+            (Tuple[float, bool]): Number of seconds that were waited and whether the screen settled before the timeout.
+        """
+        start_time = time.perf_counter()
+
+        region = ImageUtils.get_capture_region(is_sub = is_sub)
+        if location is not None and region is not None:
+            location = (location[0] - region[0], location[1] - region[1])
+
+        def thumbnails(frame: Optional[numpy.ndarray] = None) -> Tuple[numpy.ndarray, ...]:
+            if frame is None:
+                frame = ImageUtils._capture_source(is_sub = is_sub, fresh = True)
+            if location is None:
+                return (ImageUtils._frame_thumbnail(frame),)
+
+            left, top = min(max(0, location[0] - 150), frame.shape[1] - 1), min(max(0, location[1] - 150), frame.shape[0] - 1)
+            return ImageUtils._frame_thumbnail(frame), ImageUtils._frame_thumbnail(frame[top:top + 300, left:left + 300])
+
+        def differs(first: Tuple[numpy.ndarray, ...], second: Tuple[numpy.ndarray, ...]) -> bool:
+            return any(numpy.abs(a - b).max() > ImageUtils._frame_change_threshold for a, b in zip(first, second))
+
+        first = previous = thumbnails(baseline)
+        last_change_time = None
+        settled = False
+        while time.perf_counter() - start_time < timeout:
+            time.sleep(min(poll_interval, max(0.0, timeout - (time.perf_counter() - start_time))))
+            current = thumbnails()
+
+            if differs(first if last_change_time is None else previous, current):
+                last_change_time = time.perf_counter()
+            elif last_change_time is not None and time.perf_counter() - last_change_time >= stable_seconds:
+                settled = True
+                break
+
+            previous = current
+
+        return time.perf_counter() - start_time, settled
+
+    @staticmethod
+    def _is_in_sub_window(location: Tuple[int, int]) -> bool:
+        """Check if the location on the screen is inside of the sub window.
+
+        Args:
+            location (Tuple[int, int]): The location on the screen.
+
+        Returns:
+            (bool): True if there is a sub window and the location is inside of it.
+        """
+        sub_region = ImageUtils.get_capture_region(is_sub = True) if Window.sub_start is not None else None
+        return sub_region is not None and None not in sub_region and sub_region[0] <= location[0] < sub_region[0] + sub_region[2] and \
+            sub_region[1] <= location[1] < sub_region[1] + sub_region[3]
+
+    @staticmethod
+    def capture_click_baseline(location: Tuple[int, int]) -> numpy.ndarray:
+        """Capture the window that is about to be clicked at the location, to hand to ImageUtils.wait_for_click_settle() after the click.
+
+        Args:
+            location (Tuple[int, int]): The location on the screen that is about to be clicked.
+
+        Returns:
+            (numpy.ndarray): The grayscale frame of the window from before the click.
+        """
+        return ImageUtils._capture_source(is_sub = ImageUtils._is_in_sub_window(location), fresh = True)
+
+    @staticmethod
+    def wait_for_click_settle(location: Tuple[int, int], image_name: str, timeout: float = 1.0, poll_interval: float = 0.03, stable_seconds: float = 0.3,
+                              baseline: Optional[numpy.ndarray] = None) -> Tuple[float, bool]:
+        """Wait for the screen to react to a click and then settle, instead of always sleeping for the whole timeout.
+
+        Args:
+            location (Tuple[int, int]): The location on the screen that was clicked.
+            image_name (str): Name of the clicked template to record the settle time under.
+            timeout (float, optional): Maximum number of seconds to wait. Defaults to 1.0.
+            poll_interval (float, optional): Number of seconds between captures. Defaults to 0.03.
+            stable_seconds (float, optional): Number of seconds without changes for the screen to count as settled. Defaults to 0.3.
+            baseline (Optional[numpy.ndarray], optional): Frame from ImageUtils.capture_click_baseline() before the click. Defaults to None.
+
+        Returns:
+            (Tuple[float, bool]): Number of seconds that were waited and whether the screen settled before the timeout.
+        """
+        # Watch the window that was clicked in.
+        is_sub = ImageUtils._is_in_sub_window(location)
+
+        elapsed, settled = ImageUtils.wait_for_settle(timeout, location = location, is_sub = is_sub, poll_interval = poll_interval, stable_seconds = stable_seconds,
+                                                      baseline = baseline)
+
+        times = ImageUtils._settle_times.setdefault(image_name, [])
+        times.append(elapsed)
+        del times[:-ImageUtils._settle_history_size]
+        if not settled:
+            ImageUtils._settle_timeouts[image_name] = ImageUtils._settle_timeouts.get(image_name, 0) + 1
+
+        if Settings.debug_mode:
+            MessageLog.print_message(f"[DEBUG] Screen {'settled' if settled else 'did not settle'} after clicking {image_name.upper()} in {elapsed:.3f} seconds.")
+
+        return elapsed, settled
+
+    @staticmethod
+    def get_settle_statistics() -> Dict[str, Dict[str, float]]:
+        """Get the distribution of the settle times after clicking each template.
+
+        Returns:
+            (Dict[str, Dict[str, float]]): The number of clicks, timeouts and the median, 90th percentile and maximum settle seconds keyed by template name.
+        """
+        statistics = {}
+        for image_name, times in ImageUtils._settle_times.items():
+            statistics[image_name] = {"clicks": len(times), "timeouts": ImageUtils._settle_timeouts.get(image_name, 0), "p50": float(numpy.percentile(times, 50)),
+                                      "p90": float(numpy.percentile(times, 90)), "max": float(max(times))}
+
+        return statistics
+
+    @staticmethod
+    def print_settle_statistics():
+        """Print the distribution of the settle times after clicking each template to the message log.
+
+        Returns:
+            None
+        """
+        for image_name, statistics in sorted(ImageUtils.get_settle_statistics().items()):
+            MessageLog.print_message(f"[DEBUG] Click settle time for {image_name.upper()}: {statistics['clicks']} clicks, {statistics['timeouts']} timeouts, "
+                                     f"p50 {statistics['p50']:.3f}s, p90 {statistics['p90']:.3f}s, max {statistics['max']:.3f}s.")
+
+        return None
+
+    @staticmethod
+    def wait_for_button(image_name: str, timeout: float = 10.0, custom_confidence: float = Settings.confidence, suppress_error: bool = False, is_sub: bool = False) -> Optional[Tuple[int, int]]:
+        """Wait for the specified button to appear, returning as soon as it does.
+
+        Args:
+            image_name (str): Name of the button image file in the /images/buttons/ folder.
+            timeout (float, optional): Number of seconds to wait before giving up. Defaults to 10.0.
+            custom_confidence (float, optional): Accuracy threshold for matching. Defaults to 0.8.
+            suppress_error (bool, optional): Suppresses template matching error if True. Defaults to False.
+            is_sub (bool, optional): Flag to enable usage of a second window. Defaults to False.
+
+        Returns:
+            (Optional[Tuple[int, int]]): Coordinates of where the center of the button is located if it appeared before the timeout.
+        """
+        location = ImageUtils.wait_until(lambda: ImageUtils.find_button(image_name, custom_confidence = custom_confidence, tries = 1, suppress_error = True,
+                                                                        disable_adjustment = True, is_sub = is_sub), timeout = timeout, is_sub = is_sub)
+
+        if location is None and not suppress_error:
+            MessageLog.print_message(f"[WARNING] The {image_name.upper()} button did not appear within {timeout} seconds.")
+
+        return location
 
     @staticmethod
     def wait_vanish(image_name: str, timeout: int = 10, suppress_error: bool = False) -> bool:
@@ -873,12 +1948,7 @@ class ImageUtils:
         Returns:
             (Tuple[int, int]): Tuple of the width and the height of the image.
         """
-        if Settings.custom_scale == 1.0:
-            image = PIL.Image.open(f"{ImageUtils._current_dir}/images/buttons/{image_name}.jpg")
-        else:
-            image = PIL.Image.open(f"temp/rescaled.png")
-        width, height = image.size
-        image.close()
+        height, width = TemplateCache.get(f"{ImageUtils._current_dir}/images/buttons/{image_name}.jpg", ImageUtils._custom_scale).shape
         return width, height
     
     @staticmethod
@@ -900,9 +1970,12 @@ class ImageUtils:
         return 0,0, width, height
 
     @staticmethod
-    def _take_screenshot():
+    def _take_screenshot(frame: numpy.ndarray = None):
         """Takes a screenshot of the Quest Results screen when called in find_farmed_items().
 
+        Args:
+            frame (numpy.ndarray, optional): RGB capture of the Quest Results screen to save instead of taking a new screenshot. Defaults to None.
+
         Returns:
             None
         """
@@ -917,7 +1990,10 @@ class ImageUtils:
             ImageUtils._new_folder_name = f"{current_date} {current_time}"
 
         # Take a screenshot using the calibrated window dimensions.
-        new_image: PIL.Image.Image = pyautogui.screenshot(region = (Settings.window_left, Settings.window_top, Settings.window_width, Settings.window_height))
+        if frame is not None:
+            new_image: PIL.Image.Image = PIL.Image.fromarray(frame)
+        else:
+            new_image: PIL.Image.Image = Capture.grab_image(region = (Settings.window_left, Settings.window_top, Settings.window_width, Settings.window_height))
 
         # Create the /results/ directory if it does not already exist.
         current_dir = os.getcwd()
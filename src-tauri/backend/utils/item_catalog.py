@@ -0,0 +1,148 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from utils.settings import Settings
+from utils.message_log import MessageLog
+
+
+class ItemProfile:
+    """
+    How to detect one item on the Loot Collected screen.
+    """
+
+    def __init__(self, name: str, path: str, confidence: float, neighbours: List[str] = None, roi: Tuple[float, float, float, float] = (0.0, 0.0, 1.0, 1.0)):
+        self.name = name
+        self.path = path
+        self.confidence = confidence
+        self.neighbours = neighbours or []
+        self.roi = roi
+
+
+class ItemCatalog:
+    """
+    Index of every item template in images/items/, built once per process together with the optional images/items/manifest.json.
+
+    The manifest maps item names to the overrides of their detection profile, like {"items": {"Fire Orb": {"confidence": 0.99, "neighbours": ["Water Orb"],
+    "roi": [0.0, 0.2, 1.0, 1.0]}}}. The confidence replaces Settings.confidence_all, the neighbours are items that look so similar that a match is only kept if
+    it does not match any of them better and the optional roi is the (left, top, right, bottom) region of the Loot Collected screen as fractions to search in,
+    which defaults to the whole window.
+    """
+
+    _items_dir: str = f"{os.getcwd()}/images/items"
+    _manifest_path: str = f"{_items_dir}/manifest.json"
+
+    _items: Dict[str, ItemProfile] = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _load() -> Dict[str, ItemProfile]:
+        """Build the profile of every item template from the folder and the manifest.
+
+        Returns:
+            (Dict[str, ItemProfile]): The profiles keyed by item name.
+        """
+        items: Dict[str, ItemProfile] = {}
+        if os.path.exists(ItemCatalog._items_dir):
+            for entry in os.scandir(ItemCatalog._items_dir):
+                name, extension = os.path.splitext(entry.name)
+                if extension.lower() == ".jpg":
+                    items[name] = ItemProfile(name, f"{ItemCatalog._items_dir}/{entry.name}", Settings.confidence_all)
+
+        manifest = {}
+        if os.path.exists(ItemCatalog._manifest_path):
+            try:
+                with open(ItemCatalog._manifest_path) as file:
+                    manifest = json.load(file).get("items", {})
+            except (ValueError, AttributeError) as e:
+                MessageLog.print_message(f"[WARNING] Failed to read the item manifest from {ItemCatalog._manifest_path}: {e}")
+
+        for name, overrides in manifest.items():
+            profile = items.get(name)
+            if profile is None:
+                MessageLog.print_message(f"[WARNING] Skipping {name} in the item manifest as it has no template image in {ItemCatalog._items_dir}.")
+                continue
+
+            try:
+                profile.confidence = float(overrides.get("confidence", profile.confidence))
+            except (ValueError, TypeError) as e:
+                MessageLog.print_message(f"[WARNING] Ignoring the invalid confidence of {name} in the item manifest: {e}")
+
+            if overrides.get("roi") is not None:
+                try:
+                    roi = tuple(float(value) for value in overrides["roi"])
+                    if len(roi) != 4 or not 0.0 <= roi[0] < roi[2] <= 1.0 or not 0.0 <= roi[1] < roi[3] <= 1.0:
+                        raise ValueError(f"{overrides['roi']} is not a (left, top, right, bottom) region inside of the window")
+                    profile.roi = roi
+                except (ValueError, TypeError) as e:
+                    MessageLog.print_message(f"[WARNING] Ignoring the invalid roi of {name} in the item manifest: {e}")
+
+            # Only keep the neighbours that can actually be matched.
+            profile.neighbours = []
+            for neighbour in overrides.get("neighbours", []):
+                if neighbour not in items:
+                    MessageLog.print_message(f"[WARNING] Skipping the neighbour {neighbour} of {name} in the item manifest as it has no template image.")
+                elif neighbour != name:
+                    profile.neighbours.append(neighbour)
+
+        return items
+
+    @staticmethod
+    def get_items() -> Dict[str, ItemProfile]:
+        """Get the profiles of all items, building the catalog on first use.
+
+        Returns:
+            (Dict[str, ItemProfile]): The profiles keyed by item name.
+        """
+        if ItemCatalog._items is None:
+            with ItemCatalog._lock:
+                if ItemCatalog._items is None:
+                    ItemCatalog._items = ItemCatalog._load()
+
+        return ItemCatalog._items
+
+    @staticmethod
+    def get(item_name: str) -> Optional[ItemProfile]:
+        """Get the detection profile of the item.
+
+        Args:
+            item_name (str): Name of the item.
+
+        Returns:
+            (Optional[ItemProfile]): The profile of the item or None if it has no template image.
+        """
+        return ItemCatalog.get_items().get(item_name)
+
+    @staticmethod
+    def get_known_items(item_names: List[str]) -> List[str]:
+        """Keep only the items that have a template image, warning about the rest as their drops can not be detected.
+
+        Args:
+            item_names (List[str]): Names of the items.
+
+        Returns:
+            (List[str]): Names of the items that have a template image in their original order.
+        """
+        items = ItemCatalog.get_items()
+        known_items = []
+        for item_name in item_names:
+            if item_name in items:
+                known_items.append(item_name)
+            else:
+                MessageLog.print_message(f"[WARNING] Skipping {item_name} as it has no template image in {ItemCatalog._items_dir} so its drops can not be detected.")
+
+        return known_items
+
+    @staticmethod
+    def get_neighbour_paths(profile: ItemProfile) -> List[str]:
+        """Get the template paths of the neighbours of the item.
+
+        Args:
+            profile (ItemProfile): The profile of the item.
+
+        Returns:
+            (List[str]): The file paths of the neighbour templates.
+        """
+        items = ItemCatalog.get_items()
+        return [items[neighbour].path for neighbour in profile.neighbours]
@@ -0,0 +1,156 @@
+import json
+import os
+import threading
+from typing import Dict, List
+
+import numpy
+
+from utils.message_log import MessageLog
+
+
+class LatencyModel:
+    """
+    Learns how long the game takes to respond to each action on this host and turns that into how long the bot should wait for it.
+
+    Each action is a name like "click:attack" or "combat:next" with the recent number of seconds the UI took to respond. Once enough samples are recorded, the wait
+    for an action becomes the 95th percentile of its samples plus a safety margin, so slow connections wait longer and fast ones stop sleeping for nothing. Waits that
+    timed out are recorded as the full wait, which pushes the next wait higher through the margin up to a maximum. The samples are saved to latency_model.json next to settings.json
+    so they carry over between sessions.
+    """
+
+    _path: str = f"{os.getcwd()}/backend/latency_model.json" if os.path.isdir(f"{os.getcwd()}/backend") else f"{os.getcwd()}/latency_model.json"
+
+    _history_size: int = 100
+    _min_samples: int = 5
+    _percentile: float = 95.0
+    _relative_margin: float = 0.2
+    _absolute_margin: float = 0.25
+    _max_factor: float = 2.0
+    _save_every: int = 20
+
+    _samples: Dict[str, List[float]] = None
+    _unsaved: int = 0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _load():
+        """Load the samples from the previous sessions if they have not been loaded yet.
+
+        Returns:
+            None
+        """
+        if LatencyModel._samples is not None:
+            return None
+
+        LatencyModel._samples = {}
+        if os.path.exists(LatencyModel._path):
+            try:
+                with open(LatencyModel._path) as file:
+                    data = json.load(file).get("actions", {})
+                for action, samples in data.items():
+                    LatencyModel._samples[action] = [float(sample) for sample in samples][-LatencyModel._history_size:]
+            except (ValueError, TypeError, AttributeError) as e:
+                MessageLog.print_message(f"[WARNING] Failed to read the latency model from {LatencyModel._path} so it will be learned from scratch: {e}")
+                LatencyModel._samples = {}
+
+        return None
+
+    @staticmethod
+    def record(action: str, seconds: float):
+        """Record how long the UI took to respond to the action.
+
+        Args:
+            action (str): Name of the action.
+            seconds (float): Number of seconds the UI took to respond. Waits that timed out should record the whole wait.
+
+        Returns:
+            None
+        """
+        with LatencyModel._lock:
+            LatencyModel._load()
+            samples = LatencyModel._samples.setdefault(action, [])
+            samples.append(round(seconds, 3))
+            del samples[:-LatencyModel._history_size]
+            LatencyModel._unsaved += 1
+            should_save = LatencyModel._unsaved >= LatencyModel._save_every
+
+        if should_save:
+            LatencyModel.save()
+
+        return None
+
+    @staticmethod
+    def has_enough_samples(action: str) -> bool:
+        """Check if enough samples of the action have been recorded for its learned wait to be used.
+
+        Args:
+            action (str): Name of the action.
+
+        Returns:
+            (bool): True if the action has at least the minimum number of samples.
+        """
+        with LatencyModel._lock:
+            LatencyModel._load()
+            return len(LatencyModel._samples.get(action, [])) >= LatencyModel._min_samples
+
+    @staticmethod
+    def get_delay(action: str, default: float, max_delay: float = None) -> float:
+        """Get how long to wait for the UI to respond to the action.
+
+        Args:
+            action (str): Name of the action.
+            default (float): Number of seconds to wait until enough samples of the action have been recorded.
+            max_delay (float, optional): Maximum number of seconds to wait. Defaults to twice the default.
+
+        Returns:
+            (float): The 95th percentile of the recorded samples plus the safety margin, capped at the maximum.
+        """
+        with LatencyModel._lock:
+            LatencyModel._load()
+            samples = LatencyModel._samples.get(action, [])
+            if len(samples) < LatencyModel._min_samples:
+                return default
+
+            delay = float(numpy.percentile(samples, LatencyModel._percentile)) * (1.0 + LatencyModel._relative_margin) + LatencyModel._absolute_margin
+
+        return min(delay, default * LatencyModel._max_factor if max_delay is None else max_delay)
+
+    @staticmethod
+    def save():
+        """Save the samples to disk so they carry over to the next session.
+
+        Returns:
+            None
+        """
+        with LatencyModel._lock:
+            if LatencyModel._samples is None or LatencyModel._unsaved == 0:
+                return None
+
+            # Write to a temporary file first so that stopping the bot in the middle of saving does not corrupt the model.
+            temp_path = f"{LatencyModel._path}.tmp"
+            try:
+                with open(temp_path, "w") as file:
+                    json.dump({"actions": LatencyModel._samples}, file)
+                os.replace(temp_path, LatencyModel._path)
+                LatencyModel._unsaved = 0
+            except OSError as e:
+                MessageLog.print_message(f"[WARNING] Failed to save the latency model to {LatencyModel._path}: {e}")
+
+        return None
+
+    @staticmethod
+    def print_statistics():
+        """Print the learned wait of each action to the message log.
+
+        Returns:
+            None
+        """
+        with LatencyModel._lock:
+            LatencyModel._load()
+            actions = {action: list(samples) for action, samples in LatencyModel._samples.items() if len(samples) > 0}
+
+        for action, samples in sorted(actions.items()):
+            MessageLog.print_message(f"[DEBUG] Latency of {action}: {len(samples)} samples, p50 {numpy.percentile(samples, 50):.3f}s, "
+                                     f"p95 {numpy.percentile(samples, LatencyModel._percentile):.3f}s, max {max(samples):.3f}s.")
+
+        return None
@@ -1,12 +1,13 @@
 import random
-from typing import Optional
+import time
+from typing import Dict, Optional
 
 import pyautogui
-import pyclick
 import pyperclip
 
 from utils.settings import Settings
 from utils.message_log import MessageLog
+from utils.latency_model import LatencyModel
 
 from time import sleep
 import numpy as np
@@ -18,16 +19,119 @@ class MouseUtils:
     Provides the utility functions needed to perform mouse-related actions.
     """
 
-    _hc = pyclick.HumanClicker()
     # The lower the more smooth, the higher the more accurate to the speed
     bezier_mouse_smoothness = max(0.01, Settings.mouse_smoothness / 100)
     # 1000 to 3000 is tested
     bezier_mouse_speed = max(1000.0, 1000.0 * Settings.custom_mouse_speed)
 
+    # Pool of pre-generated curve shapes going from (0, 0) to (1, 0) that get rotated and scaled onto every move, with their offsets from the straight line as
+    # fractions of the distance. Every shape is replaced with a new one after it was used so that the paths do not repeat.
+    _shape_pool_size: int = 32
+    _shape_points: int = 512
+    _shape_offset: float = 0.2
+    # Offsets from the straight line stop growing past this distance in pixels, so long moves do not swing further out than 100 pixels.
+    _max_offset_distance: float = 500.0
+    _shape_pool: np.ndarray = None
+
     if Settings.enable_bezier_curve_mouse_movement is False:
         pyautogui.MINIMUM_DURATION = 0.1
         pyautogui.MINIMUM_SLEEP = 0.05
         pyautogui.PAUSE = 0.25
+    else:
+        pyautogui.MINIMUM_DURATION = 0
+        pyautogui.MINIMUM_SLEEP = 0
+        pyautogui.PAUSE = 0.015
+
+    @staticmethod
+    def _bezier(control_points: np.ndarray, point_count: int) -> np.ndarray:
+        """Evaluate the Bezier curve of the control points at evenly spaced steps in one matrix product of the Bernstein basis.
+
+        Args:
+            control_points (np.ndarray): Array of shape (K, 2) with the control points.
+            point_count (int): Number of points to evaluate.
+
+        Returns:
+            (np.ndarray): Array of shape (point_count, 2) with the points along the curve.
+        """
+        degree = len(control_points) - 1
+        t = np.linspace(0.0, 1.0, point_count)[:, np.newaxis]
+        i = np.arange(degree + 1)[np.newaxis, :]
+        binomials = np.array([math.comb(degree, k) for k in range(degree + 1)], dtype = np.float64)
+        basis = binomials * t ** i * (1.0 - t) ** (degree - i)
+        return basis @ control_points
+
+    @staticmethod
+    def _generate_shape() -> np.ndarray:
+        """Generate a normalized curve shape from (0, 0) to (1, 0) that is pulled towards two random knots around the straight line like pyclick.HumanCurve does.
+
+        Returns:
+            (np.ndarray): Array of shape (MouseUtils._shape_points, 2) with the points of the shape.
+        """
+        knots = np.column_stack((np.random.uniform(0.0, 1.0, 2), np.random.uniform(-MouseUtils._shape_offset, MouseUtils._shape_offset, 2)))
+        control_points = np.vstack(([0.0, 0.0], knots, [1.0, 0.0]))
+        return MouseUtils._bezier(control_points, MouseUtils._shape_points)
+
+    @staticmethod
+    def _get_shape_pool() -> np.ndarray:
+        """Get the pool of curve shapes, generating it on first use.
+
+        Returns:
+            (np.ndarray): Array of shape (MouseUtils._shape_pool_size, MouseUtils._shape_points, 2) with the shapes.
+        """
+        if MouseUtils._shape_pool is None:
+            MouseUtils._shape_pool = np.stack([MouseUtils._generate_shape() for _ in range(MouseUtils._shape_pool_size)])
+
+        return MouseUtils._shape_pool
+
+    @staticmethod
+    def _fit_shape(shape: np.ndarray, start: np.ndarray, end: np.ndarray, point_count: int) -> np.ndarray:
+        """Rotate and scale the normalized shape onto the start and end points and pick the points that the mouse will stop at.
+
+        Args:
+            shape (np.ndarray): Array of shape (N, 2) with the normalized shape.
+            start (np.ndarray): The start point on the screen.
+            end (np.ndarray): The end point on the screen.
+            point_count (int): Number of points that the mouse will stop at.
+
+        Returns:
+            (np.ndarray): Array of shape (point_count, 2) with the integer points on the screen.
+        """
+        delta = end - start
+        distance = float(np.hypot(delta[0], delta[1]))
+        if distance < 1.0:
+            return np.rint(np.repeat(end[np.newaxis, :], max(2, point_count), axis = 0)).astype(np.int64)
+
+        # The offsets from the straight line go along the unit normal, randomly flipped to either side.
+        normal = np.array([-delta[1], delta[0]]) / distance * min(distance, MouseUtils._max_offset_distance) * random.choice((-1.0, 1.0))
+
+        # Ease out so that the mouse slows down as it reaches the end like pyclick's easeOutQuad tweening.
+        steps = np.linspace(0.0, 1.0, max(2, point_count))
+        indices = (steps * (2.0 - steps) * (len(shape) - 1)).astype(np.int64)
+        points = start + shape[indices, :1] * delta + shape[indices, 1:] * normal
+
+        # Jitter about half of the points along the way so that the curve is not perfectly smooth.
+        jitter = np.random.normal(1.0, 1.0, len(points)) * (np.random.random(len(points)) < 0.5)
+        jitter[0] = jitter[-1] = 0.0
+        points[:, 1] += jitter
+
+        points = np.rint(points).astype(np.int64)
+        points[-1] = end
+        return points
+
+    @staticmethod
+    def _generate_curve(start: np.ndarray, end: np.ndarray, point_count: int) -> np.ndarray:
+        """Get the points of a human-like curve between the start and end points from a random shape of the pool.
+
+        Args:
+            start (np.ndarray): The start point on the screen.
+            end (np.ndarray): The end point on the screen.
+            point_count (int): Number of points that the mouse will stop at.
+
+        Returns:
+            (np.ndarray): Array of shape (point_count, 2) with the integer points on the screen.
+        """
+        pool = MouseUtils._get_shape_pool()
+        return MouseUtils._fit_shape(pool[random.randrange(len(pool))], start, end, point_count)
 
     @staticmethod
     def move_to(x: int, y: int, custom_mouse_speed: float = 0.0):
@@ -42,27 +146,39 @@ class MouseUtils:
             None
         """
         if Settings.enable_bezier_curve_mouse_movement:
-            target_pos = (x, y)
-            current_pos = pyautogui.position()
+            target_pos = np.array((x, y), dtype = np.float64)
+            current_pos = np.array(pyautogui.position(), dtype = np.float64)
 
             # Estimate the mouse movement distance by calculating the Euclidean distance of the 2 points.
-            vectors = [(a - b) ** 2 for a, b in zip(current_pos, target_pos)]
-            dist = math.sqrt(sum(vectors))
+            dist = float(np.hypot(*(target_pos - current_pos)))
+            if dist < 1.0:
+                return None
 
             # Further randomize the mouse speed.
             new_mouse_speed = MouseUtils.bezier_mouse_speed - float(np.random.randint(0, 300))
 
             # Calculate the duration of the mouse movement and the amount of points along the path that the mouse will take.
             dur = 0.1 + dist / new_mouse_speed
-            target_point_cnt = int(dur / MouseUtils.bezier_mouse_smoothness)
+            target_point_cnt = max(2, int(dur / MouseUtils.bezier_mouse_smoothness))
 
             if Settings.debug_mode:
                 MessageLog.print_message(f"[DEBUG] Duration: {dur}, Number of points: {target_point_cnt})")
 
-            # Generate the curve that the mouse will follow by hitting each point along its path.
-            curve = pyclick.HumanCurve(current_pos, target_pos, targetPoints = target_point_cnt)
+            # Fit one of the pre-generated curve shapes onto this move and hit each point along its path.
+            pool = MouseUtils._get_shape_pool()
+            shape_index = random.randrange(len(pool))
+            points = MouseUtils._fit_shape(pool[shape_index], current_pos, target_pos, target_point_cnt)
+
+            interval = dur / len(points)
+            for point_x, point_y in points.tolist():
+                pyautogui.moveTo(point_x, point_y, _pause = False)
+                sleep(interval)
+
+            # Leave the pause at the step interval for the clicks that follow, the same as pyclick.HumanClicker did.
+            pyautogui.PAUSE = interval
 
-            MouseUtils._hc.move((x, y), duration = dur, humanCurve = curve)
+            # Replace the used shape now that the mouse has arrived so that generating it stays out of the way of the next move.
+            pool[shape_index] = MouseUtils._generate_shape()
         else:
             if custom_mouse_speed <= 0.0:
                 custom_mouse_speed = Settings.custom_mouse_speed
@@ -71,6 +187,47 @@ class MouseUtils:
 
         return None
 
+    @staticmethod
+    def benchmark_curve_generation(moves: int = 1000) -> Dict[str, float]:
+        """Measure how long generating the curve of one move takes, from fitting a pooled shape, generating a new shape and from pyclick.HumanCurve if it is installed.
+
+        Args:
+            moves (int, optional): Number of random moves to generate curves for. Defaults to 1000.
+
+        Returns:
+            (Dict[str, float]): Average microseconds per move for each method.
+        """
+        screen_width, screen_height = pyautogui.size()
+        starts = np.column_stack((np.random.randint(0, screen_width, moves), np.random.randint(0, screen_height, moves))).astype(np.float64)
+        ends = np.column_stack((np.random.randint(0, screen_width, moves), np.random.randint(0, screen_height, moves))).astype(np.float64)
+        point_counts = [max(2, int((0.1 + float(np.hypot(*(end - start))) / MouseUtils.bezier_mouse_speed) / MouseUtils.bezier_mouse_smoothness)) for start, end in zip(starts, ends)]
+        MouseUtils._get_shape_pool()
+
+        results = {}
+
+        start_time = time.perf_counter()
+        for start, end, point_count in zip(starts, ends, point_counts):
+            MouseUtils._generate_curve(start, end, point_count)
+        results["pooled_us"] = (time.perf_counter() - start_time) / moves * 1e6
+
+        start_time = time.perf_counter()
+        for start, end, point_count in zip(starts, ends, point_counts):
+            MouseUtils._fit_shape(MouseUtils._generate_shape(), start, end, point_count)
+        results["vectorized_us"] = (time.perf_counter() - start_time) / moves * 1e6
+
+        try:
+            import pyclick
+
+            start_time = time.perf_counter()
+            for start, end, point_count in zip(starts, ends, point_counts):
+                pyclick.HumanCurve(tuple(start.astype(int)), tuple(end.astype(int)), targetPoints = point_count)
+            results["pyclick_us"] = (time.perf_counter() - start_time) / moves * 1e6
+        except ImportError:
+            pass
+
+        MessageLog.print_message(f"[INFO] Curve generation benchmark over {moves} moves: " + ", ".join(f"{key} = {value:.1f}" for key, value in results.items()))
+        return results
+
     @staticmethod
     def move_and_click_point(x: int, y: int, image_name: str, custom_mouse_speed: float = 0.0, mouse_clicks: int = 1, custom_wait: Optional[float] = None):
         """Move the cursor to the specified point on the screen and clicks it.
@@ -95,6 +252,11 @@ class MouseUtils:
 
         MouseUtils.move_to(new_x, new_y, custom_mouse_speed = custom_mouse_speed)
 
+        # Capture the window before clicking so that a reaction that is faster than the first capture after the click still counts as a change.
+        from utils.image_utils import ImageUtils
+        is_detecting_settle = custom_wait is None and Settings.enable_click_settle_detection
+        baseline = ImageUtils.capture_click_baseline((new_x, new_y)) if is_detecting_settle else None
+
         if Settings.enable_bezier_curve_mouse_movement:
             pyautogui.mouseDown()
             sleep(np.random.uniform(0.02, 0.12))
@@ -107,11 +269,34 @@ class MouseUtils:
         else:
             pyautogui.click(clicks=mouse_clicks)
 
+        ImageUtils.invalidate_frame()
+
         # This delay is necessary as ImageUtils will take the screenshot too fast and the bot will use the last frame before clicking to navigate.
         if custom_wait is not None:
             sleep(custom_wait)
             return
 
+        if is_detecting_settle:
+            # Only wait until the screen has reacted to the click and then stayed still for a moment, up to the same second that would have been waited otherwise.
+            delay = 1.0 - Settings.reduce_delay_seconds if 0.0 < Settings.reduce_delay_seconds <= 1.0 else 1.0
+            timeout = delay
+            is_learning = Settings.enable_adaptive_delays and not LatencyModel.has_enough_samples(f"click:{image_name}")
+            if Settings.enable_adaptive_delays:
+                # A screen that keeps animating never settles and looks the same as a slow one, so the learned wait is never longer than the fixed one.
+                timeout = LatencyModel.get_delay(f"click:{image_name}", delay, max_delay = delay)
+
+            elapsed, settled = ImageUtils.wait_for_click_settle((new_x, new_y), image_name, timeout = timeout, baseline = baseline)
+
+            # Only learn from clicks that the screen was seen reacting to and settling after, as a wait that ran into the timeout is not a measured latency.
+            if Settings.enable_adaptive_delays and settled:
+                LatencyModel.record(f"click:{image_name}", elapsed)
+
+            # The click may have started a page load that has not rendered anything yet, so fall back to the rest of the fixed delay. The same goes for while the
+            # latency of the click is still being learned.
+            if (not settled or is_learning) and elapsed < delay:
+                sleep(delay - elapsed)
+            return
+
         from bot.game import Game
         Game.wait(1)
 
@@ -180,6 +365,9 @@ class MouseUtils:
 
         pyautogui.scroll(scroll_clicks, x = x, y = y)
 
+        from utils.image_utils import ImageUtils
+        ImageUtils.invalidate_frame()
+
         return None
 
     @staticmethod
@@ -206,6 +394,9 @@ class MouseUtils:
 
         pyautogui.scroll(scroll_clicks, x = x, y = y)
 
+        from utils.image_utils import ImageUtils
+        ImageUtils.invalidate_frame()
+
         return None
 
     @staticmethod
@@ -1,7 +1,7 @@
 import json
 import os
 import sys
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 from dictor import dictor
 
@@ -28,10 +28,13 @@ class Settings:
     combat_elapsed_time: float = 0.0
     farming_mode: str = dictor(_data, "game.farmingMode", checknone = True)
     item_name: str = dictor(_data, "game.item", checknone = True)
+    # Other items to tally from the same loot screens, like the Omega Anima next to its Anima. They count towards the item amount to farm as well.
+    extra_items: List[str] = dictor(_data, "game.extraItems", [])
     map_name: str = dictor(_data, "game.map", checknone = True)
     mission_name: str = dictor(_data, "game.mission", checknone = True)
     item_amount_to_farm: int = dictor(_data, "game.itemAmount", 1)
     item_amount_farmed: int = 0
+    item_amounts_farmed: Dict[str, int] = {}
     amount_of_runs_finished: int = 0
     summon_element_list: List[str] = dictor(_data, "game.summonElements", [])
     summon_list: List[str] = dictor(_data, "game.summons", [])
@@ -73,6 +76,11 @@ class Settings:
     enable_bypass_reset_summon: bool = dictor(_data, "configuration.enableBypassResetSummon", False)
     static_window: bool = dictor(_data, "configuration.staticWindow", True)
     enable_mouse_security_attempt_bypass: bool = dictor(_data, "configuration.enableMouseSecurityAttemptBypass", True)
+    enable_ocr_warm_up: bool = dictor(_data, "configuration.enableOCRWarmUp", False)
+    enable_async_loot_detection: bool = dictor(_data, "configuration.enableAsyncLootDetection", False)
+    enable_click_settle_detection: bool = dictor(_data, "configuration.enableClickSettleDetection", False)
+    enable_adaptive_delays: bool = dictor(_data, "configuration.enableAdaptiveDelays", False)
+    enable_calibration_cache: bool = dictor(_data, "configuration.enableCalibrationCache", True)
     # #### end of configuration ####
 
     # #### nightmare ####
@@ -212,6 +220,15 @@ class Settings:
     confidence_all: float = dictor(_data, "device.confidenceAll", 0.8)
     custom_scale: float = dictor(_data, "device.customScale", 1.0)
     enable_test_for_home_screen = dictor(_data, "device.enableTestForHomeScreen", False)
+    template_cache_size_mb: int = dictor(_data, "device.templateCacheSizeMB", 64)
+    matcher_strategy: str = dictor(_data, "device.matcherStrategy", "full")
+    enable_frame_change_detection: bool = dictor(_data, "device.enableFrameChangeDetection", False)
+    capture_backend: str = dictor(_data, "device.captureBackend", "pyautogui")
+    capture_replay_directory: str = dictor(_data, "device.captureReplayDirectory", "")
+    enable_capture_daemon: bool = dictor(_data, "device.enableCaptureDaemon", False)
+    capture_daemon_fps: float = dictor(_data, "device.captureDaemonFPS", 15)
+    enable_dual_window_capture: bool = dictor(_data, "device.enableDualWindowCapture", True)
+    ocr_engine: str = dictor(_data, "device.ocrEngine", "easyocr")
     # #### end of device ####
 
     # ################## end of settings.json ###################
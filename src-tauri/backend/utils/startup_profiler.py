@@ -0,0 +1,156 @@
+import importlib.abc
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from utils.message_log import MessageLog
+
+
+class _TimingLoader(importlib.abc.Loader):
+    """
+    Wraps the loader of a module to time how long executing the module took, in the same spirit as "python -X importtime".
+    """
+
+    def __init__(self, loader, name: str):
+        self._loader = loader
+        self._name = name
+
+    def __getattr__(self, attribute: str):
+        # Keep get_data(), get_resource_reader() and the like working for modules that look at their own loader.
+        return getattr(self._loader, attribute)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        StartupProfiler._stack.append(0.0)
+        start_time = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start_time
+            children = StartupProfiler._stack.pop()
+            StartupProfiler._imports[self._name] = (elapsed - children, elapsed)
+            if len(StartupProfiler._stack) != 0:
+                StartupProfiler._stack[-1] += elapsed
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    """
+    Finds modules through the rest of sys.meta_path and wraps their loaders with _TimingLoader.
+    """
+
+    def find_spec(self, fullname, path, target = None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimingLoader(spec.loader, fullname)
+                return spec
+
+        return None
+
+
+class StartupProfiler:
+    """
+    Breaks down the startup time of the bot into the time spent importing each module and the time between named checkpoints. Enabled with "python main.py --profile-startup".
+    """
+
+    _enabled: bool = False
+    _start_time: float = None
+    _finder: _TimingFinder = None
+
+    # Self and cumulative seconds spent executing each module.
+    _imports: Dict[str, Tuple[float, float]] = {}
+    _stack: List[float] = []
+    _marks: List[Tuple[str, float]] = []
+
+    @staticmethod
+    def is_enabled() -> bool:
+        """Check if startup profiling is enabled.
+
+        Returns:
+            (bool): True if the profiler was installed.
+        """
+        return StartupProfiler._enabled
+
+    @staticmethod
+    def install():
+        """Start timing every module imported from now on. This needs to happen before the bot modules are imported.
+
+        Returns:
+            None
+        """
+        if not StartupProfiler._enabled:
+            StartupProfiler._enabled = True
+            StartupProfiler._start_time = time.perf_counter()
+            StartupProfiler._finder = _TimingFinder()
+            sys.meta_path.insert(0, StartupProfiler._finder)
+
+        return None
+
+    @staticmethod
+    def uninstall():
+        """Stop timing imports. The timings collected so far are kept for the report.
+
+        Returns:
+            None
+        """
+        if StartupProfiler._finder in sys.meta_path:
+            sys.meta_path.remove(StartupProfiler._finder)
+
+        return None
+
+    @staticmethod
+    def mark(label: str):
+        """Record a checkpoint with the time since the profiler was installed. Does nothing when profiling is disabled.
+
+        Args:
+            label (str): Name of the checkpoint.
+
+        Returns:
+            None
+        """
+        if StartupProfiler._enabled:
+            StartupProfiler._marks.append((label, time.perf_counter() - StartupProfiler._start_time))
+
+        return None
+
+    @staticmethod
+    def print_report(limit: int = 20):
+        """Print the checkpoints and the slowest top-level packages and modules to import.
+
+        Args:
+            limit (int, optional): Number of packages and modules to list. Defaults to 20.
+
+        Returns:
+            None
+        """
+        if not StartupProfiler._enabled:
+            return None
+
+        MessageLog.print_message("\n[INFO] Startup profile:")
+        previous = 0.0
+        for label, elapsed in StartupProfiler._marks:
+            MessageLog.print_message(f"[INFO] {elapsed * 1000:8.1f} ms (+{(elapsed - previous) * 1000:7.1f} ms)  {label}")
+            previous = elapsed
+
+        # Sum the self time of every submodule into its top-level package, which is what decides whether an import is worth deferring.
+        packages: Dict[str, float] = {}
+        for name, (self_time, _) in StartupProfiler._imports.items():
+            package = name.split(".")[0]
+            packages[package] = packages.get(package, 0.0) + self_time
+
+        total = sum(packages.values())
+        MessageLog.print_message(f"\n[INFO] Imported {len(StartupProfiler._imports)} modules in {total * 1000:.1f} ms. Slowest packages:")
+        for package, seconds in sorted(packages.items(), key = lambda item: item[1], reverse = True)[:limit]:
+            MessageLog.print_message(f"[INFO] {seconds * 1000:8.1f} ms  {package}")
+
+        MessageLog.print_message(f"\n[INFO] Slowest modules (self | cumulative):")
+        for name, (self_time, cumulative) in sorted(StartupProfiler._imports.items(), key = lambda item: item[1][0], reverse = True)[:limit]:
+            MessageLog.print_message(f"[INFO] {self_time * 1000:8.1f} ms | {cumulative * 1000:8.1f} ms  {name}")
+
+        return None
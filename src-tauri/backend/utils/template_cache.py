@@ -0,0 +1,141 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+import PIL.Image
+import cv2
+import numpy
+
+from utils.settings import Settings
+from utils.message_log import MessageLog
+
+
+class TemplateCache:
+    """
+    Process-wide LRU cache of decoded template images so that every template is only read from disk, rescaled and cropped once.
+    """
+
+    # Keyed by (image path, scale, grayscale, number of pixels cropped off the right edge).
+    _cache: "OrderedDict[Tuple[str, float, bool, int], numpy.ndarray]" = OrderedDict()
+    _lock = threading.Lock()
+    _current_bytes: int = 0
+    _max_bytes: int = max(1, int(Settings.template_cache_size_mb)) * 1024 * 1024
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @staticmethod
+    def get(image_path: str, scale: float = 1.0, grayscale: bool = True, crop_right: int = 0) -> numpy.ndarray:
+        """Get the decoded template image, reading and preparing it from disk only if it is not already cached.
+
+        Args:
+            image_path (str): The file path of the template image.
+            scale (float, optional): The factor to rescale the template image by. Defaults to 1.0.
+            grayscale (bool, optional): Decode the template image as grayscale. Otherwise, decode it as BGR. Defaults to True.
+            crop_right (int, optional): Number of pixels to crop off the right edge of the template image. Defaults to 0.
+
+        Returns:
+            (numpy.ndarray): The read-only template image array.
+        """
+        key = (image_path, round(scale, 4), grayscale, crop_right)
+
+        with TemplateCache._lock:
+            template_array = TemplateCache._cache.get(key)
+            if template_array is not None:
+                TemplateCache._cache.move_to_end(key)
+                TemplateCache.hits += 1
+                return template_array
+
+            TemplateCache.misses += 1
+
+        template_array = TemplateCache._load(image_path, scale, grayscale, crop_right)
+
+        with TemplateCache._lock:
+            if key not in TemplateCache._cache:
+                TemplateCache._cache[key] = template_array
+                TemplateCache._current_bytes += template_array.nbytes
+
+                # Evict the least recently used templates until the cache fits inside its memory cap again.
+                while TemplateCache._current_bytes > TemplateCache._max_bytes and len(TemplateCache._cache) > 1:
+                    _, evicted_array = TemplateCache._cache.popitem(last = False)
+                    TemplateCache._current_bytes -= evicted_array.nbytes
+                    TemplateCache.evictions += 1
+
+        return template_array
+
+    @staticmethod
+    def _load(image_path: str, scale: float, grayscale: bool, crop_right: int) -> numpy.ndarray:
+        """Read the template image from disk and then rescale and crop it.
+
+        Args:
+            image_path (str): The file path of the template image.
+            scale (float): The factor to rescale the template image by.
+            grayscale (bool): Decode the template image as grayscale. Otherwise, decode it as BGR.
+            crop_right (int): Number of pixels to crop off the right edge of the template image.
+
+        Returns:
+            (numpy.ndarray): The read-only template image array.
+        """
+        if scale != 1.0:
+            # Rescale with PIL in memory to keep the same resampling that the rescaled templates have always been matched with.
+            with PIL.Image.open(image_path) as template:
+                template = template.convert("RGB")
+                template = template.resize(size = (int(template.width * scale), int(template.height * scale)), resample = None)
+                template_array = numpy.asarray(template)
+
+            template_array = cv2.cvtColor(template_array, cv2.COLOR_RGB2GRAY if grayscale else cv2.COLOR_RGB2BGR)
+        else:
+            template_array = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR)
+            if template_array is None:
+                raise FileNotFoundError(f"Failed to read the template image at {image_path}.")
+
+        if crop_right > 0:
+            template_array = numpy.ascontiguousarray(template_array[:, 0:template_array.shape[1] - crop_right])
+
+        template_array.flags.writeable = False
+        return template_array
+
+    @staticmethod
+    def get_statistics() -> Dict[str, int]:
+        """Get the counters of the template cache.
+
+        Returns:
+            (Dict[str, int]): The hits, misses, evictions, number of cached templates and their total size in bytes.
+        """
+        with TemplateCache._lock:
+            return {
+                "hits": TemplateCache.hits,
+                "misses": TemplateCache.misses,
+                "evictions": TemplateCache.evictions,
+                "entries": len(TemplateCache._cache),
+                "bytes": TemplateCache._current_bytes
+            }
+
+    @staticmethod
+    def print_statistics():
+        """Print the counters of the template cache to the message log.
+
+        Returns:
+            None
+        """
+        statistics = TemplateCache.get_statistics()
+        MessageLog.print_message(f"[DEBUG] Template cache: {statistics['hits']} hits, {statistics['misses']} misses, {statistics['evictions']} evictions, "
+                                 f"{statistics['entries']} templates using {statistics['bytes'] / (1024 * 1024):.2f} MB.")
+        return None
+
+    @staticmethod
+    def clear():
+        """Clear all cached templates and reset the counters.
+
+        Returns:
+            None
+        """
+        with TemplateCache._lock:
+            TemplateCache._cache.clear()
+            TemplateCache._current_bytes = 0
+            TemplateCache.hits = 0
+            TemplateCache.misses = 0
+            TemplateCache.evictions = 0
+
+        return None
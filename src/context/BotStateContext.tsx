@@ -7,6 +7,7 @@ export interface Settings {
         combatScript: string[]
         farmingMode: string
         item: string
+        extraItems: string[]
         mission: string
         map: string
         itemAmount: number
@@ -57,6 +58,11 @@ export interface Settings {
         enableBypassResetSummon: boolean
         staticWindow: boolean
         enableMouseSecurityAttemptBypass: boolean
+        enableOCRWarmUp: boolean
+        enableAsyncLootDetection: boolean
+        enableClickSettleDetection: boolean
+        enableAdaptiveDelays: boolean
+        enableCalibrationCache: boolean
     }
 
     // Misc settings for the GUI.
@@ -164,6 +170,15 @@ export interface Settings {
         confidenceAll: number
         customScale: number
         enableTestForHomeScreen: boolean
+        enableFrameChangeDetection: boolean
+        templateCacheSizeMB: number
+        matcherStrategy: string
+        captureBackend: string
+        captureReplayDirectory: string
+        enableCaptureDaemon: boolean
+        captureDaemonFPS: number
+        enableDualWindowCapture: boolean
+        ocrEngine: string
     }
 }
 
@@ -174,6 +189,7 @@ export const defaultSettings: Settings = {
         combatScript: [],
         farmingMode: "",
         item: "",
+        extraItems: [],
         mission: "",
         map: "",
         itemAmount: 1,
@@ -216,6 +232,11 @@ export const defaultSettings: Settings = {
         enableBypassResetSummon: false,
         staticWindow: true,
         enableMouseSecurityAttemptBypass: true,
+        enableOCRWarmUp: false,
+        enableAsyncLootDetection: false,
+        enableClickSettleDetection: false,
+        enableAdaptiveDelays: false,
+        enableCalibrationCache: true,
     },
     misc: {
         guiLowPerformanceMode: false,
@@ -306,6 +327,15 @@ export const defaultSettings: Settings = {
         confidenceAll: 0.8,
         customScale: 1.0,
         enableTestForHomeScreen: false,
+        enableFrameChangeDetection: false,
+        templateCacheSizeMB: 64,
+        matcherStrategy: "full",
+        captureBackend: "pyautogui",
+        captureReplayDirectory: "",
+        enableCaptureDaemon: false,
+        captureDaemonFPS: 15,
+        enableDualWindowCapture: true,
+        ocrEngine: "easyocr",
     },
 }
 
@@ -106,6 +106,12 @@ const StartHelper = () => {
                     ...newSettings,
                     [key as keyof Settings]: defaultSettings[key as keyof Settings],
                 }
+            } else {
+                // Also fill in the settings that were added to an existing section since the settings were last saved.
+                newSettings = {
+                    ...newSettings,
+                    [key as keyof Settings]: { ...defaultSettings[key as keyof Settings], ...decoded[key as keyof Settings] },
+                }
             }
         })
 
@@ -1,7 +1,8 @@
-import { Container, createStyles, Grid, Button, Group, FileInput, Textarea, Stack, Divider } from "@mantine/core"
+import { Container, createStyles, Grid, Button, Group, FileInput, Textarea, TextInput, Stack, Divider } from "@mantine/core"
 import { useContext, useState } from "react"
 import CustomSwitch from "../../components/CustomSwitch"
 import CustomNumberInput from "../../components/CustomNumberInput"
+import { CustomSelect, DataProps } from "../../components/CustomSelect"
 import { BotStateContext } from "../../context/BotStateContext"
 import CustomTransferList from "../../components/CustomTransferList"
 import { Icon } from "@iconify/react"
@@ -30,6 +31,49 @@ const ExtraSettings = () => {
 
     const bsc = useContext(BotStateContext)
 
+    const matcherStrategies: DataProps[] = [
+        {
+            label: "Full",
+            value: "full",
+            description: "Template match every image at full resolution.",
+        },
+        {
+            label: "Coarse to Fine",
+            value: "coarse_to_fine",
+            description: "Find candidates at a lower resolution first and only refine those at full resolution.",
+        },
+    ]
+
+    const captureBackends: DataProps[] = [
+        {
+            label: "PyAutoGUI",
+            value: "pyautogui",
+            description: "Works everywhere but is the slowest.",
+        },
+        {
+            label: "MSS",
+            value: "mss",
+            description: "Grabs the screen through the native APIs. Falls back to PyAutoGUI if the mss package is not installed.",
+        },
+        {
+            label: "Replay",
+            value: "replay",
+            description: "Replays recorded screenshots from the replay folder for offline testing.",
+        },
+    ]
+
+    const ocrEngines: DataProps[] = [
+        {
+            label: "EasyOCR",
+            value: "easyocr",
+        },
+        {
+            label: "Digit Recognizer",
+            value: "digits",
+            description: "Lightweight recognizer for item amounts. Falls back to EasyOCR until it has been trained.",
+        },
+    ]
+
     const renderTwitterSettings = () => {
         return (
             <Grid>
@@ -399,6 +443,51 @@ const ExtraSettings = () => {
                                 onChange={(checked) => bsc.setSettings({ ...bsc.settings, configuration: { ...bsc.settings.configuration, enableMouseSecurityAttemptBypass: checked } })}
                             />
                         </Grid.Col>
+
+                        <Grid.Col span={6}>
+                            <CustomSwitch
+                                label="Enable OCR Warm Up"
+                                description="Enable loading the EasyOCR models in the background right after calibration so that the first loot check does not have to wait for them."
+                                checked={bsc.settings.configuration.enableOCRWarmUp}
+                                onChange={(checked) => bsc.setSettings({ ...bsc.settings, configuration: { ...bsc.settings.configuration, enableOCRWarmUp: checked } })}
+                            />
+                        </Grid.Col>
+
+                        <Grid.Col span={6}>
+                            <CustomSwitch
+                                label="Enable Asynchronous Loot Detection"
+                                description="Enable detecting the loot of a run in the background while the bot already starts the next run. The bot still waits for the results whenever they could finish farming."
+                                checked={bsc.settings.configuration.enableAsyncLootDetection}
+                                onChange={(checked) => bsc.setSettings({ ...bsc.settings, configuration: { ...bsc.settings.configuration, enableAsyncLootDetection: checked } })}
+                            />
+                        </Grid.Col>
+
+                        <Grid.Col span={6}>
+                            <CustomSwitch
+                                label="Enable Click Settle Detection"
+                                description="Enable moving on after a click as soon as the screen has changed and stayed still for a moment instead of always waiting the full delay. Falls back to the full delay if the screen does not settle."
+                                checked={bsc.settings.configuration.enableClickSettleDetection}
+                                onChange={(checked) => bsc.setSettings({ ...bsc.settings, configuration: { ...bsc.settings.configuration, enableClickSettleDetection: checked } })}
+                            />
+                        </Grid.Col>
+
+                        <Grid.Col span={6}>
+                            <CustomSwitch
+                                label="Enable Adaptive Delays"
+                                description="Enable learning how long the game takes to respond to each action on this computer and shortening the delays to match. The fixed delays are used until enough responses have been measured."
+                                checked={bsc.settings.configuration.enableAdaptiveDelays}
+                                onChange={(checked) => bsc.setSettings({ ...bsc.settings, configuration: { ...bsc.settings.configuration, enableAdaptiveDelays: checked } })}
+                            />
+                        </Grid.Col>
+
+                        <Grid.Col span={6}>
+                            <CustomSwitch
+                                label="Enable Calibration Cache"
+                                description="Enable remembering where the game window was calibrated on this screen layout so that the next launch only has to verify it instead of scanning the whole screen again."
+                                checked={bsc.settings.configuration.enableCalibrationCache}
+                                onChange={(checked) => bsc.setSettings({ ...bsc.settings, configuration: { ...bsc.settings.configuration, enableCalibrationCache: checked } })}
+                            />
+                        </Grid.Col>
                     </Grid>
                 </Grid.Col>
             </Grid>
@@ -766,6 +855,80 @@ const ExtraSettings = () => {
                                 checked={bsc.settings.device.enableTestForHomeScreen}
                                 onChange={(checked) => bsc.setSettings({ ...bsc.settings, device: { ...bsc.settings.device, enableTestForHomeScreen: checked } })}
                             />
+
+                            <CustomSwitch
+                                label="Enable Frame Change Detection"
+                                description="Enable reusing the previous search results while the searched part of the screen has not changed."
+                                checked={bsc.settings.device.enableFrameChangeDetection}
+                                onChange={(checked) => bsc.setSettings({ ...bsc.settings, device: { ...bsc.settings.device, enableFrameChangeDetection: checked } })}
+                            />
+
+                            <CustomNumberInput
+                                label="Template Cache Size (MB)"
+                                description="Set how much memory the scaled image assets can be cached in."
+                                value={bsc.settings.device.templateCacheSizeMB}
+                                onChange={(target) => bsc.setSettings({ ...bsc.settings, device: { ...bsc.settings.device, templateCacheSizeMB: target } })}
+                                min={8}
+                                max={1024}
+                            />
+
+                            <CustomSelect
+                                label="Matcher Strategy"
+                                description="Set how images are template matched on the screen."
+                                data={matcherStrategies}
+                                value={bsc.settings.device.matcherStrategy}
+                                onChange={(value) => bsc.setSettings({ ...bsc.settings, device: { ...bsc.settings.device, matcherStrategy: value ?? "full" } })}
+                            />
+
+                            <CustomSelect
+                                label="Capture Backend"
+                                description="Set how screenshots of the game window are taken."
+                                data={captureBackends}
+                                value={bsc.settings.device.captureBackend}
+                                onChange={(value) => bsc.setSettings({ ...bsc.settings, device: { ...bsc.settings.device, captureBackend: value ?? "pyautogui" } })}
+                            />
+
+                            {bsc.settings.device.captureBackend === "replay" ? (
+                                <TextInput
+                                    label="Replay Folder"
+                                    description="Path to the folder of recorded screenshots to replay."
+                                    value={bsc.settings.device.captureReplayDirectory}
+                                    onChange={(e) => bsc.setSettings({ ...bsc.settings, device: { ...bsc.settings.device, captureReplayDirectory: e.target.value } })}
+                                />
+                            ) : null}
+
+                            <CustomSwitch
+                                label="Enable Background Capture"
+                                description="Enable capturing the game window continuously in the background so that searches can use the latest frame instead of waiting for their own screenshot."
+                                checked={bsc.settings.device.enableCaptureDaemon}
+                                onChange={(checked) => bsc.setSettings({ ...bsc.settings, device: { ...bsc.settings.device, enableCaptureDaemon: checked } })}
+                            />
+
+                            {bsc.settings.device.enableCaptureDaemon ? (
+                                <CustomNumberInput
+                                    label="Background Capture FPS"
+                                    description="Set how many times per second the game window is captured in the background."
+                                    value={bsc.settings.device.captureDaemonFPS}
+                                    onChange={(target) => bsc.setSettings({ ...bsc.settings, device: { ...bsc.settings.device, captureDaemonFPS: target } })}
+                                    min={1}
+                                    max={60}
+                                />
+                            ) : null}
+
+                            <CustomSwitch
+                                label="Enable Dual Window Capture"
+                                description="Enable capturing both game windows of the V2 Farming Modes in one screenshot when they are close enough together that it is faster than capturing each of them."
+                                checked={bsc.settings.device.enableDualWindowCapture}
+                                onChange={(checked) => bsc.setSettings({ ...bsc.settings, device: { ...bsc.settings.device, enableDualWindowCapture: checked } })}
+                            />
+
+                            <CustomSelect
+                                label="OCR Engine"
+                                description="Set how the amounts of the farmed items are read on the loot screen."
+                                data={ocrEngines}
+                                value={bsc.settings.device.ocrEngine}
+                                onChange={(value) => bsc.setSettings({ ...bsc.settings, device: { ...bsc.settings.device, ocrEngine: value ?? "easyocr" } })}
+                            />
                         </Stack>
                     </Group>
                 </Grid.Col>
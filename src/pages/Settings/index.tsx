@@ -1,4 +1,4 @@
-import { Container, createStyles, Grid, Divider, FileInput, Stack, Flex, UnstyledButton } from "@mantine/core"
+import { Container, createStyles, Grid, Divider, FileInput, Stack, Flex, UnstyledButton, MultiSelect } from "@mantine/core"
 import { useContext, useState, useEffect } from "react"
 import { CustomSelect, DataProps } from "../../components/CustomSelect"
 import CustomSwitch from "../../components/CustomSwitch"
@@ -305,7 +305,7 @@ const Settings = () => {
                             // In addition, also reset selected Item and Mission.
                             bsc.setSettings({
                                 ...bsc.settings,
-                                game: { ...bsc.settings.game, farmingMode: value, item: "", mission: "", map: "" },
+                                game: { ...bsc.settings.game, farmingMode: value, item: "", extraItems: [], mission: "", map: "" },
                                 nightmare: {
                                     ...bsc.settings.nightmare,
                                     enableNightmare: false,
@@ -377,12 +377,31 @@ const Settings = () => {
                     }
 
                     // Reset the selected mission as well.
-                    bsc.setSettings({ ...bsc.settings, game: { ...bsc.settings.game, item: newItem, mission: "", map: "" } })
+                    bsc.setSettings({ ...bsc.settings, game: { ...bsc.settings.game, item: newItem, extraItems: [], mission: "", map: "" } })
                 }}
             />
         )
     }
 
+    const renderExtraItemsSetting = () => {
+        if (bsc.settings.game.item !== "" && bsc.settings.game.item !== "EXP") {
+            return (
+                <MultiSelect
+                    label="Select Extra Items"
+                    description="Also tally these items from the same loot screens, like the Omega Anima next to its Anima. They count towards the # of Items as well."
+                    placeholder="Please select/search any other Items to tally"
+                    data={itemList.filter((item) => item.value !== bsc.settings.game.item && item.value !== "EXP")}
+                    value={bsc.settings.game.extraItems}
+                    onChange={(value) => bsc.setSettings({ ...bsc.settings, game: { ...bsc.settings.game, extraItems: value } })}
+                    searchable
+                    clearable
+                    maxDropdownHeight={250}
+                    nothingFound="No matches found"
+                />
+            )
+        } else return null
+    }
+
     const renderMissionSetting = () => {
         if (bsc.settings.game.farmingMode !== "Generic" && bsc.settings.game.farmingMode !== "GenericV2") {
             return (
@@ -463,6 +482,7 @@ const Settings = () => {
 
                 {renderFarmingModeSetting()}
                 {renderItemSetting()}
+                {renderExtraItemsSetting()}
                 {renderMissionSetting()}
                 {renderItemAmountSetting()}
                 {renderSummonSetting()}